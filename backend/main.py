@@ -1,3 +1,4 @@
+import logging
 import os
 
 from fastapi import FastAPI, Request
@@ -5,9 +6,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 try:
-    from .database import init_db
+    from .database import engine, init_db
+    from .services.request_metrics import RequestMetricsMiddleware, install_sql_hooks
+    from .services.tracing import configure_logging
     from .services.intake_service import ensure_tables
     from .services.evidence_service import ensure_evidence_tables
+    from .services.email_outbox import start_email_dispatcher, stop_email_dispatcher
+    from .services.resource_search import ensure_resource_search_index
+    from .services.resources_service import ensure_resource_tag_index
     from .routers.core import router as core_router
     from .routers.intake import router as intake_router
     from .routers.admin import router as admin_router
@@ -18,9 +24,14 @@ try:
     from .routers.documents import router as documents_router
     from .routers.notifications import router as notifications_router
 except ImportError:
-    from database import init_db
+    from database import engine, init_db
+    from services.request_metrics import RequestMetricsMiddleware, install_sql_hooks  # type: ignore
+    from services.tracing import configure_logging  # type: ignore
     from services.intake_service import ensure_tables  # type: ignore
     from services.evidence_service import ensure_evidence_tables  # type: ignore
+    from services.email_outbox import start_email_dispatcher, stop_email_dispatcher  # type: ignore
+    from services.resource_search import ensure_resource_search_index  # type: ignore
+    from services.resources_service import ensure_resource_tag_index  # type: ignore
     from routers.core import router as core_router  # type: ignore
     from routers.intake import router as intake_router  # type: ignore
     from routers.admin import router as admin_router  # type: ignore
@@ -31,6 +42,9 @@ except ImportError:
     from routers.documents import router as documents_router  # type: ignore
     from routers.notifications import router as notifications_router  # type: ignore
 
+configure_logging()
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
 @app.on_event("startup")
@@ -38,16 +52,29 @@ def startup_event():
     init_db()
     ensure_tables()
     ensure_evidence_tables()
+    ensure_resource_search_index()
+    ensure_resource_tag_index()
     try:
         from .services.transactional_email import email_provider_configured, email_provider_hint
     except ImportError:
         from services.transactional_email import email_provider_configured, email_provider_hint  # type: ignore
     if not email_provider_configured():
-        print(
-            f"Warning: Magic link email is not configured. {email_provider_hint()} "
+        logger.warning(
+            "Magic link email is not configured. %s "
             "Without that, sign-in links are only printed in server logs. "
-            "For local testing only, set MAGIC_LINK_DEV_RETURN_TOKEN=true to return the link in the API JSON."
+            "For local testing only, set MAGIC_LINK_DEV_RETURN_TOKEN=true to return the link in the API JSON.",
+            email_provider_hint(),
         )
+    try:
+        start_email_dispatcher()
+    except Exception as e:
+        logger.warning("email outbox dispatcher not started: %s: %s", type(e).__name__, e)
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    stop_email_dispatcher()
+
 
 def _split_csv_env(name: str) -> list[str]:
     raw = os.getenv(name, "")
@@ -90,11 +117,22 @@ app.add_middleware(
     max_age=86400,
 )
 
+# Outermost, so latency covers CORS and the Server-Timing header is added to every response.
+app.add_middleware(RequestMetricsMiddleware)
+install_sql_hooks(engine)
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
-    import traceback
-    traceback.print_exc()
+    # The request's span has already closed (and recorded the error) by the time this runs; the middleware
+    # leaves its trace id on request.state so the log line can be matched to the exported trace.
+    logger.error(
+        "Unhandled error on %s %s",
+        request.method,
+        request.url.path,
+        exc_info=exc,
+        extra={"trace_id": getattr(request.state, "trace_id", "")},
+    )
     return JSONResponse(
         status_code=500,
         content={"detail": f"{type(exc).__name__}: {exc}"},
@@ -2,6 +2,6 @@ from .intake import Intake, IntakeSubmission
 from .magic_link import MagicLinkToken
 from .password_reset import PasswordResetToken
 from .email_verification import EmailVerificationToken
-from .resources import Resource
+from .resources import Resource, ResourceCaseType, ResourceImportJob, ResourceLanguage
 
-__all__ = ["Intake", "IntakeSubmission", "MagicLinkToken", "PasswordResetToken", "EmailVerificationToken", "Resource"]
+__all__ = ["Intake", "IntakeSubmission", "MagicLinkToken", "PasswordResetToken", "EmailVerificationToken", "Resource", "ResourceCaseType", "ResourceLanguage", "ResourceImportJob"]
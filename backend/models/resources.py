@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text
 
 try:
     from ..database import Base
@@ -43,3 +43,42 @@ class Resource(Base):
     priority_score = Column(Integer, nullable=False, default=0, index=True)
     created_at = Column(DateTime(timezone=True), nullable=False, default=utc_now)
     updated_at = Column(DateTime(timezone=True), nullable=False, default=utc_now, onupdate=utc_now)
+
+
+class ResourceCaseType(Base):
+    """One row per (resource, case type); mirrors Resource.case_types so filters run in SQL."""
+
+    __tablename__ = "resource_case_types"
+
+    resource_id = Column(Integer, ForeignKey("resources.id", ondelete="CASCADE"), primary_key=True)
+    value = Column(String(80), primary_key=True)
+
+    __table_args__ = (Index("ix_resource_case_types_value", "value", "resource_id"),)
+
+
+class ResourceLanguage(Base):
+    """One row per (resource, language); mirrors Resource.languages so filters run in SQL."""
+
+    __tablename__ = "resource_languages"
+
+    resource_id = Column(Integer, ForeignKey("resources.id", ondelete="CASCADE"), primary_key=True)
+    value = Column(String(40), primary_key=True)
+
+    __table_args__ = (Index("ix_resource_languages_value", "value", "resource_id"),)
+
+
+class ResourceImportJob(Base):
+    """Progress of a streaming CSV import; committed after every batch so an interrupted upload can resume."""
+
+    __tablename__ = "resource_import_jobs"
+
+    id = Column(String(64), primary_key=True, index=True)
+    filename = Column(String(255), nullable=True)
+    status = Column(String(20), nullable=False, default="running", index=True)
+    last_row = Column(Integer, nullable=False, default=1)
+    rows_processed = Column(Integer, nullable=False, default=0)
+    created_count = Column(Integer, nullable=False, default=0)
+    skipped_count = Column(Integer, nullable=False, default=0)
+    errors = Column(Text, nullable=False, default="[]")
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utc_now)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utc_now, onupdate=utc_now)
@@ -18,9 +18,11 @@ try:
         basic_analytics,
         export_intakes_csv,
         list_intake_events_for_admin,
+        list_email_outbox_for_admin,
         list_intakes_for_admin,
         mark_callback_called,
         require_admin_access,
+        retry_email_outbox_for_admin,
         send_intake_staff_email,
         set_intake_admin_note,
         set_intake_admin_status,
@@ -39,9 +41,11 @@ except ImportError:
         basic_analytics,
         export_intakes_csv,
         list_intake_events_for_admin,
+        list_email_outbox_for_admin,
         list_intakes_for_admin,
         mark_callback_called,
         require_admin_access,
+        retry_email_outbox_for_admin,
         send_intake_staff_email,
         set_intake_admin_note,
         set_intake_admin_status,
@@ -204,3 +208,13 @@ def admin_mark_callback_called_endpoint(intake_id: str, request: Request):
 @router.get("/admin/health-checks")
 def admin_health_checks_endpoint(request: Request, db: Session = Depends(get_db)):
     return admin_health_checks(request=request, db=db)
+
+
+@router.get("/admin/email-outbox")
+def admin_email_outbox_endpoint(request: Request, status: str | None = None):
+    return list_email_outbox_for_admin(request=request, status=status)
+
+
+@router.post("/admin/email-outbox/{email_id}/retry")
+def admin_email_outbox_retry_endpoint(email_id: str, request: Request):
+    return retry_email_outbox_for_admin(request=request, email_id=email_id)
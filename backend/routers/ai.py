@@ -1,24 +1,53 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 try:
     from ..schemas.ai import AIChatRequest, AIChatResponse
-    from ..services.ai_service import run_ai_chat
+    from ..services.ai_service import run_ai_chat, stream_ai_chat
     from ..services.intake_service import log_intake_event
 except ImportError:
     from schemas.ai import AIChatRequest, AIChatResponse  # type: ignore
-    from services.ai_service import run_ai_chat  # type: ignore
+    from services.ai_service import run_ai_chat, stream_ai_chat  # type: ignore
     from services.intake_service import log_intake_event  # type: ignore
 
 router = APIRouter()
 
 
+async def _log_opened_on_error(req: AIChatRequest) -> None:
+    # FastAPI drops background tasks when the endpoint raises; record the open event before the error response.
+    await run_in_threadpool(log_intake_event, req.intake_id, "ai_assistant_opened", req.topic or "general")
+
+
 @router.post("/ai-chat", response_model=AIChatResponse)
-def ai_chat(req: AIChatRequest):
-    log_intake_event(req.intake_id, "ai_assistant_opened", req.topic or "general")
+async def ai_chat(req: AIChatRequest, background_tasks: BackgroundTasks):
+    # Analytics write runs after the response is sent, not before the model call.
+    background_tasks.add_task(log_intake_event, req.intake_id, "ai_assistant_opened", req.topic or "general")
     try:
-        result = run_ai_chat(req)
+        result = await run_ai_chat(req)
         return AIChatResponse(**result)
     except HTTPException:
+        await _log_opened_on_error(req)
+        raise
+    except Exception as e:
+        await _log_opened_on_error(req)
+        raise HTTPException(status_code=500, detail=f"AI chat error: {str(e)}")
+
+
+@router.post("/ai-chat/stream")
+async def ai_chat_stream(req: AIChatRequest):
+    try:
+        events = await stream_ai_chat(req)
+    except HTTPException:
+        await _log_opened_on_error(req)
         raise
     except Exception as e:
+        await _log_opened_on_error(req)
         raise HTTPException(status_code=500, detail=f"AI chat error: {str(e)}")
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(log_intake_event, req.intake_id, "ai_assistant_opened", req.topic or "general"),
+    )
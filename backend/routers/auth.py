@@ -129,6 +129,7 @@ def email_test(x_admin_key: str = Header(None)):
         "CAL email test",
         "If you received this, outbound email is configured correctly on Render.",
         "<p>If you received this, outbound email is configured correctly on Render.</p>",
+        defer=False,  # report the real Gmail result, not just "queued"
     )
     provider = email_provider_hint()
     if ok:
@@ -234,9 +235,9 @@ def delete_account(
         # Send deletion notification — failure must not block deletion
         try:
             try:
-                from ..services.gmail_service import send_email
+                from ..services.transactional_email import send_transactional_email
             except ImportError:
-                from services.gmail_service import send_email  # type: ignore
+                from services.transactional_email import send_transactional_email  # type: ignore
 
             subject = f"Account Deletion Notice — {full_name}"
             text_body = (
@@ -261,11 +262,11 @@ def delete_account(
                 f"<p><strong>Reason for deletion:</strong> {reason or 'Not provided'}</p>"
                 f"<p><em>This is an automated notification from Chicago Advocate Legal.</em></p>"
             )
-            ok = send_email(
+            ok = send_transactional_email(
                 to_email="intake@chicagoadvocatelegal.com",
                 subject=subject,
-                html_body=html_body,
                 text_body=text_body,
+                html_body=html_body,
             )
             if not ok:
                 logger.error("Account deletion email failed for intake_id=%s", intake_id)
@@ -1,19 +1,36 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
 try:
     from ..schemas.chat import ChatRequest, ChatResponse
     from ..services.config_service import REFERRAL_MAP_PATH
     from ..services.triage_service import load_json_file, run_chat_flow
+    from ..services.triage_session_store import resolve_request_state, save_state, session_state_enabled
+    from ..services.triage_steps import render_chat_body
 except ImportError:
     from schemas.chat import ChatRequest, ChatResponse  # type: ignore
     from services.config_service import REFERRAL_MAP_PATH  # type: ignore
     from services.triage_service import load_json_file, run_chat_flow  # type: ignore
+    from services.triage_session_store import resolve_request_state, save_state, session_state_enabled  # type: ignore
+    from services.triage_steps import render_chat_body  # type: ignore
 
 router = APIRouter()
 
 
-@router.post("/chat", response_model=ChatResponse)
+class TriageJSONResponse(JSONResponse):
+    """Renders run_chat_flow results in the ChatResponse shape without a Pydantic round trip."""
+
+    def render(self, content) -> bytes:
+        return render_chat_body(content)
+
+
+@router.post("/chat", response_model=ChatResponse, response_class=TriageJSONResponse)
 def chat_endpoint(request: ChatRequest):
     referral_map = load_json_file(REFERRAL_MAP_PATH)
+    server_state = session_state_enabled()
+    if server_state:
+        request.conversation_state = resolve_request_state(request.session_token, request.conversation_state)
     result = run_chat_flow(request=request, referral_map=referral_map)
-    return ChatResponse(**result)
+    if server_state:
+        result["session_token"] = save_state(result["conversation_state"])
+    return TriageJSONResponse(result)
@@ -1,23 +1,27 @@
+import hmac
 import os
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 
 try:
     from ..services.config_service import (
         REFERRAL_MAP_PATH,
         REFERRAL_OFFICE_GEO_PATH,
         TRIAGE_QUESTIONS_PATH,
-        groq_configured,
     )
     from ..services.intake_service import engine
+    from ..services.llm_provider import llm_configured
+    from ..services.request_metrics import METRICS_TOKEN, render_prometheus
 except ImportError:
     from services.config_service import (  # type: ignore
         REFERRAL_MAP_PATH,
         REFERRAL_OFFICE_GEO_PATH,
         TRIAGE_QUESTIONS_PATH,
-        groq_configured,
     )
     from services.intake_service import engine  # type: ignore
+    from services.llm_provider import llm_configured  # type: ignore
+    from services.request_metrics import METRICS_TOKEN, render_prometheus  # type: ignore
 
 router = APIRouter()
 
@@ -29,8 +33,10 @@ def read_root():
         "status": "active",
         "endpoints": [
             "/health",
+            "/metrics",
             "/chat",
             "/ai-chat",
+            "/ai-chat/stream",
             "/intake/start",
             "/intake/event",
             "/intake/submissions",
@@ -79,7 +85,7 @@ def health_check():
         },
         "features": {
             "triage_chatbot": True,
-            "ai_assistant": groq_configured,
+            "ai_assistant": llm_configured(),
             "crisis_detection": True,
             "progress_tracking": True,
             "intake_storage": bool(engine),
@@ -87,3 +93,13 @@ def health_check():
             "resource_hub": True,
         },
     }
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """Prometheus text format. When METRICS_TOKEN is set, scrapers must send it as a Bearer token."""
+    if METRICS_TOKEN:
+        auth = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(auth.encode("utf-8"), f"Bearer {METRICS_TOKEN}".encode("utf-8")):
+            raise HTTPException(status_code=401, detail="Unauthorized")
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -4,13 +4,14 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from fastapi import APIRouter, File, Form, Header, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 
 try:
     from ..schemas.documents import DocumentEmailRequest
     from ..services.evidence_service import (
         assert_client_intake_access,
         assert_evidence_upload_allowed,
-        extract_text_for_file,
+        extract_text_from_stream,
         generate_ai_evidence_summary,
         get_evidence_file_for_admin,
         get_evidence_list_for_client,
@@ -18,13 +19,15 @@ try:
         _extract_key_facts_timeline,
     )
     from ..services.intake_service import log_intake_event
+    from ..services.storage_service import get_evidence_storage
+    from ..services.tracing import span
     from ..services.transactional_email import send_transactional_email
 except ImportError:
     from schemas.documents import DocumentEmailRequest  # type: ignore
     from services.evidence_service import (  # type: ignore
         assert_client_intake_access,
         assert_evidence_upload_allowed,
-        extract_text_for_file,
+        extract_text_from_stream,
         generate_ai_evidence_summary,
         get_evidence_file_for_admin,
         get_evidence_list_for_client,
@@ -32,6 +35,8 @@ except ImportError:
         _extract_key_facts_timeline,
     )
     from services.intake_service import log_intake_event  # type: ignore
+    from services.storage_service import get_evidence_storage  # type: ignore
+    from services.tracing import span  # type: ignore
     from services.transactional_email import send_transactional_email  # type: ignore
 
 router = APIRouter()
@@ -46,7 +51,24 @@ ALLOWED_MIME_BY_EXTENSION = {
     ".docx": {"application/vnd.openxmlformats-officedocument.wordprocessingml.document"},
     ".txt": {"text/plain"},
 }
-UPLOAD_ROOT = Path(__file__).resolve().parents[1] / "uploads" / "documents"
+UPLOAD_CHUNK_BYTES = 256 * 1024
+
+
+def _spooled_size(fileobj) -> int:
+    pos = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(pos)
+    return size
+
+
+def _iter_upload_chunks(fileobj):
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        yield chunk
 
 
 def _looks_like_expected_file(content: bytes, ext: str) -> bool:
@@ -125,8 +147,8 @@ async def upload_supporting_document(
             detail="Unsupported file type. Allowed: PDF, PNG, JPG, DOC, DOCX, TXT.",
         )
 
-    content = await file.read()
-    size = len(content or b"")
+    # Starlette has already spooled the multipart body; measure it without loading it into memory.
+    size = _spooled_size(file.file)
     if size <= 0:
         raise HTTPException(status_code=400, detail="Uploaded file is empty")
     if size > MAX_UPLOAD_BYTES:
@@ -138,7 +160,9 @@ async def upload_supporting_document(
             status_code=400,
             detail=f"File type mismatch. Expected {', '.join(sorted(allowed_mimes))}.",
         )
-    if not _looks_like_expected_file(content, ext):
+    head = await file.read(16)
+    await file.seek(0)
+    if not _looks_like_expected_file(head, ext):
         raise HTTPException(status_code=400, detail="File content does not match the selected file type.")
 
     safe_base = Path(original_name).stem
@@ -147,15 +171,20 @@ async def upload_supporting_document(
         safe_base = "document"
     assert_evidence_upload_allowed(intake_value, size)
 
-    UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
+    storage = get_evidence_storage()
     saved_name = f"{os.urandom(10).hex()}_{safe_base[:80]}{ext}"
-    saved_path = UPLOAD_ROOT / saved_name
-    with open(saved_path, "wb") as out:
-        out.write(content)
-
+    with span("upload.store", **{"file.size": size}):
+        await run_in_threadpool(storage.save_stream, saved_name, _iter_upload_chunks(file.file))
     context = (document_context or "").strip()
-    extracted = extract_text_for_file(ext, content)
-    ai_summary = generate_ai_evidence_summary(extracted, language="en")
+    # OCR/PDF parsing is CPU-bound; keep it off the event loop. It reads the spooled upload (on disk above
+    # Starlette's 1 MB spool threshold) rather than a second in-memory copy.
+    with span("upload.extract", **{"file.extension": ext}) as extract_span:
+        extracted, extraction_timings = await run_in_threadpool(extract_text_from_stream, ext, file.file)
+        if extract_span is not None:
+            extract_span.attributes.update({f"extract.{stage}": value for stage, value in extraction_timings.items()})
+            extract_span.set_attribute("extract.chars", len(extracted))
+    with span("upload.summarize"):
+        ai_summary = await generate_ai_evidence_summary(extracted, language="en")
     if not ai_summary:
         ai_summary = (
             f"Evidence file uploaded: {original_name}. "
@@ -167,19 +196,25 @@ async def upload_supporting_document(
         "This summary is automatically generated for informational review only. "
         "Verify facts directly from the source file before legal use."
     )
-    evidence_id = save_evidence_record(
-        intake_id=intake_value,
-        original_name=original_name,
-        stored_name=saved_name,
-        extension=ext,
-        file_size=size,
-        mime_type=file.content_type or "",
-        document_context=context,
-        extracted_text=extracted,
-        ai_summary=ai_summary,
-        key_facts=key_facts,
-        safety_notice=safety_notice,
-    )
+    try:
+        with span("upload.save_record"):
+            evidence_id = save_evidence_record(
+                intake_id=intake_value,
+                original_name=original_name,
+                stored_name=saved_name,
+                extension=ext,
+                file_size=size,
+                mime_type=file.content_type or "",
+                document_context=context,
+                extracted_text=extracted,
+                ai_summary=ai_summary,
+                key_facts=key_facts,
+                safety_notice=safety_notice,
+            )
+    except Exception:
+        # Keep storage consistent with the DB when the record is rejected.
+        storage.delete(saved_name)
+        raise
     event_value = f"{saved_name}|{size}|{context[:120]}"
     log_intake_event(intake_value, "supporting_document_uploaded", event_value)
 
@@ -192,6 +227,7 @@ async def upload_supporting_document(
         "summary": ai_summary,
         "key_facts": key_facts[:6],
         "safety_notice": safety_notice,
+        "extraction_timings_ms": extraction_timings,
     }
 
 
@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, File, Query, Request, UploadFile
+from fastapi import APIRouter, Depends, File, Query, Request, Response, UploadFile
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 try:
@@ -12,6 +13,7 @@ try:
         ResourceSuggestionOut,
         ResourceUpdate,
     )
+    from ..services.resource_cache import etag_matches, get_or_load
     from ..services.resources_service import (
         create_resource,
         bulk_import_resources,
@@ -20,6 +22,7 @@ try:
         deactivate_resource,
         get_resource,
         get_resource_categories,
+        get_resource_import_job,
         list_resources,
         stale_resources,
         suggest_resources,
@@ -35,6 +38,7 @@ except ImportError:
         ResourceSuggestionOut,
         ResourceUpdate,
     )
+    from services.resource_cache import etag_matches, get_or_load  # type: ignore
     from services.resources_service import (  # type: ignore
         create_resource,
         bulk_import_resources,
@@ -43,6 +47,7 @@ except ImportError:
         deactivate_resource,
         get_resource,
         get_resource_categories,
+        get_resource_import_job,
         list_resources,
         stale_resources,
         suggest_resources,
@@ -52,9 +57,26 @@ except ImportError:
 
 router = APIRouter()
 
+_RESOURCE_LIST = TypeAdapter(List[ResourceOut])
+_RESOURCE_ONE = TypeAdapter(ResourceOut)
+_CATEGORY_LIST = TypeAdapter(List[str])
+_SUGGESTION_LIST = TypeAdapter(List[ResourceSuggestionOut])
+# Public catalog: any cache may store it, but must revalidate (cheap 304 via ETag) before reuse.
+_CATALOG_CACHE_CONTROL = "public, no-cache"
+
+
+def _cached_catalog_response(request: Request, key: Tuple, adapter: TypeAdapter, load: Callable[[], object]) -> Response:
+    # Validate like response_model would (drops extra keys, coerces types) before serializing once.
+    entry = get_or_load(key, lambda: adapter.dump_json(adapter.validate_python(load())))
+    headers = {"ETag": entry.etag, "Cache-Control": _CATALOG_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 
 @router.get("/resources", response_model=List[ResourceOut])
 def list_resources_endpoint(
+    request: Request,
     country: Optional[str] = None,
     state: Optional[str] = None,
     city: Optional[str] = None,
@@ -67,50 +89,66 @@ def list_resources_endpoint(
     offset: int = Query(default=0, ge=0),
     db: Session = Depends(get_db),
 ):
-    return list_resources(
-        db=db,
-        country=country,
-        state=state,
-        city=city,
-        category=category,
-        case_type=case_type,
-        language=language,
-        cost_type=cost_type,
-        q=q,
-        limit=limit,
-        offset=offset,
+    params = (country, state, city, category, case_type, language, cost_type, q, limit, offset)
+    return _cached_catalog_response(
+        request,
+        ("list", *params),
+        _RESOURCE_LIST,
+        lambda: list_resources(
+            db=db,
+            country=country,
+            state=state,
+            city=city,
+            category=category,
+            case_type=case_type,
+            language=language,
+            cost_type=cost_type,
+            q=q,
+            limit=limit,
+            offset=offset,
+        ),
     )
 
 
 @router.get("/resources/categories", response_model=List[str])
-def get_resource_categories_endpoint(db: Session = Depends(get_db)):
-    return get_resource_categories(db=db)
+def get_resource_categories_endpoint(request: Request, db: Session = Depends(get_db)):
+    return _cached_catalog_response(request, ("categories",), _CATEGORY_LIST, lambda: get_resource_categories(db=db))
 
 
 @router.get("/resources/suggested", response_model=List[ResourceSuggestionOut])
 def suggest_resources_endpoint(
+    request: Request,
     country: Optional[str] = None,
     state: Optional[str] = None,
     city: Optional[str] = None,
     case_type: Optional[str] = None,
     language: Optional[str] = None,
     limit: int = Query(default=10, ge=1, le=50),
+    zip_code: Optional[str] = Query(default=None, pattern=r"^\d{5}$"),
     db: Session = Depends(get_db),
 ):
-    return suggest_resources(
-        db=db,
-        country=country,
-        state=state,
-        city=city,
-        case_type=case_type,
-        language=language,
-        limit=limit,
+    return _cached_catalog_response(
+        request,
+        ("suggested", country, state, city, case_type, language, limit, zip_code),
+        _SUGGESTION_LIST,
+        lambda: suggest_resources(
+            db=db,
+            country=country,
+            state=state,
+            city=city,
+            case_type=case_type,
+            language=language,
+            limit=limit,
+            zip_code=zip_code,
+        ),
     )
 
 
 @router.get("/resources/{resource_id}", response_model=ResourceOut)
-def get_resource_endpoint(resource_id: int, db: Session = Depends(get_db)):
-    return get_resource(resource_id=resource_id, db=db)
+def get_resource_endpoint(resource_id: int, request: Request, db: Session = Depends(get_db)):
+    return _cached_catalog_response(
+        request, ("one", resource_id), _RESOURCE_ONE, lambda: get_resource(resource_id=resource_id, db=db)
+    )
 
 
 @router.post("/admin/resources", response_model=ResourceOut)
@@ -124,16 +162,24 @@ def bulk_import_resources_endpoint(payload: List[ResourceCreate], request: Reque
 
 
 @router.post("/admin/resources/bulk-import/csv", response_model=ResourceBulkImportResult)
-async def bulk_import_resources_csv_endpoint(
+def bulk_import_resources_csv_endpoint(
     request: Request,
     file: UploadFile = File(...),
+    job_id: Optional[str] = Query(default=None, max_length=64),
     db: Session = Depends(get_db),
 ):
+    # Sync on purpose: the import streams from the spooled upload and blocks on the DB, so it runs in the threadpool.
     filename = (file.filename or "").lower()
     if not filename.endswith(".csv"):
         return {"created_count": 0, "skipped_count": 0, "errors": ["Only .csv files are supported"]}
-    content = await file.read()
-    return bulk_import_resources_csv(csv_bytes=content, request=request, db=db)
+    return bulk_import_resources_csv(
+        stream=file.file, request=request, db=db, filename=file.filename, job_id=job_id
+    )
+
+
+@router.get("/admin/resources/bulk-import/jobs/{job_id}", response_model=ResourceBulkImportResult)
+def get_resource_import_job_endpoint(job_id: str, request: Request, db: Session = Depends(get_db)):
+    return get_resource_import_job(job_id=job_id, request=request, db=db)
 
 
 @router.get("/admin/resources/bulk-import/template.csv")
@@ -10,6 +10,7 @@ from .ai import AIChatRequest, AIChatResponse
 from .resources import (
     ResourceBulkImportResult,
     ResourceCreate,
+    ResourceImportRowResult,
     ResourceOut,
     ResourceSuggestionOut,
     ResourceUpdate,
@@ -30,4 +31,5 @@ __all__ = [
     "ResourceSuggestionOut",
     "ResourceUpdate",
     "ResourceBulkImportResult",
+    "ResourceImportRowResult",
 ]
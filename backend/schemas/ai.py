@@ -13,3 +13,4 @@ class AIChatRequest(BaseModel):
 class AIChatResponse(BaseModel):
     response: str
     usage: dict = Field(default_factory=dict)
+    cache: dict = Field(default_factory=dict)
@@ -8,6 +8,8 @@ class ChatRequest(BaseModel):
     conversation_state: dict = Field(default_factory=dict)
     language: Optional[str] = "en"
     intake_id: Optional[str] = None
+    # Sent instead of conversation_state when the server keeps triage state (TRIAGE_SESSION_STORE).
+    session_token: Optional[str] = Field(default=None, max_length=128)
 
 
 class ChatResponse(BaseModel):
@@ -19,3 +21,4 @@ class ChatResponse(BaseModel):
     decision_support: dict = Field(default_factory=dict)
     conversation_state: dict = Field(default_factory=dict)
     progress: dict = Field(default_factory=dict)
+    session_token: Optional[str] = None
@@ -1,7 +1,10 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+
+# Match the value columns of resource_case_types / resource_languages (models/resources.py).
+TAG_MAX_LENGTHS = {"case_types": 80, "languages": 40}
 
 
 def normalize_string_list(values: Optional[List[str]]) -> List[str]:
@@ -10,6 +13,15 @@ def normalize_string_list(values: Optional[List[str]]) -> List[str]:
     return [str(v).strip() for v in values if str(v).strip()]
 
 
+def validate_tag_list(values: Optional[List[str]], field_name: str) -> List[str]:
+    cleaned = normalize_string_list(values)
+    limit = TAG_MAX_LENGTHS[field_name]
+    for value in cleaned:
+        if len(value) > limit:
+            raise ValueError(f"Each {field_name} entry must be at most {limit} characters")
+    return cleaned
+
+
 class ResourceCreate(BaseModel):
     title: str = Field(min_length=2, max_length=255)
     category: str = Field(min_length=2, max_length=80)
@@ -47,8 +59,8 @@ class ResourceCreate(BaseModel):
 
     @field_validator("case_types", "languages")
     @classmethod
-    def validate_lists(cls, value: List[str]) -> List[str]:
-        return normalize_string_list(value)
+    def validate_lists(cls, value: List[str], info: ValidationInfo) -> List[str]:
+        return validate_tag_list(value, info.field_name)
 
 
 class ResourceUpdate(BaseModel):
@@ -93,10 +105,10 @@ class ResourceUpdate(BaseModel):
 
     @field_validator("case_types", "languages")
     @classmethod
-    def validate_optional_lists(cls, value: Optional[List[str]]) -> Optional[List[str]]:
+    def validate_optional_lists(cls, value: Optional[List[str]], info: ValidationInfo) -> Optional[List[str]]:
         if value is None:
             return value
-        return normalize_string_list(value)
+        return validate_tag_list(value, info.field_name)
 
 
 class ResourceOut(BaseModel):
@@ -137,9 +149,21 @@ class ResourceSuggestionOut(BaseModel):
     resource: ResourceOut
     match_reasons: List[str] = Field(default_factory=list)
     last_verified_days_ago: int
+    distance_miles: Optional[float] = None
+
+
+class ResourceImportRowResult(BaseModel):
+    row: int
+    status: str
+    resource_id: Optional[int] = None
+    detail: Optional[str] = None
 
 
 class ResourceBulkImportResult(BaseModel):
+    job_id: Optional[str] = None
+    status: Optional[str] = None
+    rows_processed: Optional[int] = None
     created_count: int
     skipped_count: int
     errors: List[str] = Field(default_factory=list)
+    results: List[ResourceImportRowResult] = Field(default_factory=list)
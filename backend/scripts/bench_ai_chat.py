@@ -0,0 +1,91 @@
+"""
+Offline latency/throughput benchmark for the AI assistant path. Run from the backend folder:
+
+  python scripts/bench_ai_chat.py --requests 500 --concurrency 50
+  LLM_LOCAL_LATENCY_MS=400 LLM_LOCAL_TOKENS_PER_SECOND=300 python scripts/bench_ai_chat.py --stream
+
+Defaults to LLM_PROVIDER=local (no network) and disables the response cache so every request
+exercises prompt budgeting, the provider layer and SSE framing. Set LLM_PROVIDER=openai_compat
+to measure a local llama.cpp server instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LLM_PROVIDER", "local")
+os.environ.setdefault("AI_CACHE_SIZE", "0")
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from schemas.ai import AIChatRequest  # noqa: E402
+from services.ai_service import run_ai_chat, stream_ai_chat  # noqa: E402
+
+
+def _request(i: int, turns: int) -> AIChatRequest:
+    messages = []
+    for t in range(turns):
+        messages.append({"role": "user", "content": f"Question {t} about my eviction hearing and court dates?"})
+        messages.append({"role": "assistant", "content": "Here is general information about Illinois eviction court. " * 8})
+    messages.append({"role": "user", "content": f"How do I respond to an eviction notice? (#{i})"})
+    return AIChatRequest(messages=messages, topic="eviction", language="en")
+
+
+async def _one(i: int, args) -> float:
+    req = _request(i, args.turns)
+    started = time.perf_counter()
+    if args.stream:
+        events = await stream_ai_chat(req)
+        async for _ in events:
+            pass
+    else:
+        await run_ai_chat(req)
+    return (time.perf_counter() - started) * 1000
+
+
+async def _run(args) -> list:
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def _bounded(i: int) -> float:
+        async with sem:
+            return await _one(i, args)
+
+    return await asyncio.gather(*[_bounded(i) for i in range(args.requests)])
+
+
+def _pct(sorted_values: list, p: float) -> float:
+    idx = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=3, help="prior user/assistant turns per request")
+    parser.add_argument("--stream", action="store_true", help="benchmark /ai-chat/stream instead of /ai-chat")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    latencies = sorted(asyncio.run(_run(args)))
+    wall = time.perf_counter() - started
+
+    print(f"provider={os.getenv('LLM_PROVIDER')} mode={'stream' if args.stream else 'complete'} "
+          f"requests={args.requests} concurrency={args.concurrency} turns={args.turns}")
+    print(f"p50={_pct(latencies, 50):.2f}ms p95={_pct(latencies, 95):.2f}ms p99={_pct(latencies, 99):.2f}ms "
+          f"mean={statistics.fmean(latencies):.2f}ms")
+    print(f"throughput={args.requests / wall:.1f} req/s wall={wall:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,356 @@
+"""
+End-to-end /chat benchmark. Run from the backend folder:
+
+  python scripts/bench_chat.py                         # 400 conversations, temp SQLite DB
+  python scripts/bench_chat.py --conversations 2000 --json bench_chat.json
+  python scripts/bench_chat.py --save conversations.jsonl   # replay later with bench_triage_flow.py
+
+Generates multi-turn conversations across every topic, English and Spanish, with topic redirects, summary and
+ZIP topic mismatches, ZIP skips, invalid answers and crisis text. Every conversation has an intake, so event
+logging writes to intake_events / triage_sessions like production. The same conversations are driven twice:
+
+  direct  run_chat_flow + render_chat_body
+  asgi    POST /chat through the FastAPI app in-process (httpx.ASGITransport), including request parsing
+
+Reports p50/p95/p99 latency per step (the step being answered) and SQL statements per turn, then exits
+non-zero if a --max-* threshold is exceeded, so it can gate CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+_parser.add_argument("--conversations", type=int, default=400)
+_parser.add_argument("--seed", type=int, default=47)
+_parser.add_argument("--skip-asgi", action="store_true")
+# Defaults are roughly 2x what a laptop measures today (worst step is get_zip: ~6 ms p95, ~15 statements).
+_parser.add_argument("--max-p95-ms", type=float, default=15.0, help="direct: worst per-step p95")
+_parser.add_argument("--max-asgi-p95-ms", type=float, default=25.0, help="asgi: worst per-step p95")
+_parser.add_argument("--max-statements-per-turn", type=float, default=6.0, help="mean SQL statements per turn")
+_parser.add_argument("--max-step-statements", type=int, default=20, help="most SQL statements in any single turn")
+_parser.add_argument("--json", help="write the report to this file")
+_parser.add_argument("--save", help="write the generated conversations as JSONL")
+ARGS = _parser.parse_args()
+
+_tmp_db = os.path.join(tempfile.mkdtemp(prefix="bench_chat_"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_db}"
+os.environ["TRIAGE_SESSION_STORE"] = ""
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from database import SessionLocal, engine  # noqa: E402
+from main import app, startup_event  # noqa: E402
+from models import Intake  # noqa: E402
+from schemas.chat import ChatRequest  # noqa: E402
+from services.config_service import REFERRAL_MAP_PATH  # noqa: E402
+from services.triage_service import load_json_file, run_chat_flow  # noqa: E402
+from services.triage_steps import render_chat_body  # noqa: E402
+
+TOPICS = ["child_support", "education", "housing", "divorce", "custody"]
+TOPIC_CHOICES = {
+    "child_support": ["child_support", "child support", "my ex stopped paying child support"],
+    "education": ["education", "school", "my son has an iep at school"],
+    "housing": ["housing", "my landlord", "eviction"],
+    "divorce": ["divorce", "i want a divorce"],
+    "custody": ["custody", "visitation with my kids"],
+}
+SUMMARIES = {
+    "en": {
+        "child_support": "My ex has not paid child support for six months and the support order says monthly.",
+        "education": "The school suspended my son for ten days and will not hold a meeting about his IEP.",
+        "housing": "My landlord gave me an eviction notice after I asked him to fix the mold in the apartment.",
+        "divorce": "My spouse and I have been separated for a year and I want to file for divorce.",
+        "custody": "I need a parenting time schedule so I can see my child every other weekend.",
+    },
+    "es": {
+        "child_support": "Mi ex no ha pagado la manutencion de mis hijos en seis meses y no se que hacer.",
+        "education": "La escuela suspendio a mi hijo por diez dias y no quieren reunirse conmigo.",
+        "housing": "Mi arrendador me dio un aviso de desalojo despues de pedirle que arreglara el moho.",
+        "divorce": "Mi esposo y yo estamos separados hace un ano y quiero pedir el divorcio pronto.",
+        "custody": "Necesito un horario de visitas para poder ver a mis hijos cada fin de semana.",
+    },
+}
+SKIP_PHRASES = {"en": ["skip", "I can't find my zip", "not sure"], "es": ["saltar", "no lo sé", "omitir"]}
+ZIPS = ["60601", "60625", "60649", "60201", "61101", "61602", "62701", "62901", "60505", "60040"]
+INVALID = ["maybe", "idk", "what?", "k"]
+SCENARIOS = ["direct", "summary_mismatch", "redirect", "zip_mismatch", "zip_skip", "invalid_answers", "crisis"]
+MAX_TURNS = 24
+
+
+def _other_topic(rng: random.Random, topic: str) -> str:
+    return rng.choice([t for t in TOPICS if t != topic])
+
+
+def _next_message(rng: random.Random, plan: dict, state: dict, options: List[str]) -> Optional[str]:
+    """The user's next message for `plan`, or None when the conversation is over."""
+    step = state.get("step")
+    used = plan["used"]
+    if not state:
+        return "start"
+    if step == "topic_selection":
+        return rng.choice(TOPIC_CHOICES[plan["topic"]])
+    if step in ("emergency_check", "court_status", "income_check"):
+        if plan["scenario"] == "redirect" and not used.get("redirect") and step == "court_status":
+            used["redirect"] = True
+            plan["topic"] = _other_topic(rng, plan["topic"])
+            return SUMMARIES["en"][plan["topic"]]
+        if plan["scenario"] == "crisis" and not used.get("crisis"):
+            used["crisis"] = True
+            return "I am scared he will hurt me again"
+        if plan["scenario"] == "invalid_answers" and rng.random() < 0.4:
+            return rng.choice(INVALID)
+        return rng.choice([o for o in options if o != "restart"] or ["no"])
+    if step == "problem_summary":
+        if plan["scenario"] == "invalid_answers" and not used.get("short_summary"):
+            used["short_summary"] = True
+            return "need lawyer"
+        if plan["scenario"] == "summary_mismatch" and not used.get("summary_mismatch"):
+            used["summary_mismatch"] = True
+            return SUMMARIES["en"][_other_topic(rng, plan["topic"])]
+        return SUMMARIES[plan["language"]][plan["topic"]]
+    if step in ("summary_topic_confirm", "topic_reconfirm"):
+        choice = rng.choice(options)
+        if choice == "summary_topic_change":
+            plan["topic"] = state.get("summary_inferred_topic") or state.get("reconfirm_inferred_topic") or plan["topic"]
+        return choice if rng.random() < 0.8 else choice.replace("_", " ")
+    if step == "get_zip":
+        if plan["scenario"] == "zip_mismatch" and not used.get("zip_mismatch"):
+            used["zip_mismatch"] = True
+            return SUMMARIES["en"][_other_topic(rng, plan["topic"])]
+        if plan["scenario"] == "zip_skip":
+            return rng.choice(SKIP_PHRASES[plan["language"]])
+        return rng.choice(ZIPS)
+    if step == "complete":
+        if used.get("finished"):
+            return None
+        used["finished"] = True
+        return rng.choice(["connect", "continue", "restart", "connect"])
+    if step == "continue_check":
+        return rng.choice(["yes", "no"])
+    return None
+
+
+def generate_conversations(count: int, seed: int) -> List[dict]:
+    """Conversations as {"scenario", "language", "messages"}; recorded by simulating the flow without an intake."""
+    rng = random.Random(seed)
+    referral_map = load_json_file(REFERRAL_MAP_PATH)
+    conversations = []
+    for i in range(count):
+        plan = {
+            "scenario": SCENARIOS[i % len(SCENARIOS)],
+            "language": "es" if rng.random() < 0.3 else "en",
+            "topic": TOPICS[(i // len(SCENARIOS)) % len(TOPICS)],
+            "used": {},
+        }
+        messages: List[str] = []
+        state: dict = {}
+        options: List[str] = []
+        while len(messages) < MAX_TURNS:
+            message = _next_message(rng, plan, state, options)
+            if message is None:
+                break
+            messages.append(message)
+            result = run_chat_flow(ChatRequest(message=message, conversation_state=state, language=plan["language"]), referral_map)
+            state, options = result["conversation_state"], result["options"]
+            if state.get("step") == "resource_selected":
+                break
+        conversations.append({"scenario": plan["scenario"], "language": plan["language"], "messages": messages})
+    return conversations
+
+
+def _seed_intakes(count: int, prefix: str) -> List[str]:
+    ids = [f"{prefix}-{i:06d}" for i in range(count)]
+    db = SessionLocal()
+    try:
+        db.add_all(
+            Intake(
+                id=intake_id,
+                first_name="Bench",
+                last_name="User",
+                email=f"{intake_id}@example.org",
+                phone="3125550100",
+                zip="60601",
+                created_at="2026-01-01T00:00:00+00:00",
+            )
+            for intake_id in ids
+        )
+        db.commit()
+    finally:
+        db.close()
+    return ids
+
+
+class _Recorder:
+    """Per-step latency samples and SQL statement counts for one mode."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.statements: Dict[str, List[int]] = defaultdict(list)
+
+    def add(self, step: str, millis: float, statements: int) -> None:
+        self.samples[step].append(millis)
+        self.statements[step].append(statements)
+
+    @staticmethod
+    def _pct(ordered: List[float], q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def report(self) -> dict:
+        steps = {}
+        for step in sorted(self.samples, key=lambda s: -len(self.samples[s])):
+            ordered = sorted(self.samples[step])
+            steps[step] = {
+                "turns": len(ordered),
+                "p50_ms": round(self._pct(ordered, 0.50), 3),
+                "p95_ms": round(self._pct(ordered, 0.95), 3),
+                "p99_ms": round(self._pct(ordered, 0.99), 3),
+                "statements_per_turn": round(sum(self.statements[step]) / len(ordered), 2),
+                "max_statements": max(self.statements[step]),
+            }
+        everything = sorted(v for values in self.samples.values() for v in values)
+        statements = [n for values in self.statements.values() for n in values]
+        return {
+            "turns": len(everything),
+            "p50_ms": round(self._pct(everything, 0.50), 3),
+            "p95_ms": round(self._pct(everything, 0.95), 3),
+            "p99_ms": round(self._pct(everything, 0.99), 3),
+            "statements_per_turn": round(sum(statements) / len(statements), 2),
+            "max_statements": max(statements),
+            "worst_step_p95_ms": max(s["p95_ms"] for s in steps.values()),
+            "steps": steps,
+        }
+
+
+class _StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *_args, **_kwargs) -> None:
+        self.count += 1
+
+
+def _run_direct(conversations: List[dict], intake_ids: List[str], counter: _StatementCounter) -> _Recorder:
+    recorder = _Recorder()
+    referral_map = load_json_file(REFERRAL_MAP_PATH)
+    for conversation, intake_id in zip(conversations, intake_ids):
+        state: dict = {}
+        for message in conversation["messages"]:
+            step = state.get("step") or "start"
+            request = ChatRequest(
+                message=message, conversation_state=state, language=conversation["language"], intake_id=intake_id
+            )
+            before = counter.count
+            started = time.perf_counter()
+            result = run_chat_flow(request, referral_map)
+            render_chat_body(result)
+            recorder.add(step, (time.perf_counter() - started) * 1000, counter.count - before)
+            state = result["conversation_state"]
+    return recorder
+
+
+async def _run_asgi(conversations: List[dict], intake_ids: List[str], counter: _StatementCounter) -> _Recorder:
+    recorder = _Recorder()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for conversation, intake_id in zip(conversations, intake_ids):
+            state: dict = {}
+            for message in conversation["messages"]:
+                step = state.get("step") or "start"
+                payload = {
+                    "message": message,
+                    "conversation_state": state,
+                    "language": conversation["language"],
+                    "intake_id": intake_id,
+                }
+                before = counter.count
+                started = time.perf_counter()
+                response = await client.post("/chat", json=payload)
+                elapsed = (time.perf_counter() - started) * 1000
+                response.raise_for_status()
+                recorder.add(step, elapsed, counter.count - before)
+                state = response.json()["conversation_state"]
+    return recorder
+
+
+def _print_report(mode: str, report: dict) -> None:
+    print(f"\n{mode}: {report['turns']} turns, p50 {report['p50_ms']:.2f} / p95 {report['p95_ms']:.2f} / "
+          f"p99 {report['p99_ms']:.2f} ms, {report['statements_per_turn']:.2f} SQL statements/turn")
+    print(f"  {'step':<22}{'turns':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'stmts':>8}{'max':>5}")
+    for step, row in report["steps"].items():
+        print(
+            f"  {step:<22}{row['turns']:>7}{row['p50_ms']:>9.3f}{row['p95_ms']:>9.3f}{row['p99_ms']:>9.3f}"
+            f"{row['statements_per_turn']:>8.2f}{row['max_statements']:>5}"
+        )
+
+
+def main() -> int:
+    startup_event()
+    conversations = generate_conversations(ARGS.conversations, ARGS.seed)
+    if ARGS.save:
+        with open(ARGS.save, "w", encoding="utf-8") as f:
+            for conversation in conversations:
+                f.write(json.dumps(conversation, ensure_ascii=False) + "\n")
+    scenarios = defaultdict(int)
+    for conversation in conversations:
+        scenarios[conversation["scenario"]] += 1
+    print(
+        f"{len(conversations)} conversations, {sum(len(c['messages']) for c in conversations)} turns "
+        f"({', '.join(f'{k}={v}' for k, v in sorted(scenarios.items()))}); SQLite at {_tmp_db}"
+    )
+
+    counter = _StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        direct_ids = _seed_intakes(len(conversations), "bench-direct")
+        report = {"direct": _run_direct(conversations, direct_ids, counter).report()}
+        _print_report("direct", report["direct"])
+        if not ARGS.skip_asgi:
+            asgi_ids = _seed_intakes(len(conversations), "bench-asgi")
+            report["asgi"] = asyncio.run(_run_asgi(conversations, asgi_ids, counter)).report()
+            _print_report("asgi", report["asgi"])
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+    failures = []
+    if report["direct"]["worst_step_p95_ms"] > ARGS.max_p95_ms:
+        failures.append(f"direct worst-step p95 {report['direct']['worst_step_p95_ms']:.2f} ms > {ARGS.max_p95_ms} ms")
+    if "asgi" in report and report["asgi"]["worst_step_p95_ms"] > ARGS.max_asgi_p95_ms:
+        failures.append(f"asgi worst-step p95 {report['asgi']['worst_step_p95_ms']:.2f} ms > {ARGS.max_asgi_p95_ms} ms")
+    if report["direct"]["statements_per_turn"] > ARGS.max_statements_per_turn:
+        failures.append(
+            f"{report['direct']['statements_per_turn']:.2f} SQL statements/turn > {ARGS.max_statements_per_turn}"
+        )
+    if report["direct"]["max_statements"] > ARGS.max_step_statements:
+        failures.append(f"a turn ran {report['direct']['max_statements']} SQL statements > {ARGS.max_step_statements}")
+    report["failures"] = failures
+    if ARGS.json:
+        with open(ARGS.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    print()
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+"""
+Benchmark the resource KD-tree in services/geo_service.py (used by /resources/suggested?zip_code=).
+Run from the backend folder:
+
+  python scripts/bench_nearest.py
+  python scripts/bench_nearest.py --points 50000 --queries 5000
+
+Checks the tree against a brute-force scan, then times k-nearest queries over synthetic Illinois points.
+Exits non-zero if the p95 query exceeds --target-ms.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from services.geo_service import GeoPoint, KDTree, haversine_miles  # noqa: E402
+
+
+def _p95(samples: list) -> float:
+    ordered = sorted(samples)
+    return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    points = [GeoPoint(i, rng.uniform(37.0, 42.5), rng.uniform(-91.5, -87.5)) for i in range(args.points)]
+    started = time.perf_counter()
+    tree = KDTree(points)
+    print(f"built tree over {len(tree)} points in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    for _ in range(20):
+        lat, lng = rng.uniform(37.0, 42.5), rng.uniform(-91.5, -87.5)
+        expected = sorted(points, key=lambda p: haversine_miles(lat, lng, p.latitude, p.longitude))[: args.k]
+        if [p.key for p, _ in tree.nearest(lat, lng, k=args.k)] != [p.key for p in expected]:
+            print("FAILED: KD-tree result differs from brute force")
+            return 1
+
+    samples = []
+    for _ in range(args.queries):
+        lat, lng = rng.uniform(37.0, 42.5), rng.uniform(-91.5, -87.5)
+        t0 = time.perf_counter()
+        tree.nearest(lat, lng, k=args.k)
+        samples.append((time.perf_counter() - t0) * 1000)
+    p95 = _p95(samples)
+
+    print(f"k={args.k}: p95 {p95:.3f} ms")
+    ok = p95 <= args.target_ms
+    print(f"{'OK' if ok else 'FAILED'} (target {args.target_ms:.1f} ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+"""
+Benchmark the admin bulk resource import. Run from the backend folder:
+
+  python scripts/bench_resource_import.py                   # 5,000 rows, ~10% duplicates, temp SQLite DB
+  python scripts/bench_resource_import.py --rows 20000 --use-env   # import into DATABASE_URL (Postgres)
+
+Reports rows/sec and the number of SQL statements sent per import. --use-env writes rows with
+source_name='bench-import' into the configured database and removes them afterwards; never point it at production.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+_parser.add_argument("--rows", type=int, default=5000)
+_parser.add_argument("--duplicate-ratio", type=float, default=0.1)
+_parser.add_argument("--use-env", action="store_true", help="use DATABASE_URL instead of a temp SQLite file")
+ARGS = _parser.parse_args()
+
+if not ARGS.use_env:
+    _tmp_db = os.path.join(tempfile.mkdtemp(prefix="resource_import_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_db}"
+os.environ.setdefault("ADMIN_EXPORT_KEY", "bench-import-key")
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from sqlalchemy import event, text  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from database import SessionLocal, engine, init_db  # noqa: E402
+from schemas.resources import ResourceCreate  # noqa: E402
+from services.resource_search import ensure_resource_search_index  # noqa: E402
+from services.resources_service import bulk_import_resources  # noqa: E402
+
+CASE_TYPES = ["housing", "custody", "divorce", "child_support", "education", "immigration"]
+LANGUAGES = ["english", "spanish", "polish", "arabic"]
+
+
+def _payloads(rows: int) -> list:
+    rng = random.Random(7)
+    unique = int(rows * (1 - ARGS.duplicate_ratio))
+    payloads = [
+        ResourceCreate(
+            title=f"Bench Legal Clinic {i}",
+            category="legal_aid",
+            jurisdiction_country="US",
+            jurisdiction_state="IL",
+            jurisdiction_city=rng.choice(["Chicago", "Springfield", "Peoria"]),
+            case_types=rng.sample(CASE_TYPES, 2),
+            languages=rng.sample(LANGUAGES, 2),
+            description="Free legal help for tenants, parents and students.",
+            source_name="bench-import",
+            source_url="https://example.org",
+            priority_score=rng.randint(0, 100),
+        )
+        for i in range(unique)
+    ]
+    payloads.extend(rng.choice(payloads[:unique]) for _ in range(rows - unique))
+    rng.shuffle(payloads)
+    return payloads
+
+
+def _admin_request() -> Request:
+    key = os.environ["ADMIN_EXPORT_KEY"].encode("utf-8")
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [(b"x-admin-key", key)]})
+
+
+def main() -> int:
+    init_db()
+    ensure_resource_search_index()
+    payloads = _payloads(ARGS.rows)
+
+    statements = 0
+
+    def _count(*_args, **_kwargs):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = bulk_import_resources(payloads=payloads, request=_admin_request(), db=db)
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+        db.close()
+        if ARGS.use_env:
+            with engine.begin() as conn:
+                conn.execute(text("DELETE FROM resources WHERE source_name = 'bench-import'"))
+
+    print(
+        f"{ARGS.rows} rows in {elapsed:.2f}s ({ARGS.rows / elapsed:,.0f} rows/s); "
+        f"created={result['created_count']} skipped={result['skipped_count']} errors={len(result['errors'])}; "
+        f"{statements} SQL statements ({engine.dialect.name})"
+    )
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+"""
+Benchmark /resources?q= full-text search against the old ILIKE scan. Run from the backend folder:
+
+  python scripts/bench_resource_search.py                 # throwaway SQLite DB with 50k rows
+  python scripts/bench_resource_search.py --rows 50000 --use-env   # seed into DATABASE_URL (Postgres)
+
+--use-env writes synthetic rows (source_name='bench') into the configured database and removes
+them afterwards; never point it at production.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+_parser.add_argument("--rows", type=int, default=50_000)
+_parser.add_argument("--iterations", type=int, default=50)
+_parser.add_argument("--target-ms", type=float, default=10.0)
+_parser.add_argument("--use-env", action="store_true", help="use DATABASE_URL instead of a temp SQLite file")
+ARGS = _parser.parse_args()
+
+if not ARGS.use_env:
+    _tmp_db = os.path.join(tempfile.mkdtemp(prefix="resource_search_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_db}"
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from sqlalchemy import or_, text  # noqa: E402
+
+from database import SessionLocal, engine, init_db  # noqa: E402
+from models.resources import Resource  # noqa: E402
+from services.resource_search import ensure_resource_search_index, search_mode  # noqa: E402
+from services.resources_service import list_resources  # noqa: E402
+
+WORDS = (
+    "legal aid clinic family housing eviction tenant landlord custody divorce school court help free advice "
+    "forms immigration veterans seniors disability benefits wage debt consumer bankruptcy domestic violence "
+    "protection order expungement records appeal guardianship probate estate will spanish interpreter"
+).split()
+QUERIES = ["eviction", "tenant landlord", "domestic violence protection", "expunge", "spanish interpreter", "zzzznomatch"]
+
+
+def _filler(rng: random.Random) -> str:
+    # Realistic text is mostly non-domain words; each row mentions only a few topics.
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+
+
+def _seed(rows: int) -> None:
+    rng = random.Random(42)
+    now = "2025-01-01 00:00:00"
+    batch = []
+    insert = text(
+        """
+        INSERT INTO resources (title, category, jurisdiction_country, jurisdiction_state, jurisdiction_city,
+          case_types, description, eligibility, languages, source_name, source_url, verified_at,
+          is_active, priority_score, created_at, updated_at)
+        VALUES (:title, 'legal_aid', 'US', 'IL', 'Chicago', '[]', :description, :eligibility, '[]',
+          'bench', 'https://example.org', :now, :active, :priority, :now, :now)
+        """
+    )
+    with engine.begin() as conn:
+        for i in range(rows):
+            batch.append(
+                {
+                    "title": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} Center {i}",
+                    "description": " ".join(
+                        [rng.choice(WORDS) for _ in range(4)] + [_filler(rng) for _ in range(36)]
+                    ),
+                    "eligibility": " ".join([rng.choice(WORDS)] + [_filler(rng) for _ in range(9)]),
+                    "now": now,
+                    "active": True,
+                    "priority": rng.randint(0, 100),
+                }
+            )
+            if len(batch) == 5000:
+                conn.execute(insert, batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert, batch)
+
+
+def _ilike_baseline(db, q: str):
+    like = f"%{q}%"
+    return (
+        db.query(Resource)
+        .filter(Resource.is_active.is_(True))
+        .filter(or_(Resource.title.ilike(like), Resource.description.ilike(like), Resource.eligibility.ilike(like)))
+        .order_by(Resource.priority_score.desc(), Resource.verified_at.desc(), Resource.title.asc())
+        .limit(20)
+        .all()
+    )
+
+
+def _time(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return sorted(samples)
+
+
+def main() -> int:
+    init_db()
+    ensure_resource_search_index()
+    started = time.perf_counter()
+    _seed(ARGS.rows)
+    print(f"seeded {ARGS.rows} rows in {time.perf_counter() - started:.1f}s; search mode: {search_mode()}")
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE resources"))
+
+    worst_p95 = 0.0
+    db = SessionLocal()
+    try:
+        for q in QUERIES:
+            fts = _time(lambda: list_resources(db=db, q=q, limit=20), ARGS.iterations)
+            base = _time(lambda: _ilike_baseline(db, q), max(5, ARGS.iterations // 5))
+            hits = len(list_resources(db=db, q=q, limit=20))
+            p95 = fts[int(0.95 * (len(fts) - 1))]
+            worst_p95 = max(worst_p95, p95)
+            print(
+                f"{q!r:32} hits={hits:2d} fts p50={statistics.median(fts):6.2f}ms p95={p95:6.2f}ms | "
+                f"ilike p50={statistics.median(base):7.2f}ms"
+            )
+    finally:
+        db.close()
+        if ARGS.use_env:
+            with engine.begin() as conn:
+                conn.execute(text("DELETE FROM resources WHERE source_name = 'bench'"))
+
+    ok = worst_p95 <= ARGS.target_ms
+    print(f"{'OK' if ok else 'FAILED'}: worst fts p95 {worst_p95:.2f}ms (target {ARGS.target_ms:.0f}ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+"""
+Retrieval latency benchmark for the /ai-chat grounding index. Run from the backend folder:
+
+  python scripts/bench_retrieval.py
+  python scripts/bench_retrieval.py --synthetic 20000 --queries 2000
+
+--synthetic adds generated resource documents on top of the real corpus to see how
+query latency scales with directory size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from services.retrieval_service import TOPIC_ALIASES, BM25Index, build_index  # noqa: E402
+
+QUERIES = [
+    ("housing", "How do I respond to an eviction notice from my landlord?"),
+    ("housing", "My landlord will not return my security deposit"),
+    ("child_support", "How is child support calculated in Illinois?"),
+    ("custody", "Can I change the parenting time schedule?"),
+    ("divorce", "How do I file for divorce without a lawyer in Cook County?"),
+    ("education", "My child was suspended from school, what are my rights?"),
+    ("", "free legal aid near Chicago for low income"),
+]
+WORDS = "legal aid clinic family housing eviction tenant custody divorce school court help free advice forms".split()
+
+
+def _synthetic_docs(n: int) -> list:
+    rng = random.Random(7)
+    topics = list(TOPIC_ALIASES)
+    docs = []
+    for i in range(n):
+        topic = rng.choice(topics)
+        body = " ".join(rng.choice(WORDS) for _ in range(30))
+        docs.append({
+            "id": f"synthetic:{i}", "source": "synthetic", "title": f"Synthetic {i}",
+            "topics": [topic], "text": f"Synthetic {i} {topic} {body}", "snippet": f"Synthetic {i}",
+        })
+    return docs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, default=0)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    base = build_index()
+    index = BM25Index(base.docs + _synthetic_docs(args.synthetic), base.fingerprint) if args.synthetic else base
+    build_ms = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    for i in range(args.queries):
+        topic, query = QUERIES[i % len(QUERIES)]
+        t0 = time.perf_counter()
+        index.search(query, topic=topic or None, k=args.k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))]
+
+    print(f"docs={len(index.docs)} terms={len(index.postings)} build={build_ms:.1f}ms")
+    print(f"queries={args.queries} p50={pct(50):.3f}ms p95={pct(95):.3f}ms p99={pct(99):.3f}ms "
+          f"mean={statistics.fmean(latencies):.3f}ms")
+    for topic, query in QUERIES[:3]:
+        hits = index.search(query, topic=topic or None, k=args.k)
+        print(f"  [{topic}] {query!r} -> {[h.title for h in hits]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+"""
+Replay recorded /chat conversations through the triage state machine (services/triage_machine.py).
+Run from the backend folder:
+
+  python scripts/bench_triage_flow.py
+  python scripts/bench_triage_flow.py --conversations recorded.jsonl --repeat 20
+
+--conversations is a JSONL file with one conversation per line: a list of user messages, or an object
+with a "messages" list (scripts/bench_chat.py --save writes this format). Each turn feeds the previous
+reply's conversation_state back in, as the frontend does. Without a file, conversations are generated by walking the reply options (mismatch, redirect,
+ZIP-skip and restart paths included). Events are not written (no intake_id), so this measures the flow
+and reply rendering only. Exits non-zero below --min-turns-per-sec.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from schemas.chat import ChatRequest  # noqa: E402
+from services.config_service import REFERRAL_MAP_PATH  # noqa: E402
+from services.triage_service import load_json_file, run_chat_flow  # noqa: E402
+from services.triage_steps import render_chat_body  # noqa: E402
+
+_REFERRAL_MAP = load_json_file(REFERRAL_MAP_PATH)
+
+_SUMMARIES = [
+    "My landlord gave me an eviction notice and I need help with rent",
+    "My ex will not pay child support for our two kids anymore",
+    "The school suspended my daughter for ten days without a hearing",
+    "We want a divorce and need to split property",
+    "too short",
+]
+_ZIPS = ["60625", "62901", "61602", "skip", "I can't find my zip", "my zip is 60640 thanks", "abc"]
+_FREE_TEXT = ["hello", "my landlord is evicting me", "restart", "maybe", "I am not sure what to say"]
+
+
+def _generate(count: int, seed: int, max_turns: int = 14) -> List[List[str]]:
+    """Walk the flow choosing mostly offered options, like a user clicking through the UI."""
+    rng = random.Random(seed)
+    conversations = []
+    for _ in range(count):
+        messages, state, options = [], {}, []
+        for _ in range(max_turns):
+            step = state.get("step")
+            if step == "problem_summary":
+                message = rng.choice(_SUMMARIES)
+            elif step == "get_zip":
+                message = rng.choice(_ZIPS)
+            elif options and rng.random() < 0.85:
+                message = rng.choice(options)
+            else:
+                message = rng.choice(_FREE_TEXT)
+            messages.append(message)
+            result = run_chat_flow(ChatRequest(message=message, conversation_state=state), _REFERRAL_MAP)
+            state, options = result["conversation_state"], result["options"]
+        conversations.append(messages)
+    return conversations
+
+
+def _load(path: str) -> List[List[str]]:
+    conversations = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            messages = record.get("messages") if isinstance(record, dict) else record
+            conversations.append([str(m) for m in messages or []])
+    return conversations
+
+
+def _replay(conversations: List[List[str]]) -> int:
+    turns = 0
+    for messages in conversations:
+        state: dict = {}
+        for message in messages:
+            result = run_chat_flow(ChatRequest(message=message, conversation_state=state), _REFERRAL_MAP)
+            render_chat_body(result)
+            state = result["conversation_state"]
+            turns += 1
+    return turns
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", help="JSONL file of recorded conversations")
+    parser.add_argument("--generate", type=int, default=500, help="conversations to generate when no file is given")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-turns-per-sec", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    conversations = _load(args.conversations) if args.conversations else _generate(args.generate, seed=45)
+    if not conversations:
+        print("FAILED: no conversations to replay")
+        return 1
+    _replay(conversations[:50])  # warm the reply fragment cache
+
+    turns = 0
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        turns += _replay(conversations)
+    elapsed = time.perf_counter() - started
+    rate = turns / elapsed if elapsed else float("inf")
+
+    print(f"{len(conversations)} conversations x {args.repeat}: {turns} turns in {elapsed:.2f} s")
+    print(f"{rate:,.0f} turns/s ({elapsed / turns * 1e6:.1f} us/turn)")
+    ok = rate >= args.min_turns_per_sec
+    print(f"{'OK' if ok else 'FAILED'} (target {args.min_turns_per_sec:,.0f} turns/s)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,40 @@
+"""
+Prebuild the /ai-chat retrieval index so API workers load it instead of rebuilding at first request.
+Run from the backend folder after deploys or bulk resource imports:
+
+  python scripts/build_retrieval_index.py
+
+Workers only use the file while its fingerprint matches referral_map.json and the resources table;
+otherwise they rebuild in memory, so a stale file is never served.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from services.retrieval_service import RETRIEVAL_INDEX_PATH, build_index, save_index  # noqa: E402
+
+
+def main() -> int:
+    started = time.perf_counter()
+    index = build_index()
+    save_index(index)
+    elapsed = (time.perf_counter() - started) * 1000
+    sources = {}
+    for doc in index.docs:
+        sources[doc["source"]] = sources.get(doc["source"], 0) + 1
+    print(f"Wrote {RETRIEVAL_INDEX_PATH}: {len(index.docs)} docs {sources}, {len(index.postings)} terms, "
+          f"fingerprint={index.fingerprint}, {elapsed:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
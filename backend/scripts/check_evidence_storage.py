@@ -0,0 +1,55 @@
+"""
+Round-trip a test object through the configured evidence storage backend. Run from the backend folder:
+
+  python scripts/check_evidence_storage.py
+
+To try the S3 backend locally, start a MinIO container and point the env at it:
+
+  docker run -p 9000:9000 -e MINIO_ROOT_USER=minio -e MINIO_ROOT_PASSWORD=minio123 minio/minio server /data
+  EVIDENCE_STORAGE_BACKEND=s3 EVIDENCE_S3_BUCKET=evidence EVIDENCE_S3_ENDPOINT_URL=http://localhost:9000 \\
+  EVIDENCE_S3_ACCESS_KEY_ID=minio EVIDENCE_S3_SECRET_ACCESS_KEY=minio123 python scripts/check_evidence_storage.py
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from services.storage_service import S3_MULTIPART_PART_BYTES, get_evidence_storage  # noqa: E402
+
+
+def main() -> int:
+    storage = get_evidence_storage()
+    print(f"Backend: {storage.name} -> {storage.describe()}")
+
+    # Larger than one multipart part so the S3 path exercises create/upload_part/complete.
+    payload = os.urandom(S3_MULTIPART_PART_BYTES + 123_457)
+    key = f"storage_check_{os.urandom(6).hex()}.bin"
+    chunks = (payload[i : i + 256 * 1024] for i in range(0, len(payload), 256 * 1024))
+    try:
+        written = storage.save_stream(key, chunks)
+        stat = storage.stat(key)
+        if not stat or stat.size != len(payload) or written != len(payload):
+            print(f"FAILED: size mismatch (written={written}, stat={stat})")
+            return 2
+        tail = b"".join(storage.iter_range(key, len(payload) - 100, len(payload) - 1))
+        if tail != payload[-100:]:
+            print("FAILED: ranged read returned unexpected bytes")
+            return 2
+        print(f"OK: wrote {written} bytes, etag={stat.etag}, ranged read matches")
+        return 0
+    finally:
+        try:
+            storage.delete(key)
+        except Exception as e:
+            print(f"Warning: cleanup failed: {type(e).__name__}: {e}")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""
+Import-time budget check for the API worker. Run from the backend folder (CI or before deploys):
+
+  python scripts/check_import_time.py
+  python scripts/check_import_time.py --budget-ms 900 --top 15
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter, prints the slowest imports,
+and exits non-zero when `main` exceeds the budget or when an SDK that should load lazily
+(Groq, Google API client, redis, boto3, Pillow, pytesseract) is imported at startup.
+Take the best of a few runs; the first run after a deploy also pays for .pyc compilation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed on specific request paths; each costs 50-150 ms when imported eagerly.
+LAZY_MODULES = ("groq", "googleapiclient", "google.auth", "google.oauth2", "redis", "boto3", "PIL", "pytesseract")
+
+
+def _measure() -> dict:
+    env = dict(os.environ)
+    # A throwaway SQLite URL keeps the check independent of a reachable Postgres.
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{proc.stderr[-2000:]}")
+    cumulative: dict = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue
+        cumulative[parts[2].strip()] = cumulative_us
+    return cumulative
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "1000") or "1000"))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [_measure() for _ in range(max(1, args.runs))]
+    best = min(runs, key=lambda r: r.get("main", 0))
+    total_ms = best.get("main", 0) / 1000.0
+
+    print(f"import main: {total_ms:.1f} ms (best of {len(runs)}; budget {args.budget_ms:.0f} ms)")
+    top_level = {name: us for name, us in best.items() if "." not in name and name != "main"}
+    for name, us in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[: args.top]:
+        print(f"  {us / 1000.0:8.1f} ms  {name}")
+
+    eager = sorted({name for name in best for lazy in LAZY_MODULES if name == lazy or name.startswith(lazy + ".")})
+    failed = False
+    if eager:
+        print(f"FAILED: imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAILED: import main took {total_ms:.1f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
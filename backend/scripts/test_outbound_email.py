@@ -30,6 +30,7 @@ def main() -> int:
         "CAL email test — Gmail API",
         "If you received this, Gmail API OAuth2 is configured correctly.",
         "<p>If you received this, <strong>Gmail API OAuth2</strong> is configured correctly.</p>",
+        defer=False,  # no dispatcher runs in this script
     )
 
     if ok:
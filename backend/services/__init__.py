@@ -7,7 +7,6 @@ from .config_service import (
     SUPPORTED_LANGS,
     ADMIN_EXPORT_KEY,
     engine,
-    groq_client,
     groq_configured,
 )
 
@@ -20,6 +19,5 @@ __all__ = [
     "SUPPORTED_LANGS",
     "ADMIN_EXPORT_KEY",
     "engine",
-    "groq_client",
     "groq_configured",
 ]
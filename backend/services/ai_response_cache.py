@@ -0,0 +1,176 @@
+"""In-process response cache for /ai-chat: exact normalized-key hits plus an optional near-duplicate tier."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+AI_CACHE_SIZE = max(0, int(os.getenv("AI_CACHE_SIZE", "512") or "512"))
+AI_CACHE_TTL_SECONDS = float(os.getenv("AI_CACHE_TTL_SECONDS", "86400") or "86400")
+# Cosine similarity needed for a near-duplicate hit; 0 (default) disables the similarity tier. Answers are
+# shared across users, and trigram similarity cannot tell "my landlord did serve notice" from "did not", so
+# only turn this on for topics where near-identical wording really means the same question.
+AI_CACHE_SIMILARITY = float(os.getenv("AI_CACHE_SIMILARITY", "0") or "0")
+
+_EMBED_DIM = 512
+_WORD_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+
+
+def normalize_question(text: str) -> str:
+    cleaned = _WORD_RE.sub(" ", (text or "").lower())
+    return " ".join(cleaned.split())
+
+
+def _embed(text: str) -> Dict[int, float]:
+    """Hashed word + character-trigram vector (L2-normalised). Cheap, dependency-free, local."""
+    features: List[str] = []
+    words = text.split()
+    features.extend(f"w:{w}" for w in words)
+    padded = f" {text} "
+    features.extend(f"c:{padded[i:i + 3]}" for i in range(max(0, len(padded) - 2)))
+    vec: Dict[int, float] = {}
+    for feat in features:
+        h = int.from_bytes(hashlib.blake2b(feat.encode("utf-8"), digest_size=4).digest(), "big")
+        idx = h % _EMBED_DIM
+        vec[idx] = vec.get(idx, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {k: v / norm for k, v in vec.items() if v}
+
+
+def _cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+@dataclass
+class CacheEntry:
+    response: str
+    question: str
+    bucket: str
+    model: str
+    created_at: float
+    usage: dict = field(default_factory=dict)
+    hits: int = 0
+    vector: Dict[int, float] = field(default_factory=dict)
+
+
+def cache_key(language: str, topic: Optional[str], messages: List[Dict[str, str]]) -> Optional[Tuple[str, str, str]]:
+    """
+    Return (key, bucket, normalized_question) or None when the request is not cacheable.
+    bucket = language + topic + hash of the whole prior conversation; near-duplicate matching stays inside it.
+    Hashing every earlier turn means a hit only ever returns an answer to a conversation identical to the
+    caller's own, so it cannot carry details from another user's earlier messages.
+    """
+    if not messages or (messages[-1].get("role") or "") != "user":
+        return None
+    question = normalize_question(messages[-1].get("content") or "")
+    if not question:
+        return None
+    history_payload = json.dumps(
+        [[m.get("role") or "", normalize_question(m.get("content") or "")] for m in messages[:-1]],
+        ensure_ascii=False,
+    )
+    history_hash = hashlib.sha256(history_payload.encode("utf-8")).hexdigest()[:16]
+    lang = (language or "en").strip().lower()[:2]
+    bucket = f"{lang}|{(topic or '').strip().lower()}|{history_hash}"
+    return f"{bucket}|{question}", bucket, question
+
+
+class AIResponseCache:
+    def __init__(self, max_entries: int, ttl_seconds: float, similarity: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry.created_at > self.ttl_seconds
+
+    def get(self, key: str, bucket: str, question: str) -> Optional[Tuple[CacheEntry, str, float]]:
+        """Return (entry, match_type, similarity) for an exact or near-duplicate hit."""
+        if self.max_entries <= 0:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry, now):
+                    self._entries.pop(key, None)
+                else:
+                    entry.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry, "exact", 1.0
+            if self.similarity <= 0:
+                return None
+            candidates = [(k, e) for k, e in self._entries.items() if e.bucket == bucket]
+        vector = _embed(question)
+        best: Optional[Tuple[str, CacheEntry, float]] = None
+        for k, e in candidates:
+            if self._expired(e, now):
+                continue
+            score = _cosine(vector, e.vector)
+            if score >= self.similarity and (best is None or score > best[2]):
+                best = (k, e, score)
+        if best is None:
+            return None
+        with self._lock:
+            if best[0] not in self._entries:
+                return None
+            best[1].hits += 1
+            self._entries.move_to_end(best[0])
+        return best[1], "similar", round(best[2], 4)
+
+    def put(self, key: str, bucket: str, question: str, response: str, model: str, usage: dict) -> None:
+        if self.max_entries <= 0 or not response:
+            return
+        entry = CacheEntry(
+            response=response,
+            question=question,
+            bucket=bucket,
+            model=model,
+            created_at=time.time(),
+            usage=dict(usage or {}),
+            vector=_embed(question) if self.similarity > 0 else {},
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "ttl_seconds": self.ttl_seconds}
+
+
+def provenance(entry: CacheEntry, match: str, similarity: float) -> dict:
+    """
+    What the client sees about a cached answer: how it matched and how old it is. The entry was produced
+    for another user, so their question and token usage are never included.
+    """
+    return {
+        "hit": True,
+        "match": match,
+        "similarity": similarity,
+        "source": "llm",
+        "model": entry.model,
+        "cached_at": int(entry.created_at),
+        "age_seconds": int(time.time() - entry.created_at),
+    }
+
+
+response_cache = AIResponseCache(AI_CACHE_SIZE, AI_CACHE_TTL_SECONDS, AI_CACHE_SIMILARITY)
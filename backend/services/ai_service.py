@@ -1,11 +1,20 @@
-import os
+import json
+import time
+from typing import AsyncIterator, List
 
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 try:
-    from .config_service import groq_client, groq_configured
+    from .ai_response_cache import cache_key, provenance, response_cache
+    from .llm_provider import LLMUnavailableError, complete_chat, llm_configured, stream_chat
+    from .retrieval_service import format_context, retrieve_context
+    from .token_budget import fit_messages
 except ImportError:
-    from services.config_service import groq_client, groq_configured  # type: ignore
+    from services.ai_response_cache import cache_key, provenance, response_cache  # type: ignore
+    from services.llm_provider import LLMUnavailableError, complete_chat, llm_configured, stream_chat  # type: ignore
+    from services.retrieval_service import format_context, retrieve_context  # type: ignore
+    from services.token_budget import fit_messages  # type: ignore
 
 
 ILLINOIS_SYSTEM_PROMPT = """Role & Purpose:
@@ -19,6 +28,8 @@ Final Rule:
 When in doubt, provide educational information only—not legal advice.
 """
 
+FALLBACK_AI_RESPONSE = "I'm sorry, I couldn't generate a response right now."
+
 
 def language_instruction(lang: str) -> str:
     l = (lang or "en").strip().lower()
@@ -27,29 +38,117 @@ def language_instruction(lang: str) -> str:
     return "IMPORTANT: Respond ONLY in English."
 
 
-def run_ai_chat(req):
-    if not groq_configured or not groq_client:
-        raise HTTPException(status_code=503, detail="AI assistant is not configured")
-    if not req.messages:
-        raise HTTPException(status_code=400, detail="messages are required")
+async def _retrieve_for(req) -> tuple:
+    """Return (docs, usage fields) for the latest user message; the index may touch the DB, so run it off-loop."""
+    question = next((m.get("content") or "" for m in reversed(req.messages) if m.get("role") == "user"), "")
+    started = time.perf_counter()
+    docs = await run_in_threadpool(retrieve_context, question, req.topic)
+    return docs, {
+        "retrieval_ms": round((time.perf_counter() - started) * 1000, 2),
+        "retrieved_sources": [d.doc_id for d in docs],
+    }
 
+
+def _build_chat_messages(req, docs=None) -> tuple:
+    """Return (messages, budget_report); older turns are condensed once the prompt exceeds the budget."""
     system_parts = [ILLINOIS_SYSTEM_PROMPT, language_instruction(req.language)]
     if req.topic:
         system_parts.append(f"Topic focus: {req.topic}")
+    grounding = format_context(docs or [])
+    if grounding:
+        system_parts.append(grounding)
+    return fit_messages("\n\n".join(system_parts), list(req.messages))
+
+
+def _require_ai_request(req) -> None:
+    if not llm_configured():
+        raise HTTPException(status_code=503, detail="AI assistant is not configured")
+    if not req.messages:
+        raise HTTPException(status_code=400, detail="messages are required")
+
+
+def _cached_answer(req):
+    """Return (cache_key_tuple, hit_payload_or_None) for the request."""
+    key = cache_key(req.language, req.topic, req.messages)
+    if key is None:
+        return None, None
+    found = response_cache.get(*key)
+    if found is None:
+        return key, None
+    entry, match, similarity = found
+    return key, {"response": entry.response, "usage": {}, "cache": provenance(entry, match, similarity)}
+
+
+def _remember_answer(key, content: str, provider: str, model: str, usage: dict) -> None:
+    # Fallback text means the model returned nothing useful; never pin that for a day.
+    # Answers from the local stand-in are test output and must never be served as real answers.
+    if key is not None and content and provider != "local":
+        response_cache.put(*key, response=content, model=f"{provider}:{model}", usage=usage)
+
+
+async def run_ai_chat(req):
+    _require_ai_request(req)
+    key, hit = _cached_answer(req)
+    if hit is not None:
+        return hit
+
+    docs, retrieval = await _retrieve_for(req)
+    messages, budget = _build_chat_messages(req, docs)
+    try:
+        result = await complete_chat(messages, temperature=0.2)
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    usage = {**result.usage, **budget, **retrieval, "provider": result.provider, "model": result.model}
+    _remember_answer(key, result.content, result.provider, result.model, usage)
+
+    return {"response": result.content or FALLBACK_AI_RESPONSE, "usage": usage, "cache": {"hit": False}}
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_ai_chat(req) -> AsyncIterator[str]:
+    """
+    Server-sent events for /ai-chat/stream: `token` events carry text deltas as the provider produces them,
+    then a single `done` event carries the same payload as AIChatResponse (full text + usage + cache).
+    Cache hits are replayed as one `token` event followed by `done`.
+    Validation errors raise before the first byte so callers still get a normal HTTP error.
+    """
+    _require_ai_request(req)
+    key, hit = _cached_answer(req)
+    if hit is not None:
+
+        async def _cached_events() -> AsyncIterator[str]:
+            yield _sse_event("token", {"delta": hit["response"]})
+            yield _sse_event("done", hit)
+
+        return _cached_events()
+
+    docs, retrieval = await _retrieve_for(req)
+    messages, budget = _build_chat_messages(req, docs)
+    try:
+        provider, stream = await stream_chat(messages, temperature=0.2)
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def _events() -> AsyncIterator[str]:
+        parts: List[str] = []
+        usage: dict = {}
+        try:
+            async for delta in stream:
+                if delta.text:
+                    parts.append(delta.text)
+                    yield _sse_event("token", {"delta": delta.text})
+                if delta.usage:
+                    usage = delta.usage
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"AI chat error: {str(e)}"})
+            return
+        content = "".join(parts)
+        usage = {**usage, **budget, **retrieval, "provider": provider.name, "model": provider.model}
+        _remember_answer(key, content, provider.name, provider.model, usage)
+        yield _sse_event("done", {"response": content or FALLBACK_AI_RESPONSE, "usage": usage, "cache": {"hit": False}})
 
-    response = groq_client.chat.completions.create(
-        model=os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
-        messages=[{"role": "system", "content": "\n\n".join(system_parts)}, *req.messages],
-        temperature=0.2,
-    )
-
-    content = response.choices[0].message.content if response.choices else ""
-    usage = {}
-    if getattr(response, "usage", None):
-        usage = {
-            "prompt_tokens": getattr(response.usage, "prompt_tokens", 0),
-            "completion_tokens": getattr(response.usage, "completion_tokens", 0),
-            "total_tokens": getattr(response.usage, "total_tokens", 0),
-        }
-
-    return {"response": content or "I'm sorry, I couldn't generate a response right now.", "usage": usage}
+    return _events()
@@ -138,7 +138,7 @@ def request_password_reset(payload, db: Session) -> dict:
         f"<p><a href=\"{reset_url}\">Reset password</a> (expires in {RESET_PASSWORD_TTL_MINUTES} minutes)</p>"
         "<p>If you did not request this, you can ignore this email.</p>"
     )
-    sent = send_transactional_email(email, subject, text, html)
+    sent = send_transactional_email(email, subject, text, html, expires_at=expires)
     if not sent:
         print(f"Password reset link for {email}: {reset_url}")
 
@@ -1,7 +1,6 @@
 import os
 
 from dotenv import load_dotenv
-from groq import Groq
 
 load_dotenv()
 
@@ -61,17 +60,5 @@ try:
 except ImportError:
     from database import engine  # type: ignore
 
-groq_client = None
-groq_configured = False
-
-try:
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        print("Warning: GROQ_API_KEY not found in environment variables")
-    else:
-        groq_client = Groq(api_key=api_key)
-        groq_configured = True
-        print("Groq client initialized successfully")
-except Exception as e:
-    print(f"Warning: Groq client initialization failed: {type(e).__name__}: {e}")
-    groq_configured = False
+GROQ_API_KEY = os.getenv("GROQ_API_KEY", "").strip()
+groq_configured = bool(GROQ_API_KEY)
@@ -0,0 +1,491 @@
+"""
+Durable outbox for transactional email.
+
+send_transactional_email() inserts a row here and returns; a background dispatcher thread (started with the
+app) delivers it through the Gmail API. Sign-up, magic-link and staff email requests therefore no longer wait
+on Google's token refresh and send calls, and a Gmail outage delays mail instead of losing it.
+
+Messages that carry a sign-in, reset or verification link are queued with `expires_at` (the token's expiry).
+Their bodies are encrypted at rest (Fernet, key from EMAIL_OUTBOX_SECRET or derived from the admin secret),
+they are never sent once expires_at has passed, and their content is cleared as soon as the row leaves the
+queue for any reason. Without a key (or the cryptography package) they are not queued and the caller sends
+them inline instead.
+
+Row lifecycle (status):
+  pending   waiting for next_attempt_at
+  sending   claimed by a dispatcher; next_attempt_at is the lease expiry, after which another worker (or this
+            one after a restart) may claim it again
+  sent      delivered; bodies and attachment are cleared, metadata is kept for EMAIL_OUTBOX_RETENTION_DAYS
+  dead      failed EMAIL_OUTBOX_MAX_ATTEMPTS times; kept with its content for inspection and can be re-queued
+            from the admin API (credential messages are cleared instead and cannot be re-queued)
+  expired   a credential message whose link expired before it could be delivered; content cleared
+
+Retries back off exponentially from EMAIL_OUTBOX_RETRY_BASE_SECONDS (capped at one hour). Claims are single
+conditional UPDATEs, each with its own lease start, so running a dispatcher in every worker process is safe.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+try:
+    from .config_service import ADMIN_EXPORT_KEY, ADMIN_JWT_SECRET, engine
+    from .gmail_service import send_email
+    from .tracing import span
+except ImportError:
+    from services.config_service import ADMIN_EXPORT_KEY, ADMIN_JWT_SECRET, engine  # type: ignore
+    from services.gmail_service import send_email  # type: ignore
+    from services.tracing import span  # type: ignore
+
+EMAIL_OUTBOX_ENABLED = os.getenv("EMAIL_OUTBOX_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+EMAIL_OUTBOX_MAX_ATTEMPTS = max(1, int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6") or "6"))
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = max(1, int(os.getenv("EMAIL_OUTBOX_RETRY_BASE_SECONDS", "30") or "30"))
+EMAIL_OUTBOX_POLL_SECONDS = max(1.0, float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5") or "5"))
+EMAIL_OUTBOX_RETENTION_DAYS = max(1, int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "30") or "30"))
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("pending", "sending", "sent", "dead", "expired")
+
+_MAX_RETRY_DELAY_SECONDS = 3600
+_LEASE_SECONDS = 120  # longer than a Gmail send with token refresh and both timeouts
+_BATCH_SIZE = 20
+_PURGE_EVERY_PASSES = 720  # about hourly at the default poll interval
+
+_CREATE_OUTBOX_SQL = """
+CREATE TABLE IF NOT EXISTS email_outbox (
+  id TEXT PRIMARY KEY,
+  to_email TEXT NOT NULL,
+  subject TEXT NOT NULL,
+  text_body TEXT NOT NULL,
+  html_body TEXT NOT NULL,
+  attachment_b64 TEXT,
+  attachment_filename TEXT,
+  attachment_content_type TEXT,
+  status TEXT NOT NULL,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TEXT NOT NULL,
+  last_error TEXT,
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL,
+  sent_at TEXT,
+  expires_at TEXT,
+  encrypted INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_CREATE_OUTBOX_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_email_outbox_status_next_attempt
+ON email_outbox (status, next_attempt_at);
+"""
+
+# Wipes a row's content; used whenever a message can no longer be (re)sent or must not be kept.
+_CLEAR_CONTENT = "text_body = '', html_body = '', attachment_b64 = NULL"
+
+_table_lock = threading.Lock()
+_table_ensured = False
+_fernet_state: Dict[str, Any] = {"loaded": False, "fernet": None}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def email_outbox_enabled() -> bool:
+    return EMAIL_OUTBOX_ENABLED and engine is not None
+
+
+def ensure_email_outbox_table() -> None:
+    global _table_ensured
+    if _table_ensured or not engine:
+        return
+    with _table_lock:
+        if _table_ensured:
+            return
+        with engine.begin() as conn:
+            conn.execute(text(_CREATE_OUTBOX_SQL))
+            _migrate_outbox_credential_columns(conn)
+            conn.execute(text(_CREATE_OUTBOX_INDEX_SQL))
+        _table_ensured = True
+
+
+def _migrate_outbox_credential_columns(conn) -> None:
+    """Add expires_at / encrypted to outbox tables created before credential messages were queued."""
+    if conn.engine.dialect.name == "sqlite":
+        cols = {r[1] for r in conn.execute(text("PRAGMA table_info(email_outbox)")).fetchall()}
+        if "expires_at" not in cols:
+            conn.execute(text("ALTER TABLE email_outbox ADD COLUMN expires_at TEXT"))
+        if "encrypted" not in cols:
+            conn.execute(text("ALTER TABLE email_outbox ADD COLUMN encrypted INTEGER NOT NULL DEFAULT 0"))
+    else:
+        conn.execute(text("ALTER TABLE email_outbox ADD COLUMN IF NOT EXISTS expires_at TEXT"))
+        conn.execute(text("ALTER TABLE email_outbox ADD COLUMN IF NOT EXISTS encrypted INTEGER NOT NULL DEFAULT 0"))
+
+
+def _fernet():
+    """Fernet for credential message bodies, or None when no key or the cryptography package is available."""
+    if _fernet_state["loaded"]:
+        return _fernet_state["fernet"]
+    fernet = None
+    own = (os.getenv("EMAIL_OUTBOX_SECRET") or "").strip()
+    admin = ADMIN_JWT_SECRET or ADMIN_EXPORT_KEY
+    if own or admin:
+        # A separate key under its own label, never the admin secret itself; must match on every worker.
+        seed = own.encode("utf-8") if own else admin.encode("utf-8")
+        key = hmac.new(seed, b"email-outbox-body-v1", hashlib.sha256).digest()
+        try:
+            from cryptography.fernet import Fernet
+
+            fernet = Fernet(base64.urlsafe_b64encode(key))
+        except ImportError:
+            logger.warning("cryptography is not installed; sign-in, reset and verification emails are sent inline")
+    else:
+        logger.warning(
+            "EMAIL_OUTBOX_SECRET / ADMIN_JWT_SECRET not set; sign-in, reset and verification emails are sent inline"
+        )
+    _fernet_state.update(loaded=True, fernet=fernet)
+    return fernet
+
+
+def _seal(fernet, value: str) -> str:
+    return fernet.encrypt(value.encode("utf-8")).decode("ascii") if fernet is not None else value
+
+
+def _open(fernet, value: Optional[str]) -> Optional[str]:
+    return fernet.decrypt(value.encode("ascii")).decode("utf-8") if fernet is not None and value else value
+
+
+def _iso(value: datetime) -> str:
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).astimezone(timezone.utc).isoformat()
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Backoff before attempt `attempts + 1`, with +/-20% jitter so a burst of failures doesn't retry in step."""
+    delay = min(_MAX_RETRY_DELAY_SECONDS, EMAIL_OUTBOX_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def enqueue_email(
+    to_email: str,
+    subject: str,
+    text_body: str,
+    html_body: str,
+    attachment_bytes: Optional[bytes] = None,
+    attachment_filename: str = "",
+    attachment_content_type: str = "application/pdf",
+    expires_at: Optional[datetime] = None,
+) -> Optional[str]:
+    """
+    Queue a message for the dispatcher. Returns the outbox id, or None if the row could not be written.
+    Pass `expires_at` for a message carrying a credential link: it is stored encrypted and dropped, unsent,
+    once expires_at passes. Such a message is not queued (None) when no encryption key is available.
+    """
+    if not engine:
+        return None
+    fernet = None
+    if expires_at is not None:
+        fernet = _fernet()
+        if fernet is None:
+            return None
+    now = _now().isoformat()
+    email_id = os.urandom(16).hex()
+    attachment_b64 = base64.b64encode(attachment_bytes).decode("ascii") if attachment_bytes else None
+    try:
+        ensure_email_outbox_table()
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO email_outbox (
+                      id, to_email, subject, text_body, html_body, attachment_b64, attachment_filename,
+                      attachment_content_type, status, attempts, next_attempt_at, created_at, updated_at,
+                      expires_at, encrypted
+                    ) VALUES (
+                      :id, :to_email, :subject, :text_body, :html_body, :attachment_b64, :attachment_filename,
+                      :attachment_content_type, 'pending', 0, :now, :now, :now, :expires_at, :encrypted
+                    )
+                    """
+                ),
+                {
+                    "id": email_id,
+                    "to_email": to_email,
+                    "subject": subject,
+                    "text_body": _seal(fernet, text_body),
+                    "html_body": _seal(fernet, html_body),
+                    "attachment_b64": _seal(fernet, attachment_b64) if attachment_b64 else None,
+                    "attachment_filename": attachment_filename or None,
+                    "attachment_content_type": attachment_content_type if attachment_bytes else None,
+                    "now": now,
+                    "expires_at": _iso(expires_at) if expires_at is not None else None,
+                    "encrypted": 1 if fernet is not None else 0,
+                },
+            )
+    except Exception as e:
+        logger.warning("could not queue email to %s: %s: %s", to_email, type(e).__name__, e)
+        return None
+    _wake.set()
+    return email_id
+
+
+def _claim(conn, email_id: str, now: datetime) -> bool:
+    result = conn.execute(
+        text(
+            """
+            UPDATE email_outbox
+            SET status = 'sending', attempts = attempts + 1, next_attempt_at = :lease_until, updated_at = :now
+            WHERE id = :id AND status IN ('pending', 'sending') AND next_attempt_at <= :now
+              AND (expires_at IS NULL OR expires_at > :now)
+            """
+        ),
+        {"id": email_id, "now": now.isoformat(), "lease_until": (now + timedelta(seconds=_LEASE_SECONDS)).isoformat()},
+    )
+    return result.rowcount == 1
+
+
+def _expire_stale(now: datetime) -> None:
+    """Retire credential messages whose link has expired; rows being sent right now are left to finish."""
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"""
+                UPDATE email_outbox
+                SET status = 'expired', updated_at = :now, {_CLEAR_CONTENT}
+                WHERE expires_at IS NOT NULL AND expires_at <= :now
+                  AND (status = 'pending' OR (status = 'sending' AND next_attempt_at <= :now))
+                """
+            ),
+            {"now": now.isoformat()},
+        )
+
+
+def _deliver(row: Dict[str, Any]) -> Optional[str]:
+    """Send one claimed row; returns None on success or an error description."""
+    try:
+        fernet = _fernet() if row.get("encrypted") else None
+        if row.get("encrypted") and fernet is None:
+            return "no key to decrypt this message (EMAIL_OUTBOX_SECRET / ADMIN_JWT_SECRET)"
+        attachment_b64 = _open(fernet, row.get("attachment_b64"))
+        attachment = base64.b64decode(attachment_b64) if attachment_b64 else None
+        ok = send_email(
+            to_email=row["to_email"],
+            subject=row["subject"],
+            html_body=_open(fernet, row["html_body"]),
+            text_body=_open(fernet, row["text_body"]),
+            attachment_bytes=attachment,
+            attachment_filename=row.get("attachment_filename") or "",
+            attachment_content_type=row.get("attachment_content_type") or "application/pdf",
+        )
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"[:1000]
+    return None if ok else "send_email returned False (see gmail_service log)"
+
+
+def _record_result(row: Dict[str, Any], error: Optional[str]) -> str:
+    now = _now()
+    attempts = int(row["attempts"])
+    next_attempt_at = (now + timedelta(seconds=retry_delay_seconds(attempts))).isoformat()
+    credential = row.get("expires_at") is not None
+    if error is None:
+        status, sql = "sent", f"""
+            UPDATE email_outbox
+            SET status = 'sent', sent_at = :now, updated_at = :now, last_error = NULL, {_CLEAR_CONTENT}
+            WHERE id = :id
+            """
+        params: Dict[str, Any] = {"id": row["id"], "now": now.isoformat()}
+    elif credential and (attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS or next_attempt_at >= row["expires_at"]):
+        # The link can't be delivered (or not before it expires): don't keep it around.
+        status = "dead" if attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS else "expired"
+        sql = f"""
+            UPDATE email_outbox
+            SET status = :status, last_error = :error, updated_at = :now, {_CLEAR_CONTENT}
+            WHERE id = :id
+            """
+        params = {"id": row["id"], "status": status, "error": error, "now": now.isoformat()}
+    else:
+        # Dead-letter rows keep their content until purge_old_emails, so they can be inspected and re-queued.
+        status = "dead" if attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS else "pending"
+        sql = """
+            UPDATE email_outbox
+            SET status = :status, next_attempt_at = :next_attempt_at, last_error = :error, updated_at = :now
+            WHERE id = :id
+            """
+        params = {
+            "id": row["id"],
+            "status": status,
+            "next_attempt_at": next_attempt_at,
+            "error": error,
+            "now": now.isoformat(),
+        }
+    with engine.begin() as conn:
+        conn.execute(text(sql), params)
+    if status == "expired":
+        logger.warning("email %s to %s expired before it could be delivered: %s", row["id"], row["to_email"], error)
+    elif status == "dead":
+        logger.error("email %s to %s moved to dead-letter after %s attempts: %s", row["id"], row["to_email"], attempts, error)
+    elif error is not None:
+        logger.warning("email %s to %s failed (attempt %s/%s): %s", row["id"], row["to_email"], attempts, EMAIL_OUTBOX_MAX_ATTEMPTS, error)
+    return status
+
+
+def dispatch_due_emails(limit: int = _BATCH_SIZE) -> int:
+    """Claim and send up to `limit` due messages. Returns how many were attempted."""
+    if not engine:
+        return 0
+    ensure_email_outbox_table()
+    _expire_stale(_now())
+    with engine.connect() as conn:
+        due = [
+            r[0]
+            for r in conn.execute(
+                text(
+                    """
+                    SELECT id FROM email_outbox
+                    WHERE status IN ('pending', 'sending') AND next_attempt_at <= :now
+                    ORDER BY next_attempt_at
+                    LIMIT :limit
+                    """
+                ),
+                {"now": _now().isoformat(), "limit": int(limit)},
+            ).fetchall()
+        ]
+    attempted = 0
+    for email_id in due:
+        with engine.begin() as conn:
+            # Lease from the moment of this claim: a slow batch must not start later rows with a shortened lease.
+            if not _claim(conn, email_id, _now()):
+                continue  # another dispatcher got it first
+            row = conn.execute(text("SELECT * FROM email_outbox WHERE id = :id"), {"id": email_id}).mappings().first()
+        if row is None:
+            continue
+        row = dict(row)
+        attempted += 1
+        with span("email.dispatch", **{"email.attempt": int(row["attempts"])}) as current:
+            error = _deliver(row)
+            status = _record_result(row, error)
+            if current is not None:
+                current.set_attribute("email.status", status)
+                if error is not None:
+                    current.error = error
+    return attempted
+
+
+def purge_old_emails(now: Optional[datetime] = None) -> None:
+    """Drop sent, dead and expired rows older than EMAIL_OUTBOX_RETENTION_DAYS."""
+    if not engine:
+        return
+    cutoff = ((now or _now()) - timedelta(days=EMAIL_OUTBOX_RETENTION_DAYS)).isoformat()
+    with engine.begin() as conn:
+        conn.execute(
+            text("DELETE FROM email_outbox WHERE status IN ('sent', 'dead', 'expired') AND updated_at < :cutoff"),
+            {"cutoff": cutoff},
+        )
+
+
+def outbox_counts() -> Dict[str, int]:
+    counts = {status: 0 for status in STATUSES}
+    if not engine:
+        return counts
+    ensure_email_outbox_table()
+    with engine.connect() as conn:
+        for status, count in conn.execute(text("SELECT status, COUNT(*) FROM email_outbox GROUP BY status")):
+            counts[str(status)] = int(count or 0)
+    return counts
+
+
+def list_outbox(status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """Outbox metadata, newest first (bodies and attachments are not returned)."""
+    if not engine:
+        return []
+    ensure_email_outbox_table()
+    where = "WHERE status = :status" if status else ""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                f"""
+                SELECT id, to_email, subject, status, attempts, next_attempt_at, last_error,
+                       attachment_filename, created_at, updated_at, sent_at, expires_at
+                FROM email_outbox
+                {where}
+                ORDER BY created_at DESC
+                LIMIT :limit
+                """
+            ),
+            {"status": status, "limit": int(limit)},
+        ).mappings()
+        return [dict(r) for r in rows]
+
+
+def requeue_email(email_id: str) -> bool:
+    """Move a dead-letter message back to pending with a fresh attempt budget (not credential messages)."""
+    if not engine:
+        return False
+    ensure_email_outbox_table()
+    now = _now().isoformat()
+    with engine.begin() as conn:
+        result = conn.execute(
+            text(
+                """
+                UPDATE email_outbox
+                SET status = 'pending', attempts = 0, next_attempt_at = :now, updated_at = :now
+                WHERE id = :id AND status = 'dead' AND expires_at IS NULL
+                """
+            ),
+            {"id": email_id, "now": now},
+        )
+    if result.rowcount != 1:
+        return False
+    _wake.set()
+    return True
+
+
+# --- dispatcher thread -------------------------------------------------------------------------------------
+
+_wake = threading.Event()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _dispatch_loop() -> None:
+    passes = 0
+    while not _stop.is_set():
+        _wake.clear()
+        attempted = 0
+        try:
+            attempted = dispatch_due_emails()
+            passes += 1
+            if passes % _PURGE_EVERY_PASSES == 0:
+                purge_old_emails()
+        except Exception as e:
+            logger.warning("email outbox dispatch failed: %s: %s", type(e).__name__, e)
+        if attempted < _BATCH_SIZE:
+            _wake.wait(EMAIL_OUTBOX_POLL_SECONDS)
+
+
+def start_email_dispatcher() -> None:
+    global _thread
+    if not email_outbox_enabled() or (_thread is not None and _thread.is_alive()):
+        return
+    ensure_email_outbox_table()
+    _stop.clear()
+    _thread = threading.Thread(target=_dispatch_loop, name="email-outbox", daemon=True)
+    _thread.start()
+
+
+def stop_email_dispatcher(timeout: float = 5.0) -> None:
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _wake.set()
+    _thread.join(timeout)
+    _thread = None
@@ -79,7 +79,7 @@ def send_verification_email(email: str, first_name: str, db: Session) -> bool:
         "Verify email</a></p>"
         "<p>This link expires in 24 hours. If you did not register, you can safely ignore this email.</p>"
     )
-    sent = send_transactional_email(email, subject, text, html)
+    sent = send_transactional_email(email, subject, text, html, expires_at=expires)
     if not sent:
         logger.warning(
             "Email verification message could not be delivered to %s. "
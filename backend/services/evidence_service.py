@@ -1,33 +1,60 @@
+import io
 import json
+import logging
+import mimetypes
 import os
 import re
+import threading
+import time
 import zipfile
+from collections import OrderedDict
 from datetime import datetime, timezone
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from email.utils import formatdate
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
 from fastapi import HTTPException, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy import text
 
 try:
     from ..services.ai_service import language_instruction
-    from ..services.config_service import engine, groq_client, groq_configured
+    from ..services.config_service import engine
+    from .llm_provider import complete_chat, llm_configured
     from .intake_service import require_admin_access, utc_now_iso
+    from .ocr_service import ocr_image_stream
+    from .storage_service import get_evidence_storage
 except ImportError:
     from services.ai_service import language_instruction  # type: ignore
-    from services.config_service import engine, groq_client, groq_configured  # type: ignore
+    from services.config_service import engine  # type: ignore
+    from services.llm_provider import complete_chat, llm_configured  # type: ignore
     from services.intake_service import require_admin_access, utc_now_iso  # type: ignore
+    from services.ocr_service import ocr_image_stream  # type: ignore
+    from services.storage_service import get_evidence_storage  # type: ignore
 
 
-UPLOAD_ROOT = Path(__file__).resolve().parents[1] / "uploads" / "documents"
+logger = logging.getLogger(__name__)
+
 MAX_FILES_PER_INTAKE = 20
 MAX_TOTAL_BYTES_PER_INTAKE = 60 * 1024 * 1024
 
 
+_evidence_tables_ensured = False
+_evidence_tables_lock = threading.Lock()
+
+
 def ensure_evidence_tables() -> None:
-    if not engine:
+    global _evidence_tables_ensured
+    if not engine or _evidence_tables_ensured:
         return
+    with _evidence_tables_lock:
+        if _evidence_tables_ensured:
+            return
+        # Only latch on success, so a transient DB error at startup is retried on the next call.
+        _evidence_tables_ensured = _run_ensure_evidence_tables()
+
+
+def _run_ensure_evidence_tables() -> bool:
     create_evidence = """
     CREATE TABLE IF NOT EXISTS evidence_files (
       id TEXT PRIMARY KEY,
@@ -51,12 +78,107 @@ def ensure_evidence_tables() -> None:
     CREATE INDEX IF NOT EXISTS idx_evidence_files_intake_uploaded
     ON evidence_files (intake_id, uploaded_at);
     """
+    # Running totals per intake so quota enforcement is a single conditional UPDATE
+    # instead of COUNT/SUM over evidence_files on every upload.
+    create_quota = """
+    CREATE TABLE IF NOT EXISTS evidence_quota (
+      intake_id TEXT PRIMARY KEY,
+      file_count INTEGER NOT NULL DEFAULT 0,
+      total_bytes BIGINT NOT NULL DEFAULT 0,
+      updated_at TEXT NOT NULL,
+      FOREIGN KEY (intake_id) REFERENCES intakes(id)
+    );
+    """
+    # Backfill counters for intakes that uploaded before the table existed; existing rows are untouched.
+    backfill_quota = """
+    INSERT INTO evidence_quota (intake_id, file_count, total_bytes, updated_at)
+    SELECT intake_id, COUNT(*), COALESCE(SUM(file_size), 0), :now
+    FROM evidence_files
+    WHERE 1 = 1
+    GROUP BY intake_id
+    ON CONFLICT (intake_id) DO NOTHING
+    """
+    ok = True
     try:
         with engine.begin() as conn:
             conn.execute(text(create_evidence))
             conn.execute(text(create_idx))
     except Exception as e:
-        print(f"Warning: ensure_evidence_tables failed: {type(e).__name__}: {e}")
+        ok = False
+        logger.warning("ensure_evidence_tables failed: %s: %s", type(e).__name__, e)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(create_quota))
+            # Every upload since the table existed keeps its counters current, so the full GROUP BY scan is
+            # only needed when the table is new (empty).
+            if conn.execute(text("SELECT 1 FROM evidence_quota LIMIT 1")).first() is None:
+                conn.execute(text(backfill_quota), {"now": utc_now_iso()})
+    except Exception as e:
+        ok = False
+        logger.warning("ensure_evidence_tables (evidence_quota) failed: %s: %s", type(e).__name__, e)
+    return ok
+
+
+def _quota_exceeded_error(file_count: int, total_bytes: int, incoming_size: int) -> Optional[HTTPException]:
+    if file_count >= MAX_FILES_PER_INTAKE:
+        return HTTPException(
+            status_code=400,
+            detail=f"File limit reached for this case (max {MAX_FILES_PER_INTAKE} uploads).",
+        )
+    if total_bytes + int(incoming_size or 0) > MAX_TOTAL_BYTES_PER_INTAKE:
+        return HTTPException(
+            status_code=400,
+            detail="Total upload storage limit reached for this case. Please remove older files.",
+        )
+    return None
+
+
+def _reserve_evidence_quota(conn, intake_id: str, incoming_size: int) -> None:
+    """Atomically bump the intake's counters, or raise 400/404 without changing anything."""
+    params = {
+        "iid": intake_id,
+        "size": int(incoming_size or 0),
+        "max_files": MAX_FILES_PER_INTAKE,
+        "max_bytes": MAX_TOTAL_BYTES_PER_INTAKE,
+        "now": utc_now_iso(),
+    }
+    reserve_sql = text(
+        """
+        UPDATE evidence_quota
+        SET file_count = file_count + 1, total_bytes = total_bytes + :size, updated_at = :now
+        WHERE intake_id = :iid
+          AND file_count < :max_files
+          AND total_bytes + :size <= :max_bytes
+        """
+    )
+    if conn.execute(reserve_sql, params).rowcount == 1:
+        return
+    current = conn.execute(
+        text("SELECT file_count, total_bytes FROM evidence_quota WHERE intake_id = :iid"),
+        {"iid": intake_id},
+    ).mappings().first()
+    if current:
+        err = _quota_exceeded_error(int(current["file_count"] or 0), int(current["total_bytes"] or 0), params["size"])
+        raise err or HTTPException(status_code=409, detail="Upload quota changed concurrently; please retry.")
+    # First upload for this intake: create its counter row (only if the intake exists), then retry once.
+    conn.execute(
+        text(
+            """
+            INSERT INTO evidence_quota (intake_id, file_count, total_bytes, updated_at)
+            SELECT id, 0, 0, :now FROM intakes WHERE id = :iid
+            ON CONFLICT (intake_id) DO NOTHING
+            """
+        ),
+        params,
+    )
+    if conn.execute(reserve_sql, params).rowcount == 1:
+        return
+    exists = conn.execute(text("SELECT 1 FROM intakes WHERE id = :iid"), {"iid": intake_id}).first()
+    if not exists:
+        raise HTTPException(status_code=404, detail="Intake not found")
+    raise _quota_exceeded_error(0, 0, params["size"]) or HTTPException(
+        status_code=409, detail="Upload quota changed concurrently; please retry."
+    )
 
 
 def _extract_text_from_txt(content: bytes) -> str:
@@ -68,15 +190,13 @@ def _extract_text_from_txt(content: bytes) -> str:
     return ""
 
 
-def _extract_text_from_pdf(content: bytes) -> str:
+def _extract_text_from_pdf(stream: BinaryIO) -> str:
     try:
         from pypdf import PdfReader  # type: ignore
     except Exception:
         return ""
     try:
-        import io
-
-        reader = PdfReader(io.BytesIO(content))
+        reader = PdfReader(stream)
         chunks = []
         for page in reader.pages[:25]:
             chunks.append(page.extract_text() or "")
@@ -85,12 +205,9 @@ def _extract_text_from_pdf(content: bytes) -> str:
         return ""
 
 
-def _extract_text_from_docx(content: bytes) -> str:
+def _extract_text_from_docx(stream: BinaryIO) -> str:
     try:
-        import io
-
-        data = io.BytesIO(content)
-        with zipfile.ZipFile(data) as zf:
+        with zipfile.ZipFile(stream) as zf:
             xml = zf.read("word/document.xml").decode("utf-8", errors="ignore")
         text_val = re.sub(r"<[^>]+>", " ", xml)
         return re.sub(r"\s+", " ", text_val).strip()
@@ -98,29 +215,34 @@ def _extract_text_from_docx(content: bytes) -> str:
         return ""
 
 
-def _extract_text_from_image(content: bytes) -> str:
-    try:
-        from PIL import Image  # type: ignore
-        import io
-        import pytesseract  # type: ignore
+def extract_text_from_stream(extension: str, stream: BinaryIO) -> Tuple[str, Dict[str, float]]:
+    """
+    Extract text from a seekable binary file (the spooled upload) with per-stage timings in milliseconds.
+    PDF, DOCX and image parsing read from the file directly, so large uploads are not copied into memory.
+    """
+    ext = (extension or "").lower()
+    stream.seek(0)
+    if ext in {".png", ".jpg", ".jpeg"}:
+        return ocr_image_stream(stream)
+    started = time.perf_counter()
+    if ext == ".txt":
+        text_val = _extract_text_from_txt(stream.read())
+    elif ext == ".pdf":
+        text_val = _extract_text_from_pdf(stream)
+    elif ext == ".docx":
+        text_val = _extract_text_from_docx(stream)
+    else:
+        text_val = ""
+    return text_val, {"extract": round((time.perf_counter() - started) * 1000, 2)}
 
-        img = Image.open(io.BytesIO(content))
-        return str(pytesseract.image_to_string(img) or "").strip()
-    except Exception:
-        return ""
+
+def extract_text_with_timings(extension: str, content: bytes) -> Tuple[str, Dict[str, float]]:
+    """Like extract_text_for_file, but also returns per-stage timings in milliseconds."""
+    return extract_text_from_stream(extension, io.BytesIO(content or b""))
 
 
 def extract_text_for_file(extension: str, content: bytes) -> str:
-    ext = (extension or "").lower()
-    if ext == ".txt":
-        return _extract_text_from_txt(content)
-    if ext == ".pdf":
-        return _extract_text_from_pdf(content)
-    if ext == ".docx":
-        return _extract_text_from_docx(content)
-    if ext in {".png", ".jpg", ".jpeg"}:
-        return _extract_text_from_image(content)
-    return ""
+    return extract_text_with_timings(extension, content)[0]
 
 
 def _extract_key_facts_timeline(text_value: str, uploaded_at: str, source_name: str) -> List[Dict[str, str]]:
@@ -157,27 +279,30 @@ def _fallback_summary(extracted_text: str, original_name: str) -> str:
     return f"Evidence summary (auto): {short}"
 
 
-def generate_ai_evidence_summary(extracted_text: str, language: str = "en") -> str:
+async def generate_ai_evidence_summary(extracted_text: str, language: str = "en") -> str:
     if not extracted_text.strip():
         return ""
-    if not groq_configured or not groq_client:
+    if not llm_configured():
         return ""
     try:
         prompt = (
             "Summarize this legal evidence in 5 concise bullet points. "
             "Then include a short 'Potential key dates/deadlines' line if any appear."
         )
-        response = groq_client.chat.completions.create(
-            model=os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
+        result = await complete_chat(
             messages=[
                 {"role": "system", "content": f"You summarize legal evidence safely. {language_instruction(language)}"},
                 {"role": "user", "content": f"{prompt}\n\nEvidence text:\n{extracted_text[:6000]}"},
             ],
             temperature=0.1,
         )
-        return str((response.choices[0].message.content if response.choices else "") or "").strip()
     except Exception:
         return ""
+    if result.provider == "local":
+        # The local stand-in returns canned test text; never store it as a real evidence summary.
+        logger.info("Skipping evidence summary from the local LLM provider")
+        return ""
+    return (result.content or "").strip()
 
 
 def save_evidence_record(
@@ -200,9 +325,8 @@ def save_evidence_record(
     uploaded_at = utc_now_iso()
     evidence_id = os.urandom(16).hex()
     with engine.begin() as conn:
-        exists = conn.execute(text("SELECT 1 FROM intakes WHERE id = :iid"), {"iid": intake_id}).first()
-        if not exists:
-            raise HTTPException(status_code=404, detail="Intake not found")
+        # Counter bump and row insert commit together, so concurrent uploads cannot overshoot the quota.
+        _reserve_evidence_quota(conn, intake_id, file_size)
         conn.execute(
             text(
                 """
@@ -293,6 +417,7 @@ def get_evidence_list_for_client(auth_intake_id: str, intake_id: str) -> Dict[st
 
 
 def assert_evidence_upload_allowed(intake_id: str, incoming_size: int) -> None:
+    """Fail fast before storing the blob. save_evidence_record re-checks atomically on insert."""
     if not engine:
         raise HTTPException(status_code=503, detail="Database not configured")
     ensure_evidence_tables()
@@ -300,31 +425,21 @@ def assert_evidence_upload_allowed(intake_id: str, incoming_size: int) -> None:
     if not iid:
         raise HTTPException(status_code=400, detail="intake_id is required")
     with engine.begin() as conn:
-        exists = conn.execute(text("SELECT 1 FROM intakes WHERE id = :iid"), {"iid": iid}).first()
-        if not exists:
-            raise HTTPException(status_code=404, detail="Intake not found")
         stats = conn.execute(
-            text(
-                """
-                SELECT COUNT(*) AS file_count, COALESCE(SUM(file_size), 0) AS total_bytes
-                FROM evidence_files
-                WHERE intake_id = :iid
-                """
-            ),
+            text("SELECT file_count, total_bytes FROM evidence_quota WHERE intake_id = :iid"),
             {"iid": iid},
         ).mappings().first()
-    file_count = int((stats or {}).get("file_count") or 0)
-    total_bytes = int((stats or {}).get("total_bytes") or 0)
-    if file_count >= MAX_FILES_PER_INTAKE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File limit reached for this case (max {MAX_FILES_PER_INTAKE} uploads).",
-        )
-    if total_bytes + int(incoming_size or 0) > MAX_TOTAL_BYTES_PER_INTAKE:
-        raise HTTPException(
-            status_code=400,
-            detail="Total upload storage limit reached for this case. Please remove older files.",
-        )
+        if not stats:
+            exists = conn.execute(text("SELECT 1 FROM intakes WHERE id = :iid"), {"iid": iid}).first()
+            if not exists:
+                raise HTTPException(status_code=404, detail="Intake not found")
+    err = _quota_exceeded_error(
+        int((stats or {}).get("file_count") or 0),
+        int((stats or {}).get("total_bytes") or 0),
+        incoming_size,
+    )
+    if err:
+        raise err
 
 
 def get_evidence_timeline_for_admin(request: Request, intake_id: str) -> Dict[str, Any]:
@@ -380,22 +495,126 @@ def get_evidence_timeline_for_admin(request: Request, intake_id: str) -> Dict[st
     return {"intake_id": iid, "files": files, "timeline": timeline}
 
 
-def get_evidence_file_for_admin(request: Request, evidence_id: str):
-    require_admin_access(request)
-    if not engine:
-        raise HTTPException(status_code=503, detail="Database not configured")
+_EVIDENCE_ROW_CACHE_SIZE = 512
+_evidence_row_cache: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+_evidence_cache_lock = threading.Lock()
+
+
+def _lookup_evidence_row(evidence_id: str) -> Optional[Dict[str, str]]:
+    """Evidence rows are immutable once written, so cache them until the intake is deleted."""
+    eid = (evidence_id or "").strip()
+    with _evidence_cache_lock:
+        cached = _evidence_row_cache.get(eid)
+        if cached is not None:
+            _evidence_row_cache.move_to_end(eid)
+            return cached
     ensure_evidence_tables()
     with engine.begin() as conn:
         row = conn.execute(
-            text("SELECT original_name, stored_name FROM evidence_files WHERE id = :id"),
-            {"id": (evidence_id or "").strip()},
+            text("SELECT intake_id, original_name, stored_name FROM evidence_files WHERE id = :id"),
+            {"id": eid},
         ).mappings().first()
+    if not row:
+        return None
+    entry = {
+        "intake_id": str(row.get("intake_id") or ""),
+        "original_name": str(row.get("original_name") or "evidence"),
+        "stored_name": str(row.get("stored_name") or ""),
+    }
+    with _evidence_cache_lock:
+        _evidence_row_cache[eid] = entry
+        while len(_evidence_row_cache) > _EVIDENCE_ROW_CACHE_SIZE:
+            _evidence_row_cache.popitem(last=False)
+    return entry
+
+
+def invalidate_evidence_cache_for_intake(intake_id: str) -> None:
+    iid = (intake_id or "").strip()
+    with _evidence_cache_lock:
+        for eid in [k for k, v in _evidence_row_cache.items() if v.get("intake_id") == iid]:
+            _evidence_row_cache.pop(eid, None)
+
+
+def _etag_matches(header_value: str, etag: str) -> bool:
+    candidates = [c.strip() for c in (header_value or "").split(",") if c.strip()]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _parse_byte_range(header_value: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=a-b' range. Returns None to serve the full file (multi-range/garbled)."""
+    raw = (header_value or "").strip().lower()
+    if not raw.startswith("bytes=") or "," in raw:
+        return None
+    start_s, _, end_s = raw[len("bytes="):].partition("-")
+    try:
+        if start_s.strip() == "":
+            suffix = int(end_s)
+            if suffix <= 0:
+                raise ValueError
+            start, end = max(0, size - suffix), size - 1
+        else:
+            start = int(start_s)
+            end = int(end_s) if end_s.strip() else size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def get_evidence_file_for_admin(request: Request, evidence_id: str):
+    require_admin_access(request)
+    if not engine:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    row = _lookup_evidence_row(evidence_id)
     if not row:
         raise HTTPException(status_code=404, detail="Evidence file not found")
-    stored_name = str(row.get("stored_name") or "")
-    original_name = str(row.get("original_name") or "evidence")
-    target = (UPLOAD_ROOT / stored_name).resolve()
-    if not str(target).startswith(str(UPLOAD_ROOT.resolve())) or not target.is_file():
+    stored_name = row["stored_name"]
+    original_name = row["original_name"]
+    storage = get_evidence_storage()
+    stored = storage.stat(stored_name)
+    if not stored:
         raise HTTPException(status_code=404, detail="Stored evidence file missing")
-    return FileResponse(path=str(target), filename=original_name)
 
+    size = stored.size
+    etag = stored.etag
+    cache_headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stored.modified_at, usegmt=True),
+        "Accept-Ranges": "bytes",
+        # Admin-only content: browsers may keep it but must revalidate each time.
+        "Cache-Control": "private, no-cache",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    range_header = request.headers.get("range", "")
+    if_range = (request.headers.get("if-range") or "").strip()
+    byte_range = None
+    if range_header and (not if_range or if_range == etag):
+        byte_range = _parse_byte_range(range_header, size)
+    local_path = storage.local_path(stored_name)
+    if byte_range is None and local_path is not None:
+        return FileResponse(path=str(local_path), filename=original_name, headers=cache_headers)
+
+    start, end = byte_range if byte_range is not None else (0, size - 1)
+    media_type = mimetypes.guess_type(original_name)[0] or "application/octet-stream"
+    headers = {
+        **cache_headers,
+        "Content-Length": str(end - start + 1),
+        "Content-Disposition": f"attachment; filename*=utf-8''{quote(original_name)}",
+    }
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        storage.iter_range(stored_name, start, end),
+        status_code=206 if byte_range is not None else 200,
+        media_type=media_type,
+        headers=headers,
+    )
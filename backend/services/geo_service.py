@@ -0,0 +1,227 @@
+"""
+ZIP centroids and nearest-location lookups for referrals and resources.
+
+Referral office coordinates come from referral_office_geo.json; referrals are ranked by direct haversine
+distance since each topic lists only a handful of offices. Active resources, placed at their postal_code
+centroid, live in a small in-memory KD-tree. Points are stored as 3-D unit vectors, so the tree's
+straight-line (chord) distance orders results exactly like great-circle distance.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+try:
+    from .config_service import DATA_DIR, REFERRAL_OFFICE_GEO_PATH, engine
+    from .resource_cache import RESOURCE_CACHE_TTL_SECONDS, catalog_version
+except ImportError:
+    from services.config_service import DATA_DIR, REFERRAL_OFFICE_GEO_PATH, engine  # type: ignore
+    from services.resource_cache import RESOURCE_CACHE_TTL_SECONDS, catalog_version  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+ZIP_CENTROIDS_PATH = os.getenv("ZIP_CENTROIDS_PATH", os.path.join(DATA_DIR, "il_zip_centroids.json"))
+
+EARTH_RADIUS_MILES = 3958.7613
+
+
+def haversine_miles(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in miles (same formula as frontend/src/utils/geoZip.js)."""
+    d_lat = math.radians(lat2 - lat1)
+    d_lng = math.radians(lng2 - lng1)
+    a = math.sin(d_lat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lng / 2) ** 2
+    return EARTH_RADIUS_MILES * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _unit_vector(lat: float, lng: float) -> Tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lng)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def _chord_to_miles(chord: float) -> float:
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, chord / 2))
+
+
+def _miles_to_chord(miles: float) -> float:
+    return 2 * math.sin(min(math.pi / 2, miles / (2 * EARTH_RADIUS_MILES)))
+
+
+@dataclass(frozen=True)
+class GeoPoint:
+    key: Any
+    latitude: float
+    longitude: float
+
+
+class KDTree:
+    """Static 3-D KD-tree; nodes are (point_index, axis, left, right) tuples."""
+
+    def __init__(self, points: Sequence[GeoPoint]):
+        self.points = list(points)
+        self._vectors = [_unit_vector(p.latitude, p.longitude) for p in self.points]
+        self._root = self._build(list(range(len(self.points))), 0)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self, indices: List[int], depth: int):
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self._vectors[i][axis])
+        mid = len(indices) // 2
+        return (indices[mid], axis, self._build(indices[:mid], depth + 1), self._build(indices[mid + 1 :], depth + 1))
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int = 5, max_miles: Optional[float] = None
+    ) -> List[Tuple[GeoPoint, float]]:
+        """Up to `k` points closest to (latitude, longitude), nearest first, as (point, miles) pairs."""
+        if k <= 0 or self._root is None:
+            return []
+        target = _unit_vector(latitude, longitude)
+        limit_sq = _miles_to_chord(max_miles) ** 2 if max_miles is not None else float("inf")
+        best: List[Tuple[float, int]] = []  # (squared chord, index), kept sorted, at most k long
+
+        def visit(node) -> None:
+            if node is None:
+                return
+            idx, axis, left, right = node
+            vec = self._vectors[idx]
+            dist_sq = (vec[0] - target[0]) ** 2 + (vec[1] - target[1]) ** 2 + (vec[2] - target[2]) ** 2
+            if dist_sq <= limit_sq and (len(best) < k or dist_sq < best[-1][0]):
+                best.append((dist_sq, idx))
+                best.sort()
+                del best[k:]
+            diff = target[axis] - vec[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            bound = best[-1][0] if len(best) == k else limit_sq
+            if diff * diff <= bound:
+                visit(far)
+
+        visit(self._root)
+        return [(self.points[idx], round(_chord_to_miles(math.sqrt(dist_sq)), 1)) for dist_sq, idx in best]
+
+
+def _load_json(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning("could not read %s: %s", path, e)
+        return {}
+
+
+def _coords(entry: Any) -> Optional[Tuple[float, float]]:
+    if not isinstance(entry, dict):
+        return None
+    try:
+        return float(entry["latitude"]), float(entry["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+_zip5: Dict[str, Tuple[float, float]] = {}
+_zip3: Dict[str, Tuple[float, float]] = {}
+_zip_loaded = False
+_office_state: Dict[str, Any] = {"mtime": None, "coords": {}}
+_resource_state: Dict[str, Any] = {"version": None, "built_at": 0.0, "tree": KDTree([])}
+_zip_lock = threading.Lock()
+_office_lock = threading.Lock()
+_resource_lock = threading.Lock()
+
+
+def _ensure_zip_table() -> None:
+    global _zip_loaded
+    if _zip_loaded:
+        return
+    with _zip_lock:
+        if _zip_loaded:
+            return
+        data = _load_json(ZIP_CENTROIDS_PATH)
+        for table, section in ((_zip5, "zip5"), (_zip3, "zip3")):
+            for zip_code, entry in (data.get(section) or {}).items():
+                coords = _coords(entry)
+                if coords:
+                    table[str(zip_code)] = coords
+        _zip_loaded = True
+
+
+def zip_centroid(zip_code: Optional[str]) -> Optional[Tuple[float, float]]:
+    """(latitude, longitude) for a ZIP, falling back to its 3-digit prefix; None when unknown."""
+    z = (zip_code or "").strip()[:5]
+    if len(z) != 5 or not z.isdigit():
+        return None
+    _ensure_zip_table()
+    return _zip5.get(z) or _zip3.get(z[:3])
+
+
+def _office_index() -> Dict[str, Tuple[float, float]]:
+    try:
+        mtime = os.path.getmtime(REFERRAL_OFFICE_GEO_PATH)
+    except OSError:
+        mtime = None
+    if _office_state["mtime"] != mtime:
+        with _office_lock:
+            if _office_state["mtime"] != mtime:
+                coords = {}
+                for name, entry in _load_json(REFERRAL_OFFICE_GEO_PATH).items():
+                    point = _coords(entry)
+                    if point:
+                        coords[name] = point
+                _office_state.update(mtime=mtime, coords=coords)
+    return _office_state["coords"]
+
+
+def office_coordinates(name: Optional[str]) -> Optional[Tuple[float, float]]:
+    if not name:
+        return None
+    return _office_index().get(name)
+
+
+def _resource_index() -> KDTree:
+    version = catalog_version()
+    now = time.monotonic()
+    state = _resource_state
+    if state["version"] == version and now - state["built_at"] < RESOURCE_CACHE_TTL_SECONDS:
+        return state["tree"]
+    with _resource_lock:
+        if state["version"] == version and now - state["built_at"] < RESOURCE_CACHE_TTL_SECONDS:
+            return state["tree"]
+        points: List[GeoPoint] = []
+        if engine is not None:
+            try:
+                with engine.connect() as conn:
+                    rows = conn.execute(
+                        text("SELECT id, postal_code FROM resources WHERE is_active = :active AND postal_code IS NOT NULL"),
+                        {"active": True},
+                    ).all()
+            except Exception as e:
+                logger.warning("could not load resource locations: %s", e)
+                rows = []
+            for resource_id, postal_code in rows:
+                centroid = zip_centroid(postal_code)
+                if centroid:
+                    points.append(GeoPoint(int(resource_id), centroid[0], centroid[1]))
+        state.update(version=version, built_at=time.monotonic(), tree=KDTree(points))
+        return state["tree"]
+
+
+def nearest_resource_ids(zip_code: Optional[str], k: int, max_miles: Optional[float] = None) -> Dict[int, float]:
+    """{resource_id: miles} for up to `k` active resources located nearest to `zip_code`."""
+    origin = zip_centroid(zip_code)
+    if origin is None:
+        return {}
+    return {p.key: miles for p, miles in _resource_index().nearest(origin[0], origin[1], k=k, max_miles=max_miles)}
@@ -7,12 +7,19 @@ import logging
 from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
+try:
+    from .request_metrics import external_call
+    from .tracing import traced
+except ImportError:
+    from services.request_metrics import external_call  # type: ignore
+    from services.tracing import traced  # type: ignore
+
+# The Google client libraries add ~150 ms to import; they are loaded on first send, not at startup.
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +52,9 @@ def gmail_api_configured() -> bool:
 
 def _get_credentials() -> Credentials:
     """Always request a fresh access token via the refresh token before every send."""
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+
     client_id, client_secret, refresh_token, _ = _load_config()
     if not all([client_id, client_secret, refresh_token]):
         raise RuntimeError(
@@ -60,11 +70,13 @@ def _get_credentials() -> Credentials:
         client_secret=client_secret,
         scopes=_SCOPES,
     )
-    creds.refresh(Request())
+    with external_call("gmail"):
+        creds.refresh(Request())
     logger.debug("Gmail API: access token refreshed, expiry=%s", creds.expiry)
     return creds
 
 
+@traced("email.send")
 def send_email(
     to_email: str,
     subject: str,
@@ -128,10 +140,14 @@ def send_email(
 
     raw = base64.urlsafe_b64encode(msg.as_bytes()).decode("ascii")
 
+    from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
+
     try:
         # cache_discovery=False avoids ephemeral filesystem issues on cloud hosts like Render.
         service = build("gmail", "v1", credentials=creds, cache_discovery=False)
-        service.users().messages().send(userId="me", body={"raw": raw}).execute()
+        with external_call("gmail"):
+            service.users().messages().send(userId="me", body={"raw": raw}).execute()
         logger.info("Gmail API: email sent successfully to %s", to_email)
         return True
     except HttpError as e:
@@ -0,0 +1,258 @@
+"""Async access to Groq chat completions with a concurrency cap, rate limiting, retries and request coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    from .request_metrics import external_call
+except ImportError:
+    from services.request_metrics import external_call  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Defaults match Groq's free tier for llama-3.1-8b-instant (30 requests/minute); raise them on paid plans.
+GROQ_MAX_CONCURRENCY = max(1, int(os.getenv("GROQ_MAX_CONCURRENCY", "8") or "8"))
+GROQ_REQUESTS_PER_MINUTE = max(1.0, float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30") or "30"))
+GROQ_BURST = max(1.0, float(os.getenv("GROQ_BURST", "5") or "5"))
+GROQ_MAX_RETRIES = max(0, int(os.getenv("GROQ_MAX_RETRIES", "3") or "3"))
+GROQ_BACKOFF_BASE_SECONDS = float(os.getenv("GROQ_BACKOFF_BASE_SECONDS", "0.5") or "0.5")
+GROQ_BACKOFF_MAX_SECONDS = float(os.getenv("GROQ_BACKOFF_MAX_SECONDS", "8") or "8")
+# Waiting longer than this for a rate-limit slot is worse for the user than a fast 503.
+GROQ_QUEUE_TIMEOUT_SECONDS = float(os.getenv("GROQ_QUEUE_TIMEOUT_SECONDS", "20") or "20")
+# Open streams hold their own slot for their whole life (separate from GROQ_MAX_CONCURRENCY, so long
+# generations do not starve short requests).
+GROQ_MAX_STREAMS = max(1, int(os.getenv("GROQ_MAX_STREAMS", "8") or "8"))
+
+
+class GroqUnavailableError(Exception):
+    """Raised when the request could not be admitted or all retries were exhausted."""
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while True:
+            async with self._lock:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                raise GroqUnavailableError("AI assistant is busy; please try again shortly.")
+            await asyncio.sleep(wait)
+
+
+class _InflightCall:
+    """One upstream call shared by every concurrent caller with the same request key."""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+_client = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_stream_semaphore: Optional[asyncio.Semaphore] = None
+_bucket: Optional[TokenBucket] = None
+_inflight: Dict[str, _InflightCall] = {}
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        from groq import AsyncGroq
+
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            raise GroqUnavailableError("AI assistant is not configured")
+        # Retries are handled here (with jitter and rate-limit awareness), not by the SDK.
+        _client = AsyncGroq(api_key=api_key, max_retries=0)
+    return _client
+
+
+def _limits() -> tuple[asyncio.Semaphore, TokenBucket]:
+    global _semaphore, _bucket
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(GROQ_MAX_CONCURRENCY)
+    if _bucket is None:
+        _bucket = TokenBucket(GROQ_REQUESTS_PER_MINUTE / 60.0, GROQ_BURST)
+    return _semaphore, _bucket
+
+
+def _is_retryable(exc: Exception) -> bool:
+    try:
+        from groq import APIConnectionError, APIStatusError
+    except Exception:
+        return False
+    if isinstance(exc, APIConnectionError):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    response = getattr(exc, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), GROQ_BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    # Full jitter: spreads retries from concurrent requests instead of synchronising them.
+    return random.uniform(0, min(GROQ_BACKOFF_MAX_SECONDS, GROQ_BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+async def _create_with_retries(**kwargs):
+    client = _get_client()
+    semaphore, bucket = _limits()
+    attempt = 0
+    while True:
+        await bucket.acquire(GROQ_QUEUE_TIMEOUT_SECONDS)
+        try:
+            async with semaphore:
+                with external_call("groq"):
+                    return await client.chat.completions.create(**kwargs)
+        except Exception as e:
+            if attempt >= GROQ_MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = _retry_delay(e, attempt)
+            logger.warning(
+                "Groq call failed (%s); retry %d/%d in %.2fs",
+                type(e).__name__,
+                attempt + 1,
+                GROQ_MAX_RETRIES,
+                delay,
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+def _request_key(model: str, messages: List[Dict[str, str]], temperature: float) -> str:
+    payload = json.dumps({"m": model, "t": temperature, "msgs": messages}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _forget_inflight(key: str, call: _InflightCall) -> None:
+    if _inflight.get(key) is call:
+        del _inflight[key]
+
+
+def _on_inflight_done(key: str, call: _InflightCall, task: "asyncio.Task[Any]") -> None:
+    _forget_inflight(key, call)
+    if not task.cancelled():
+        # Mark retrieved so a failure nobody awaited does not log "exception never retrieved".
+        task.exception()
+
+
+async def chat_completion(model: str, messages: List[Dict[str, str]], temperature: float):
+    """
+    Non-streaming completion. Identical concurrent prompts share one upstream call, which runs in its own
+    task: a caller that is cancelled (client disconnect) stops waiting without cancelling the others. The
+    upstream call is cancelled only when its last waiter has gone.
+    """
+    key = _request_key(model, messages, temperature)
+    call = _inflight.get(key)
+    if call is None:
+        task = asyncio.ensure_future(_create_with_retries(model=model, messages=messages, temperature=temperature))
+        call = _InflightCall(task)
+        _inflight[key] = call
+        task.add_done_callback(lambda t, key=key, call=call: _on_inflight_done(key, call, t))
+
+    call.waiters += 1
+    try:
+        return await asyncio.shield(call.task)
+    finally:
+        call.waiters -= 1
+        if call.waiters == 0 and not call.task.done():
+            # Nobody is left to use the answer; drop it from the map first so a new caller starts afresh.
+            _forget_inflight(key, call)
+            call.task.cancel()
+
+
+def _stream_limit() -> asyncio.Semaphore:
+    global _stream_semaphore
+    if _stream_semaphore is None:
+        _stream_semaphore = asyncio.Semaphore(GROQ_MAX_STREAMS)
+    return _stream_semaphore
+
+
+class _SlotHeldStream:
+    """Async iterator over an upstream stream that releases its GROQ_MAX_STREAMS slot when the stream ends,
+    fails or is closed."""
+
+    def __init__(self, upstream, slots: asyncio.Semaphore):
+        self._upstream = upstream
+        self._iterator = upstream.__aiter__()
+        self._slots: Optional[asyncio.Semaphore] = slots
+
+    def _release(self) -> None:
+        slots, self._slots = self._slots, None
+        if slots is not None:
+            slots.release()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._slots is None:
+            raise StopAsyncIteration
+        try:
+            return await self._iterator.__anext__()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self) -> None:
+        if self._slots is None:
+            return
+        self._release()
+        close = getattr(self._upstream, "close", None)
+        if close is not None:
+            try:
+                await close()
+            except Exception as e:
+                logger.warning("closing Groq stream failed: %s: %s", type(e).__name__, e)
+
+    def __del__(self):
+        # Safety net for a stream dropped without being exhausted or closed.
+        self._release()
+
+
+async def chat_completion_stream(model: str, messages: List[Dict[str, str]], temperature: float):
+    """
+    Open a streaming completion. Retries cover connection setup only. The stream holds one of
+    GROQ_MAX_STREAMS slots until it is exhausted or closed (call aclose() when abandoning it).
+    """
+    slots = _stream_limit()
+    try:
+        await asyncio.wait_for(slots.acquire(), GROQ_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise GroqUnavailableError("AI assistant is busy; please try again shortly.")
+    try:
+        upstream = await _create_with_retries(model=model, messages=messages, temperature=temperature, stream=True)
+    except BaseException:
+        slots.release()
+        raise
+    return _SlotHeldStream(upstream, slots)
@@ -23,7 +23,16 @@ try:
     from ..models.email_verification import EmailVerificationToken
     from .auth_password_service import hash_password
     from .admin_auth_service import admin_login_configured, admin_request_authorized
-    from .config_service import ADMIN_EMAIL, ADMIN_EXPORT_KEY, ADMIN_JWT_SECRET, engine, groq_configured
+    from .config_service import ADMIN_EMAIL, ADMIN_EXPORT_KEY, ADMIN_JWT_SECRET, engine
+    from .email_outbox import (
+        STATUSES as EMAIL_OUTBOX_STATUSES,
+        email_outbox_enabled,
+        list_outbox,
+        outbox_counts,
+        requeue_email,
+    )
+    from .llm_provider import LLM_PROVIDER, llm_configured
+    from .tracing import span, traced
     from .transactional_email import (
         email_provider_configured,
         email_provider_hint,
@@ -35,7 +44,16 @@ except ImportError:
     from models.email_verification import EmailVerificationToken  # type: ignore
     from services.auth_password_service import hash_password  # type: ignore
     from services.admin_auth_service import admin_login_configured, admin_request_authorized  # type: ignore
-    from services.config_service import ADMIN_EMAIL, ADMIN_EXPORT_KEY, ADMIN_JWT_SECRET, engine, groq_configured  # type: ignore
+    from services.config_service import ADMIN_EMAIL, ADMIN_EXPORT_KEY, ADMIN_JWT_SECRET, engine  # type: ignore
+    from services.email_outbox import (  # type: ignore
+        STATUSES as EMAIL_OUTBOX_STATUSES,
+        email_outbox_enabled,
+        list_outbox,
+        outbox_counts,
+        requeue_email,
+    )
+    from services.llm_provider import LLM_PROVIDER, llm_configured  # type: ignore
+    from services.tracing import span, traced  # type: ignore
     from services.transactional_email import (  # type: ignore
         email_provider_configured,
         email_provider_hint,
@@ -208,6 +226,7 @@ def _extract_deadlines_from_text(text_value: str, source_type: str) -> List[Dict
     return out
 
 
+@traced("intake.refresh_deadlines")
 def refresh_deadlines_for_intake(conn, intake_id: str) -> None:
     iid = (intake_id or "").strip()
     if not iid:
@@ -362,7 +381,7 @@ def ensure_triage_sessions_table_exists() -> None:
         with engine.begin() as conn:
             _apply_triage_sessions_ddl(conn)
     except Exception as e:
-        print(f"Warning: ensure_triage_sessions_table_exists failed: {e}")
+        logger.warning("ensure_triage_sessions_table_exists failed: %s", e)
 
 
 _tables_ensured = False
@@ -458,7 +477,7 @@ def _run_ensure_tables():
             conn.execute(text(create_events))
             conn.execute(text(create_deadlines))
     except SQLAlchemyError as e:
-        print(f"Warning: ensure_tables (base tables) failed: {e}")
+        logger.warning("ensure_tables (base tables) failed: %s", e)
 
     # Phase 2: triage_sessions (separate so its creation is never rolled back
     # by a migration failure below)
@@ -466,7 +485,7 @@ def _run_ensure_tables():
         with engine.begin() as conn:
             _apply_triage_sessions_ddl(conn)
     except SQLAlchemyError as e:
-        print(f"Warning: ensure_tables (triage_sessions) failed: {e}")
+        logger.warning("ensure_tables (triage_sessions) failed: %s", e)
 
     # Phase 3: indexes for base tables
     try:
@@ -474,7 +493,7 @@ def _run_ensure_tables():
             conn.execute(text(create_events_index))
             conn.execute(text(create_deadlines_index))
     except SQLAlchemyError as e:
-        print(f"Warning: ensure_tables (indexes) failed: {e}")
+        logger.warning("ensure_tables (indexes) failed: %s", e)
 
     # Phase 4: column migrations — one transaction each so a single failure
     # never prevents the others from running
@@ -491,14 +510,14 @@ def _run_ensure_tables():
             with engine.begin() as conn:
                 migration_fn(conn)
         except Exception as e:
-            print(f"Warning: migration {migration_fn.__name__} skipped: {e}")
+            logger.warning("migration %s skipped: %s", migration_fn.__name__, e)
 
     # Phase 5: callback_requests table
     try:
         with engine.begin() as conn:
             conn.execute(text(create_callback_requests))
     except SQLAlchemyError as e:
-        print(f"Warning: ensure_tables (callback_requests) failed: {e}")
+        logger.warning("ensure_tables (callback_requests) failed: %s", e)
 
     # Phase 6: intake_progress_sessions (QR resume feature)
     try:
@@ -506,7 +525,7 @@ def _run_ensure_tables():
             conn.execute(text(_CREATE_INTAKE_PROGRESS_SESSIONS_SQL))
             conn.execute(text(_CREATE_INTAKE_PROGRESS_SESSIONS_INDEX_SQL))
     except SQLAlchemyError as e:
-        print(f"Warning: ensure_tables (intake_progress_sessions) failed: {e}")
+        logger.warning("ensure_tables (intake_progress_sessions) failed: %s", e)
 
     # Phase 7: notifications (in-app status change alerts)
     try:
@@ -514,7 +533,7 @@ def _run_ensure_tables():
             conn.execute(text(_CREATE_NOTIFICATIONS_SQL))
             conn.execute(text(_CREATE_NOTIFICATIONS_INDEX_SQL))
     except SQLAlchemyError as e:
-        print(f"Warning: ensure_tables (notifications) failed: {e}")
+        logger.warning("ensure_tables (notifications) failed: %s", e)
 
 
 def _migrate_intakes_admin_status(conn) -> None:
@@ -836,7 +855,7 @@ def log_intake_event(intake_id: Optional[str], event_type: str, event_value: Opt
         return
     event_type_norm = (event_type or "").strip().lower()
     try:
-        with engine.begin() as conn:
+        with span("intake.log_event", **{"intake.event_type": event_type_norm}), engine.begin() as conn:
             conn.execute(
                 text("""
                 INSERT INTO intake_events (id, intake_id, event_type, event_value, created_at)
@@ -857,7 +876,7 @@ def log_intake_event(intake_id: Optional[str], event_type: str, event_value: Opt
             if event_type_norm in {"problem_summary", "problem_summary_alternate_topic"}:
                 refresh_deadlines_for_intake(conn, intake_id)
     except Exception as e:
-        print(f"Warning: failed to log intake event '{event_type}': {e}")
+        logger.warning("failed to log intake event '%s': %s", event_type, e)
 
 
 def create_intake_start(req, db: Session, supported_langs: set[str]):
@@ -913,7 +932,7 @@ def create_intake_start(req, db: Session, supported_langs: set[str]):
             from .email_verification_service import send_verification_email
             send_verification_email(email_norm, req.first_name.strip(), db)
         except Exception as exc:
-            print(f"Warning: verification email failed for {email_norm}: {type(exc).__name__}: {exc}")
+            logger.warning("verification email failed for %s: %s: %s", email_norm, type(exc).__name__, exc)
 
         return {"status": "success", "intake_id": intake_id}
     except SQLAlchemyError as e:
@@ -1566,7 +1585,7 @@ def create_notification(intake_id: str, message: str) -> None:
                 },
             )
     except Exception as e:
-        print(f"Warning: failed to create notification for intake {intake_id}: {e}")
+        logger.warning("failed to create notification for intake %s: %s", intake_id, e)
 
 
 def set_intake_admin_status(
@@ -1718,6 +1737,7 @@ def admin_delete_intake(request: Request, intake_id: str, db: Session) -> dict:
     try:
         # Delete child rows in FK-dependency order before removing the intake
         db.execute(text("DELETE FROM evidence_files WHERE intake_id = :iid"), {"iid": iid})
+        db.execute(text("DELETE FROM evidence_quota WHERE intake_id = :iid"), {"iid": iid})
         db.execute(text("DELETE FROM intake_events WHERE intake_id = :iid"), {"iid": iid})
         db.execute(text("DELETE FROM triage_sessions WHERE intake_id = :iid"), {"iid": iid})
         db.execute(text("DELETE FROM intake_deadlines WHERE intake_id = :iid"), {"iid": iid})
@@ -1729,6 +1749,11 @@ def admin_delete_intake(request: Request, intake_id: str, db: Session) -> dict:
             db.query(EmailVerificationToken).filter(EmailVerificationToken.email == email).delete(synchronize_session=False)
         db.delete(row)
         db.commit()
+        try:
+            from .evidence_service import invalidate_evidence_cache_for_intake
+        except ImportError:
+            from services.evidence_service import invalidate_evidence_cache_for_intake  # type: ignore
+        invalidate_evidence_cache_for_intake(iid)
         return {"ok": True, "id": iid}
     except Exception as e:
         logger.error("admin_delete_intake failed for intake_id=%s: %s: %s", iid, type(e).__name__, e, exc_info=True)
@@ -2223,6 +2248,25 @@ def basic_analytics(request: Request, db: Session, period: Optional[str] = None)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+def list_email_outbox_for_admin(request: Request, status: Optional[str] = None) -> dict:
+    require_admin_access(request)
+    status_norm = (status or "").strip().lower() or None
+    if status_norm and status_norm not in EMAIL_OUTBOX_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(EMAIL_OUTBOX_STATUSES)}")
+    return {
+        "enabled": email_outbox_enabled(),
+        "counts": outbox_counts(),
+        "items": list_outbox(status_norm),
+    }
+
+
+def retry_email_outbox_for_admin(request: Request, email_id: str) -> dict:
+    require_admin_access(request)
+    if not requeue_email((email_id or "").strip()):
+        raise HTTPException(status_code=404, detail="No re-queueable dead-letter email with that id")
+    return {"ok": True, "id": email_id, "status": "pending"}
+
+
 def admin_health_checks(request: Request, db: Session) -> dict:
     """Quick regression-oriented health checks for core app flows."""
     require_admin_access(request)
@@ -2285,31 +2329,36 @@ def admin_health_checks(request: Request, db: Session) -> dict:
             }
         )
 
-    # Check 3: uploads directory write access.
+    # Check 3: evidence storage backend write access.
     try:
-        from pathlib import Path
+        try:
+            from .storage_service import get_evidence_storage
+        except ImportError:
+            from services.storage_service import get_evidence_storage  # type: ignore
 
-        upload_root = Path(__file__).resolve().parents[1] / "uploads" / "documents"
-        upload_root.mkdir(parents=True, exist_ok=True)
-        probe = upload_root / f".probe_{os.urandom(6).hex()}"
-        probe.write_text("ok", encoding="utf-8")
-        probe.unlink(missing_ok=True)
+        storage = get_evidence_storage()
+        location = storage.healthcheck()
         checks.append(
             {
                 "name": "Upload storage writable",
                 "status": "pass",
-                "detail": str(upload_root),
+                "detail": f"{storage.name}: {location}",
             }
         )
     except Exception as e:
         checks.append({"name": "Upload storage writable", "status": "fail", "detail": str(e)})
 
-    # Check 4: optional AI provider status.
+    # Check 4: optional AI provider status. The local provider's canned output is never saved as a summary.
+    summaries_ok = llm_configured() and LLM_PROVIDER != "local"
     checks.append(
         {
             "name": "AI summarization provider",
-            "status": "pass" if groq_configured else "warn",
-            "detail": "Configured" if groq_configured else "Not configured (fallback summaries active).",
+            "status": "pass" if summaries_ok else "warn",
+            "detail": (
+                f"Configured (LLM_PROVIDER={LLM_PROVIDER})."
+                if summaries_ok
+                else f"Not configured or local test provider (LLM_PROVIDER={LLM_PROVIDER}); fallback summaries active."
+            ),
         }
     )
 
@@ -2323,6 +2372,23 @@ def admin_health_checks(request: Request, db: Session) -> dict:
         }
     )
 
+    # Check 5b: email outbox backlog and dead letters.
+    if email_outbox_enabled():
+        try:
+            counts = outbox_counts()
+            checks.append(
+                {
+                    "name": "Email outbox",
+                    "status": "warn" if counts["dead"] else "pass",
+                    "detail": (
+                        f"Pending: {counts['pending'] + counts['sending']}. Dead-letter: {counts['dead']}"
+                        + (" (see GET /admin/email-outbox?status=dead)." if counts["dead"] else ".")
+                    ),
+                }
+            )
+        except Exception as e:
+            checks.append({"name": "Email outbox", "status": "fail", "detail": str(e)})
+
     # Check 6: admin auth configuration sanity.
     has_admin_email = bool((ADMIN_EMAIL or "").strip())
     has_admin_jwt = bool((ADMIN_JWT_SECRET or "").strip() or (ADMIN_EXPORT_KEY or "").strip())
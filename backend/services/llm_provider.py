@@ -0,0 +1,305 @@
+"""
+Chat-completion providers behind one interface, selected by LLM_PROVIDER:
+
+  groq           Groq cloud via services/groq_gateway.py (default)
+  local          deterministic template model; no network, fixed latency (load tests, offline dev)
+  openai_compat  any OpenAI-compatible server, e.g. llama.cpp `llama-server` or Ollama at LLM_LOCAL_BASE_URL
+
+LLM_FALLBACK_PROVIDER names a second provider used when the primary is unavailable or errors.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+
+try:
+    from .groq_gateway import GroqUnavailableError, chat_completion, chat_completion_stream
+    from .token_budget import estimate_tokens
+except ImportError:
+    from services.groq_gateway import GroqUnavailableError, chat_completion, chat_completion_stream  # type: ignore
+    from services.token_budget import estimate_tokens  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+LLM_PROVIDER = (os.getenv("LLM_PROVIDER") or "groq").strip().lower()
+LLM_FALLBACK_PROVIDER = (os.getenv("LLM_FALLBACK_PROVIDER") or "").strip().lower()
+LLM_LOCAL_LATENCY_MS = max(0.0, float(os.getenv("LLM_LOCAL_LATENCY_MS", "0") or "0"))
+LLM_LOCAL_TOKENS_PER_SECOND = max(0.0, float(os.getenv("LLM_LOCAL_TOKENS_PER_SECOND", "0") or "0"))
+LLM_LOCAL_BASE_URL = (os.getenv("LLM_LOCAL_BASE_URL") or "http://127.0.0.1:8080/v1").rstrip("/")
+LLM_LOCAL_MODEL = (os.getenv("LLM_LOCAL_MODEL") or "local").strip()
+LLM_LOCAL_TIMEOUT_SECONDS = float(os.getenv("LLM_LOCAL_TIMEOUT_SECONDS", "60") or "60")
+
+
+class LLMUnavailableError(Exception):
+    """No configured provider could serve the request."""
+
+
+@dataclass
+class LLMResult:
+    content: str
+    provider: str
+    model: str
+    usage: dict = field(default_factory=dict)
+
+
+@dataclass
+class LLMDelta:
+    text: str = ""
+    usage: Optional[dict] = None
+
+
+def usage_dict(usage) -> dict:
+    if not usage:
+        return {}
+    if isinstance(usage, dict):
+        return {k: int(usage.get(k) or 0) for k in ("prompt_tokens", "completion_tokens", "total_tokens")}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+        "completion_tokens": getattr(usage, "completion_tokens", 0),
+        "total_tokens": getattr(usage, "total_tokens", 0),
+    }
+
+
+class LLMProvider(ABC):
+    name = "base"
+
+    @property
+    @abstractmethod
+    def model(self) -> str: ...
+
+    def configured(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def complete(self, messages: List[Dict[str, str]], temperature: float) -> LLMResult: ...
+
+    @abstractmethod
+    async def stream(self, messages: List[Dict[str, str]], temperature: float) -> AsyncIterator[LLMDelta]:
+        """Open the stream (errors here are failover-eligible) and return an async iterator of deltas."""
+
+
+class GroqProvider(LLMProvider):
+    name = "groq"
+
+    @property
+    def model(self) -> str:
+        return os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+
+    def configured(self) -> bool:
+        return bool(os.getenv("GROQ_API_KEY"))
+
+    async def complete(self, messages, temperature):
+        response = await chat_completion(model=self.model, messages=messages, temperature=temperature)
+        content = response.choices[0].message.content if response.choices else ""
+        return LLMResult(
+            content=content or "",
+            provider=self.name,
+            model=self.model,
+            usage=usage_dict(getattr(response, "usage", None)),
+        )
+
+    async def stream(self, messages, temperature):
+        upstream = await chat_completion_stream(model=self.model, messages=messages, temperature=temperature)
+
+        async def _deltas() -> AsyncIterator[LLMDelta]:
+            try:
+                async for chunk in upstream:
+                    text = ""
+                    if chunk.choices:
+                        text = getattr(chunk.choices[0].delta, "content", None) or ""
+                    # Groq reports usage on the final chunk under x_groq; OpenAI-style servers use .usage.
+                    chunk_usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+                    yield LLMDelta(text=text, usage=usage_dict(chunk_usage) if chunk_usage else None)
+            finally:
+                # Frees the gateway's stream slot when the client disconnects mid-stream.
+                await upstream.aclose()
+
+        return _deltas()
+
+
+class LocalTemplateProvider(LLMProvider):
+    """
+    Deterministic stand-in: same input, same output, no network. Latency is simulated from
+    LLM_LOCAL_LATENCY_MS (time to first token) and LLM_LOCAL_TOKENS_PER_SECOND (0 = instant).
+    """
+
+    name = "local"
+
+    @property
+    def model(self) -> str:
+        return "local-template"
+
+    def _reply(self, messages: List[Dict[str, str]]) -> str:
+        question = ""
+        for m in reversed(messages):
+            if m.get("role") == "user":
+                question = " ".join((m.get("content") or "").split())
+                break
+        system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+        spanish = "Respond ONLY in Spanish" in system
+        ref = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+        if spanish:
+            return (
+                "No soy abogado. Esta es una respuesta de prueba generada localmente "
+                f"sobre: \"{question[:200]}\". Consulte los recursos de ayuda legal de Illinois. (ref {ref})"
+            )
+        return (
+            "I am not a lawyer. This is a locally generated test response about: "
+            f"\"{question[:200]}\". Please check Illinois legal aid resources for your situation. (ref {ref})"
+        )
+
+    def _usage(self, messages, content: str) -> dict:
+        prompt = sum(estimate_tokens(m.get("content") or "") for m in messages)
+        completion = estimate_tokens(content)
+        return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+    async def complete(self, messages, temperature):
+        content = self._reply(messages)
+        delay = LLM_LOCAL_LATENCY_MS / 1000.0
+        if LLM_LOCAL_TOKENS_PER_SECOND:
+            delay += estimate_tokens(content) / LLM_LOCAL_TOKENS_PER_SECOND
+        if delay:
+            await asyncio.sleep(delay)
+        return LLMResult(content=content, provider=self.name, model=self.model, usage=self._usage(messages, content))
+
+    async def stream(self, messages, temperature):
+        content = self._reply(messages)
+        usage = self._usage(messages, content)
+
+        async def _deltas() -> AsyncIterator[LLMDelta]:
+            if LLM_LOCAL_LATENCY_MS:
+                await asyncio.sleep(LLM_LOCAL_LATENCY_MS / 1000.0)
+            words = content.split(" ")
+            for i, word in enumerate(words):
+                if LLM_LOCAL_TOKENS_PER_SECOND:
+                    await asyncio.sleep(1.0 / LLM_LOCAL_TOKENS_PER_SECOND)
+                yield LLMDelta(text=word if i == 0 else f" {word}")
+            yield LLMDelta(usage=usage)
+
+        return _deltas()
+
+
+class OpenAICompatProvider(LLMProvider):
+    """llama.cpp `llama-server`, Ollama (`/v1`), vLLM and similar servers."""
+
+    name = "openai_compat"
+
+    @property
+    def model(self) -> str:
+        return LLM_LOCAL_MODEL
+
+    def _payload(self, messages, temperature, stream: bool) -> dict:
+        return {"model": self.model, "messages": messages, "temperature": temperature, "stream": stream}
+
+    async def complete(self, messages, temperature):
+        import httpx
+
+        async with httpx.AsyncClient(timeout=LLM_LOCAL_TIMEOUT_SECONDS) as client:
+            resp = await client.post(f"{LLM_LOCAL_BASE_URL}/chat/completions", json=self._payload(messages, temperature, False))
+            resp.raise_for_status()
+            data = resp.json()
+        choices = data.get("choices") or []
+        content = ((choices[0].get("message") or {}).get("content") if choices else "") or ""
+        return LLMResult(content=content, provider=self.name, model=self.model, usage=usage_dict(data.get("usage")))
+
+    async def stream(self, messages, temperature):
+        import httpx
+
+        client = httpx.AsyncClient(timeout=LLM_LOCAL_TIMEOUT_SECONDS)
+        try:
+            request = client.build_request(
+                "POST", f"{LLM_LOCAL_BASE_URL}/chat/completions", json=self._payload(messages, temperature, True)
+            )
+            resp = await client.send(request, stream=True)
+            resp.raise_for_status()
+        except Exception:
+            await client.aclose()
+            raise
+
+        async def _deltas() -> AsyncIterator[LLMDelta]:
+            try:
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    choices = chunk.get("choices") or []
+                    text = ((choices[0].get("delta") or {}).get("content") if choices else "") or ""
+                    usage = chunk.get("usage")
+                    yield LLMDelta(text=text, usage=usage_dict(usage) if usage else None)
+            finally:
+                await resp.aclose()
+                await client.aclose()
+
+        return _deltas()
+
+
+_PROVIDERS = {
+    "groq": GroqProvider,
+    "local": LocalTemplateProvider,
+    "openai_compat": OpenAICompatProvider,
+}
+_instances: Dict[str, LLMProvider] = {}
+
+
+def get_llm_provider(name: Optional[str] = None) -> LLMProvider:
+    key = (name or LLM_PROVIDER).strip().lower()
+    if key not in _PROVIDERS:
+        raise ValueError(f"Unknown LLM provider {key!r}; expected one of {', '.join(sorted(_PROVIDERS))}")
+    if key not in _instances:
+        _instances[key] = _PROVIDERS[key]()
+    return _instances[key]
+
+
+def _candidates() -> List[LLMProvider]:
+    chain = [get_llm_provider()]
+    if LLM_FALLBACK_PROVIDER and LLM_FALLBACK_PROVIDER != chain[0].name:
+        chain.append(get_llm_provider(LLM_FALLBACK_PROVIDER))
+    return [p for p in chain if p.configured()]
+
+
+def llm_configured() -> bool:
+    return bool(_candidates())
+
+
+async def complete_chat(messages: List[Dict[str, str]], temperature: float) -> LLMResult:
+    """Complete with the primary provider, failing over to LLM_FALLBACK_PROVIDER on any error."""
+    providers = _candidates()
+    if not providers:
+        raise LLMUnavailableError("AI assistant is not configured")
+    last_error: Optional[Exception] = None
+    for provider in providers:
+        try:
+            return await provider.complete(messages, temperature)
+        except Exception as e:
+            last_error = e
+            logger.warning("LLM provider %s failed: %s: %s", provider.name, type(e).__name__, e)
+    if isinstance(last_error, GroqUnavailableError):
+        raise LLMUnavailableError(str(last_error)) from last_error
+    raise last_error  # type: ignore[misc]
+
+
+async def stream_chat(messages: List[Dict[str, str]], temperature: float):
+    """Return (provider, delta iterator). Failover covers stream setup; mid-stream errors surface to the caller."""
+    providers = _candidates()
+    if not providers:
+        raise LLMUnavailableError("AI assistant is not configured")
+    last_error: Optional[Exception] = None
+    for provider in providers:
+        try:
+            return provider, await provider.stream(messages, temperature)
+        except Exception as e:
+            last_error = e
+            logger.warning("LLM provider %s failed to open stream: %s: %s", provider.name, type(e).__name__, e)
+    if isinstance(last_error, GroqUnavailableError):
+        raise LLMUnavailableError(str(last_error)) from last_error
+    raise last_error  # type: ignore[misc]
@@ -66,7 +66,7 @@ def _build_magic_url(plain_token: str) -> str:
     return f"{base}/#/?magic_token={plain_token}"
 
 
-def _send_magic_link_email(to_email: str, magic_url: str) -> bool:
+def _send_magic_link_email(to_email: str, magic_url: str, expires_at: datetime) -> bool:
     subject = "Your sign-in link — Chicago Advocate Legal, NFP"
     text = (
         "Hello,\n\n"
@@ -83,7 +83,7 @@ def _send_magic_link_email(to_email: str, magic_url: str) -> bool:
         "Sign in</a></p>"
         "<p>If you did not request this, you can safely ignore this email.</p>"
     )
-    return send_transactional_email(to_email, subject, text, html)
+    return send_transactional_email(to_email, subject, text, html, expires_at=expires_at)
 
 
 def request_magic_link(payload, db: Session) -> dict:
@@ -113,7 +113,7 @@ def request_magic_link(payload, db: Session) -> dict:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
     magic_url = _build_magic_url(plain)
-    sent = _send_magic_link_email(email, magic_url)
+    sent = _send_magic_link_email(email, magic_url, expires)
     if not sent:
         print(f"Magic link for {email} (email not sent — check logs): {magic_url}")
 
@@ -0,0 +1,151 @@
+"""OCR stage for image evidence: preprocess, run tesseract in a bounded pool, cache by content hash."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import BinaryIO, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tesseract is tuned for ~300 DPI text; phone photos are often 12MP+ with no DPI metadata.
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300") or "300")
+OCR_MAX_EDGE_PX = int(os.getenv("OCR_MAX_EDGE_PX", "2200") or "2200")
+OCR_BINARIZE = os.getenv("OCR_BINARIZE", "true").strip().lower() in ("1", "true", "yes")
+OCR_BINARIZE_THRESHOLD = int(os.getenv("OCR_BINARIZE_THRESHOLD", "160") or "160")
+OCR_MAX_WORKERS = max(1, int(os.getenv("OCR_MAX_WORKERS", "2") or "2"))
+OCR_TIMEOUT_SECONDS = float(os.getenv("OCR_TIMEOUT_SECONDS", "20") or "20")
+OCR_CACHE_SIZE = max(0, int(os.getenv("OCR_CACHE_SIZE", "256") or "256"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS, thread_name_prefix="ocr")
+    return _executor
+
+
+def _cache_get(key: str) -> Optional[str]:
+    with _cache_lock:
+        value = _cache.get(key)
+        if value is not None:
+            _cache.move_to_end(key)
+        return value
+
+
+def _cache_put(key: str, value: str) -> None:
+    if OCR_CACHE_SIZE <= 0:
+        return
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > OCR_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def preprocess_image(img):
+    """Grayscale, scale toward OCR_TARGET_DPI (capped at OCR_MAX_EDGE_PX), optionally binarize."""
+    from PIL import Image, ImageOps  # type: ignore
+
+    img = ImageOps.exif_transpose(img)
+    img = img.convert("L")
+
+    scale = 1.0
+    dpi = img.info.get("dpi")
+    if dpi and isinstance(dpi, tuple) and dpi[0]:
+        try:
+            scale = float(OCR_TARGET_DPI) / float(dpi[0])
+        except (TypeError, ValueError, ZeroDivisionError):
+            scale = 1.0
+    long_edge = max(img.size)
+    if long_edge * scale > OCR_MAX_EDGE_PX:
+        scale = OCR_MAX_EDGE_PX / float(long_edge)
+    if abs(scale - 1.0) > 0.05:
+        new_size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+        img = img.resize(new_size, Image.LANCZOS)
+
+    if OCR_BINARIZE:
+        img = ImageOps.autocontrast(img)
+        threshold = OCR_BINARIZE_THRESHOLD
+        img = img.point(lambda p: 255 if p > threshold else 0, mode="1")
+    return img
+
+
+def _run_tesseract(img) -> str:
+    import pytesseract  # type: ignore
+
+    # pytesseract kills the tesseract subprocess when its own timeout fires.
+    return str(pytesseract.image_to_string(img, timeout=OCR_TIMEOUT_SECONDS) or "").strip()
+
+
+def ocr_image_bytes(content: bytes) -> Tuple[str, Dict[str, float]]:
+    """Return (text, per-stage timings in ms). Never raises; returns '' on any failure."""
+    return ocr_image_stream(io.BytesIO(content or b""))
+
+
+def ocr_image_stream(stream: BinaryIO) -> Tuple[str, Dict[str, float]]:
+    """Like ocr_image_bytes, for a seekable binary file (e.g. the spooled upload); never copies it to bytes."""
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    hasher = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(64 * 1024), b""):
+        hasher.update(chunk)
+    stream.seek(0)
+    digest = hasher.hexdigest()
+    cached = _cache_get(digest)
+    if cached is not None:
+        timings["cache_hit"] = 1.0
+        timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+        return cached, timings
+
+    try:
+        from PIL import Image  # type: ignore
+    except Exception:
+        return "", timings
+
+    try:
+        t0 = time.perf_counter()
+        img = Image.open(stream)
+        img.load()
+        timings["decode"] = round((time.perf_counter() - t0) * 1000, 2)
+
+        t0 = time.perf_counter()
+        img = preprocess_image(img)
+        timings["preprocess"] = round((time.perf_counter() - t0) * 1000, 2)
+
+        t0 = time.perf_counter()
+        future = _get_executor().submit(_run_tesseract, img)
+        try:
+            # Small grace period on top of tesseract's own timeout for queueing behind other uploads.
+            result = future.result(timeout=OCR_TIMEOUT_SECONDS + 5)
+        except FutureTimeoutError:
+            future.cancel()
+            timings["ocr"] = round((time.perf_counter() - t0) * 1000, 2)
+            timings["timed_out"] = 1.0
+            logger.warning("OCR timed out after %.0f ms (sha256=%s)", timings["ocr"], digest[:12])
+            return "", timings
+        timings["ocr"] = round((time.perf_counter() - t0) * 1000, 2)
+    except Exception as e:
+        logger.warning("OCR failed: %s: %s", type(e).__name__, e)
+        return "", timings
+
+    _cache_put(digest, result)
+    timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info("OCR stage timings (ms): %s", timings)
+    return result, timings
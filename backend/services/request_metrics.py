@@ -0,0 +1,287 @@
+"""
+Request-level timing for the API: per-route latency, SQL statements and DB time per request, and time spent
+in external calls (Groq, Gmail). Exposed as Prometheus text on GET /metrics and, per response, as a
+Server-Timing header (visible in the browser's network panel).
+
+Three pieces:
+  RequestMetricsMiddleware   pure ASGI middleware; opens a RequestTiming and the root trace span for each
+                             HTTP request (services/tracing.py)
+  install_sql_hooks(engine)  SQLAlchemy cursor events that add statement counts and DB time to it
+  external_call("groq")      context manager around outbound calls; also a client span in the trace
+
+The current RequestTiming lives in a ContextVar. Starlette copies the context into the threadpool that runs
+sync endpoints, so DB work done there is attributed to the right request; work on other threads (background
+tasks, warmup) only shows up in the process-wide totals.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .tracing import KIND_CLIENT, KIND_SERVER, span
+except ImportError:
+    from services.tracing import KIND_CLIENT, KIND_SERVER, span  # type: ignore
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "").strip()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+@dataclass
+class RequestTiming:
+    started: float = field(default_factory=time.perf_counter)
+    db_statements: int = 0
+    db_seconds: float = 0.0
+    external_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _current.get()
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # per-bucket counts, then +Inf count, then sum
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            base = _label_text(self.label_names, labels)
+            running = 0.0
+            for bound, count in zip(self.buckets, series):
+                running += count
+                lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="{bound:g}"}} {running:g}')
+            running += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="+Inf"}} {running:g}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {running:g}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self, kind: str = "counter") -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {kind}"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for labels, value in sorted(snapshot.items()):
+            base = _label_text(self.label_names, labels)
+            lines.append(f"{self.name}{{{base}}} {value:g}" if base else f"{self.name} {value:g}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status"), LATENCY_BUCKETS
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements executed per HTTP request.", ("route",), STATEMENT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per HTTP request.", ("route",), LATENCY_BUCKETS
+)
+EXTERNAL_SECONDS = Histogram(
+    "external_call_duration_seconds", "Outbound call latency by service.", ("service", "outcome"), LATENCY_BUCKETS
+)
+DB_STATEMENTS_TOTAL = Counter("db_statements_total", "SQL statements executed by this process.")
+REQUESTS_IN_PROGRESS = Counter("http_requests_in_progress", "HTTP requests currently being handled.")
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for histogram in (REQUEST_SECONDS, REQUEST_DB_STATEMENTS, REQUEST_DB_SECONDS, EXTERNAL_SECONDS):
+        lines.extend(histogram.render())
+    lines.extend(DB_STATEMENTS_TOTAL.render())
+    lines.extend(REQUESTS_IN_PROGRESS.render(kind="gauge"))
+    return "\n".join(lines) + "\n"
+
+
+# --- SQL hooks ---------------------------------------------------------------------------------------------
+
+_hooked_engines: set = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("request_metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stack = conn.info.get("request_metrics_started")
+    elapsed = time.perf_counter() - stack.pop() if stack else 0.0
+    DB_STATEMENTS_TOTAL.inc()
+    timing = _current.get()
+    if timing is not None:
+        timing.db_statements += 1
+        timing.db_seconds += elapsed
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    conn = context.connection
+    stack = conn.info.get("request_metrics_started") if conn is not None else None
+    if stack:
+        stack.pop()
+
+
+def install_sql_hooks(engine) -> None:
+    """Attach the cursor hooks to `engine` once."""
+    if engine is None or id(engine) in _hooked_engines:
+        return
+    from sqlalchemy import event
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    _hooked_engines.add(id(engine))
+
+
+# --- external calls ----------------------------------------------------------------------------------------
+
+
+@contextmanager
+def external_call(service: str) -> Iterator[None]:
+    """Time an outbound call (works around `await` too); failures are recorded with outcome="error"."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        with span(f"external.{service}", kind=KIND_CLIENT, **{"peer.service": service}):
+            yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        EXTERNAL_SECONDS.observe((service, outcome), elapsed)
+        timing = _current.get()
+        if timing is not None:
+            timing.external_seconds[service] = timing.external_seconds.get(service, 0.0) + elapsed
+
+
+# --- middleware --------------------------------------------------------------------------------------------
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return path or "unmatched"
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers") or ():
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def server_timing_header(timing: RequestTiming) -> str:
+    total_ms = (time.perf_counter() - timing.started) * 1000
+    parts = [
+        f"app;dur={total_ms:.1f}",
+        f'db;dur={timing.db_seconds * 1000:.1f};desc="{timing.db_statements} SQL"',
+    ]
+    parts.extend(f"{service};dur={seconds * 1000:.1f}" for service, seconds in sorted(timing.external_seconds.items()))
+    return ", ".join(parts)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers") or [])
+                    headers.append((b"server-timing", server_timing_header(timing).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        method = scope.get("method", "")
+        traceparent = _header(scope, b"traceparent")
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            with span(f"HTTP {method}", kind=KIND_SERVER, traceparent=traceparent, **{"http.method": method}) as root:
+                if root is not None:
+                    scope.setdefault("state", {})["trace_id"] = root.trace_id
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    if root is not None:
+                        route = _route_label(scope)
+                        root.name = f"HTTP {method} {route}"
+                        root.attributes.update(
+                            {
+                                "http.route": route,
+                                "http.status_code": status["code"],
+                                "db.statements": timing.db_statements,
+                                "db.duration_ms": round(timing.db_seconds * 1000, 3),
+                            }
+                        )
+                        if status["code"] >= 500 and root.error is None:
+                            root.error = f"HTTP {status['code']}"
+        finally:
+            REQUESTS_IN_PROGRESS.inc(amount=-1)
+            _current.reset(token)
+            route = _route_label(scope)
+            REQUEST_SECONDS.observe(
+                (scope.get("method", ""), route, str(status["code"])), time.perf_counter() - timing.started
+            )
+            REQUEST_DB_STATEMENTS.observe((route,), timing.db_statements)
+            REQUEST_DB_SECONDS.observe((route,), timing.db_seconds)
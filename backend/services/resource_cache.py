@@ -0,0 +1,84 @@
+"""
+Versioned in-process cache for public resource catalog reads. Entries hold the serialized JSON body and
+a content ETag, so steady-state browsing costs no DB queries and no re-serialization. Admin writes call
+invalidate_resource_catalog(); RESOURCE_CACHE_TTL_SECONDS bounds staleness in other worker processes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+RESOURCE_CACHE_TTL_SECONDS = float(os.getenv("RESOURCE_CACHE_TTL_SECONDS", "60") or "60")
+RESOURCE_CACHE_MAX_ENTRIES = max(0, int(os.getenv("RESOURCE_CACHE_MAX_ENTRIES", "1024") or "1024"))
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    etag: str
+    version: int
+    created_at: float
+
+
+_entries: "OrderedDict[Tuple, CachedBody]" = OrderedDict()
+_lock = threading.Lock()
+_version = 0
+
+
+def catalog_version() -> int:
+    return _version
+
+
+def invalidate_resource_catalog() -> None:
+    global _version
+    with _lock:
+        _version += 1
+        _entries.clear()
+
+
+def _etag_for(body: bytes) -> str:
+    # Content hash, not the version counter, so every worker produces the same ETag for the same bytes.
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def get_or_load(key: Tuple, loader: Callable[[], bytes]) -> CachedBody:
+    """Return the cached body for `key`, calling `loader` (which may hit the DB) on a miss or expiry."""
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.version == _version and now - entry.created_at < RESOURCE_CACHE_TTL_SECONDS:
+            _entries.move_to_end(key)
+            return entry
+        version = _version
+
+    body = loader()
+    entry = CachedBody(body=body, etag=_etag_for(body), version=version, created_at=now)
+    if RESOURCE_CACHE_MAX_ENTRIES <= 0:
+        return entry
+    with _lock:
+        # A write that landed while we were loading makes this result stale; serve it once, don't keep it.
+        if version == _version:
+            _entries[key] = entry
+            _entries.move_to_end(key)
+            while len(_entries) > RESOURCE_CACHE_MAX_ENTRIES:
+                _entries.popitem(last=False)
+    return entry
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any((c[2:] if c.startswith("W/") else c) == bare for c in candidates)
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return {"entries": len(_entries), "version": _version, "ttl_seconds": RESOURCE_CACHE_TTL_SECONDS}
@@ -0,0 +1,203 @@
+"""
+Full-text search for /resources?q=. Postgres uses a generated, weighted `tsvector` column with a GIN index;
+SQLite uses an external-content FTS5 table kept in sync by triggers. Both are maintained by the database
+on every insert/update/delete, so ORM writes, bulk imports and raw SQL all stay indexed.
+Falls back to ILIKE when neither is available (e.g. SQLite built without FTS5).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from typing import List, Optional, Tuple
+
+from sqlalchemy import column, or_, table, text
+
+try:
+    from ..models.resources import Resource
+    from .config_service import engine
+except ImportError:
+    from models.resources import Resource  # type: ignore
+    from services.config_service import engine  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+_search_ensured = False
+_search_lock = threading.Lock()
+_search_mode = "ilike"
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+# Caps the work a single pathological query can cause.
+_MAX_TERMS = 8
+# Postgres' built-in 'english' stop list; to_tsquery drops these, so a query of only these matches nothing.
+_PG_ENGLISH_STOPWORDS = frozenset(
+    """
+    a about above after again against all am an and any are as at be because been before being below between
+    both but by can did do does doing don down during each few for from further had has have having he her here
+    hers herself him himself his how i if in into is it its itself just me more most my myself no nor not now
+    of off on once only or other our ours ourselves out over own s same she should so some such t than that the
+    their theirs them themselves then there these they this those through to too under until up very was we
+    were what when where which while who whom why will with you your yours yourself yourselves
+    """.split()
+)
+
+_resources_fts = table("resources_fts", column("rowid"), column("rank"))
+
+
+def _ensure_postgres(conn) -> None:
+    conn.execute(
+        text(
+            """
+            ALTER TABLE resources ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+              setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+              setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B') ||
+              setweight(to_tsvector('english'::regconfig, coalesce(eligibility, '')), 'C')
+            ) STORED
+            """
+        )
+    )
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_resources_search_vector ON resources USING GIN (search_vector)"))
+
+
+def _ensure_sqlite(conn) -> None:
+    existed = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resources_fts'")
+    ).first()
+    conn.execute(
+        text(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5(
+              title, description, eligibility,
+              content='resources', content_rowid='id', tokenize='porter unicode61'
+            )
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            CREATE TRIGGER IF NOT EXISTS resources_fts_ai AFTER INSERT ON resources BEGIN
+              INSERT INTO resources_fts(rowid, title, description, eligibility)
+              VALUES (new.id, new.title, new.description, new.eligibility);
+            END
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            CREATE TRIGGER IF NOT EXISTS resources_fts_ad AFTER DELETE ON resources BEGIN
+              INSERT INTO resources_fts(resources_fts, rowid, title, description, eligibility)
+              VALUES ('delete', old.id, old.title, old.description, old.eligibility);
+            END
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            CREATE TRIGGER IF NOT EXISTS resources_fts_au AFTER UPDATE OF title, description, eligibility ON resources BEGIN
+              INSERT INTO resources_fts(resources_fts, rowid, title, description, eligibility)
+              VALUES ('delete', old.id, old.title, old.description, old.eligibility);
+              INSERT INTO resources_fts(rowid, title, description, eligibility)
+              VALUES (new.id, new.title, new.description, new.eligibility);
+            END
+            """
+        )
+    )
+    if not existed:
+        # Index rows that predate the FTS table, and weight title > description > eligibility.
+        conn.execute(text("INSERT INTO resources_fts(resources_fts) VALUES ('rebuild')"))
+        conn.execute(text("INSERT INTO resources_fts(resources_fts, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0)')"))
+
+
+def ensure_resource_search_index() -> None:
+    global _search_ensured, _search_mode
+    if not engine or _search_ensured:
+        return
+    with _search_lock:
+        if _search_ensured:
+            return
+        dialect = engine.dialect.name
+        try:
+            with engine.begin() as conn:
+                if dialect == "postgresql":
+                    _ensure_postgres(conn)
+                    _search_mode = "postgres"
+                elif dialect == "sqlite":
+                    _ensure_sqlite(conn)
+                    _search_mode = "fts5"
+        except Exception as e:
+            _search_mode = "ilike"
+            logger.warning("resource full-text index unavailable, using ILIKE search: %s: %s", type(e).__name__, e)
+        _search_ensured = True
+
+
+def search_terms(q: Optional[str]) -> List[str]:
+    return _TERM_RE.findall((q or "").lower())[:_MAX_TERMS]
+
+
+def postgres_tsquery(terms: List[str]) -> Optional[str]:
+    """`a & b:*` over the terms Postgres will keep, or None when stop words (or bare underscores) are all
+    that is left and the caller should fall back to ILIKE."""
+    kept = [t for t in terms if t not in _PG_ENGLISH_STOPWORDS and any(ch.isalnum() for ch in t)]
+    if not kept:
+        return None
+    return " & ".join(kept[:-1] + [f"{kept[-1]}:*"])
+
+
+def _quoted_phrase(q: Optional[str]) -> Optional[str]:
+    raw = (q or "").strip()
+    if len(raw) > 2 and raw[0] == raw[-1] == '"':
+        return raw[1:-1].strip() or None
+    return None
+
+
+def apply_text_search(query, q: Optional[str]) -> Tuple[object, list]:
+    """
+    Filter an ORM query on Resource by `q` and return (query, relevance_order_by).
+    Every term must match (stemmed on Postgres); the last one also matches as a prefix so partial words
+    work while typing. A query wrapped in double quotes keeps the old exact-phrase behaviour: the index
+    narrows by its terms, then the phrase must appear as a substring of title, description or eligibility.
+    On Postgres, a query made only of stop words ("how to") uses the ILIKE match instead of an empty tsquery.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return query, []
+    phrase = _quoted_phrase(q)
+    if phrase is not None:
+        like = f"%{phrase}%"
+        query = query.filter(
+            or_(Resource.title.ilike(like), Resource.description.ilike(like), Resource.eligibility.ilike(like))
+        )
+    ensure_resource_search_index()
+
+    tsquery = postgres_tsquery(terms) if _search_mode == "postgres" else None
+    if tsquery is not None:
+        match = text("resources.search_vector @@ to_tsquery('english', :fts_q)").bindparams(fts_q=tsquery)
+        rank = text("ts_rank_cd(resources.search_vector, to_tsquery('english', :fts_q)) DESC").bindparams(
+            fts_q=tsquery
+        )
+        return query.filter(match), [rank]
+
+    if _search_mode == "fts5":
+        fts_q = " ".join(f'"{t}"' for t in terms[:-1]) + f' "{terms[-1]}"*'
+        query = query.join(_resources_fts, _resources_fts.c.rowid == Resource.id).filter(
+            text("resources_fts MATCH :fts_q").bindparams(fts_q=fts_q.strip())
+        )
+        # FTS5 `rank` is bm25 with the weights configured above; lower is better.
+        return query, [_resources_fts.c.rank.asc()]
+
+    # No index available, or (Postgres) a stop-word-only query such as "how to".
+    for term in terms:
+        like = f"%{term}%"
+        query = query.filter(
+            or_(Resource.title.ilike(like), Resource.description.ilike(like), Resource.eligibility.ilike(like))
+        )
+    return query, []
+
+
+def search_mode() -> str:
+    ensure_resource_search_index()
+    return _search_mode
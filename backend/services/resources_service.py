@@ -1,30 +1,50 @@
 import csv
 import io
 import json
+import logging
+import uuid
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, Request
 from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
-from sqlalchemy import and_
+from sqlalchemy import Integer, and_, case, cast, exists, func, insert, literal, text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 try:
-    from ..models.resources import Resource
-    from ..schemas.resources import ResourceCreate
+    from ..models.resources import Resource, ResourceCaseType, ResourceImportJob, ResourceLanguage
+    from ..schemas.resources import TAG_MAX_LENGTHS, ResourceCreate
+    from ..services.config_service import engine
+    from ..services.geo_service import haversine_miles, nearest_resource_ids, zip_centroid
     from ..services.intake_service import require_admin_access
+    from ..services.resource_cache import invalidate_resource_catalog
+    from ..services.resource_search import apply_text_search
+    from ..services.retrieval_service import mark_retrieval_index_stale
 except ImportError:
-    from models.resources import Resource  # type: ignore
-    from schemas.resources import ResourceCreate  # type: ignore
+    from models.resources import Resource, ResourceCaseType, ResourceImportJob, ResourceLanguage  # type: ignore
+    from schemas.resources import TAG_MAX_LENGTHS, ResourceCreate  # type: ignore
+    from services.config_service import engine  # type: ignore
+    from services.geo_service import haversine_miles, nearest_resource_ids, zip_centroid  # type: ignore
     from services.intake_service import require_admin_access  # type: ignore
+    from services.resource_cache import invalidate_resource_catalog  # type: ignore
+    from services.resource_search import apply_text_search  # type: ignore
+    from services.retrieval_service import mark_retrieval_index_stale  # type: ignore
+
+logger = logging.getLogger(__name__)
 
 
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _catalog_changed() -> None:
+    """Drop derived catalog state after an admin write: cached GET bodies and the AI retrieval index."""
+    invalidate_resource_catalog()
+    mark_retrieval_index_stale()
+
+
 def to_json_list(items: Optional[List[str]]) -> str:
     if not items:
         return "[]"
@@ -43,6 +63,86 @@ def parse_json_list(raw: Optional[str]) -> List[str]:
     return []
 
 
+def normalized_tags(items: List[str], field_name: str) -> List[str]:
+    # Rows saved before item length was validated may hold values too long for the junction column; skip them.
+    limit = TAG_MAX_LENGTHS[field_name]
+    return sorted({str(i).strip().lower() for i in items if str(i).strip() and len(str(i).strip()) <= limit})
+
+
+def _sync_resource_tags(db: Session, row: Resource) -> None:
+    """Mirror the JSON case_types/languages columns into the junction tables used for filtering."""
+    db.query(ResourceCaseType).filter(ResourceCaseType.resource_id == row.id).delete(synchronize_session=False)
+    db.query(ResourceLanguage).filter(ResourceLanguage.resource_id == row.id).delete(synchronize_session=False)
+    for value in normalized_tags(parse_json_list(row.case_types), "case_types"):
+        db.add(ResourceCaseType(resource_id=row.id, value=value))
+    for value in normalized_tags(parse_json_list(row.languages), "languages"):
+        db.add(ResourceLanguage(resource_id=row.id, value=value))
+
+
+# Bump to re-run the junction-table backfill once on the next startup (e.g. after changing normalized_tags).
+_TAG_INDEX_VERSION = 1
+
+_CREATE_TAG_INDEX_STATE_SQL = """
+CREATE TABLE IF NOT EXISTS resource_tag_index_state (
+  version INTEGER PRIMARY KEY,
+  completed_at TEXT NOT NULL
+);
+"""
+
+
+def ensure_resource_tag_index() -> None:
+    """
+    Backfill junction rows for resources written before the tables existed. Runs once per
+    _TAG_INDEX_VERSION; afterwards every write path keeps the tables in sync, so startup only reads the marker.
+    """
+    if not engine:
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(_CREATE_TAG_INDEX_STATE_SQL))
+            done = conn.execute(
+                text("SELECT 1 FROM resource_tag_index_state WHERE version = :v"), {"v": _TAG_INDEX_VERSION}
+            ).first()
+            if done:
+                return
+            rows = conn.execute(
+                text(
+                    """
+                    SELECT r.id, r.case_types, r.languages
+                    FROM resources r
+                    WHERE NOT EXISTS (SELECT 1 FROM resource_case_types c WHERE c.resource_id = r.id)
+                      AND NOT EXISTS (SELECT 1 FROM resource_languages l WHERE l.resource_id = r.id)
+                      AND (r.case_types <> '[]' OR r.languages <> '[]')
+                    """
+                )
+            ).all()
+            case_rows = []
+            language_rows = []
+            for resource_id, case_types, languages in rows:
+                case_rows.extend(
+                    {"rid": resource_id, "v": v} for v in normalized_tags(parse_json_list(case_types), "case_types")
+                )
+                language_rows.extend(
+                    {"rid": resource_id, "v": v} for v in normalized_tags(parse_json_list(languages), "languages")
+                )
+            if case_rows:
+                conn.execute(
+                    text("INSERT INTO resource_case_types (resource_id, value) VALUES (:rid, :v) ON CONFLICT DO NOTHING"),
+                    case_rows,
+                )
+            if language_rows:
+                conn.execute(
+                    text("INSERT INTO resource_languages (resource_id, value) VALUES (:rid, :v) ON CONFLICT DO NOTHING"),
+                    language_rows,
+                )
+            conn.execute(
+                text("INSERT INTO resource_tag_index_state (version, completed_at) VALUES (:v, :now)"),
+                {"v": _TAG_INDEX_VERSION, "now": utc_now().isoformat()},
+            )
+    except Exception as e:
+        logger.warning("resource tag backfill failed: %s: %s", type(e).__name__, e)
+
+
 def resource_to_dict(resource: Resource) -> dict:
     data = {c.name: getattr(resource, c.name) for c in resource.__table__.columns}
     data["case_types"] = parse_json_list(resource.case_types)
@@ -56,6 +156,8 @@ def build_query_filters(
     city: Optional[str],
     category: Optional[str],
     cost_type: Optional[str],
+    case_type: Optional[str] = None,
+    language: Optional[str] = None,
 ) -> List:
     filters = [Resource.is_active.is_(True)]
     if country:
@@ -68,6 +170,17 @@ def build_query_filters(
         filters.append(Resource.category.ilike(category.strip()))
     if cost_type:
         filters.append(Resource.cost_type.ilike(cost_type.strip()))
+    normalized_case_type = (case_type or "").strip().lower()
+    normalized_language = (language or "").strip().lower()
+    # Filter before OFFSET/LIMIT so pages are full; EXISTS uses the (value, resource_id) indexes.
+    if normalized_case_type:
+        filters.append(
+            exists().where(ResourceCaseType.resource_id == Resource.id, ResourceCaseType.value == normalized_case_type)
+        )
+    if normalized_language:
+        filters.append(
+            exists().where(ResourceLanguage.resource_id == Resource.id, ResourceLanguage.value == normalized_language)
+        )
     return filters
 
 
@@ -87,20 +200,22 @@ def list_resources(
     safe_limit = max(1, min(limit, 100))
     safe_offset = max(0, offset)
 
-    filters = build_query_filters(country=country, state=state, city=city, category=category, cost_type=cost_type)
+    filters = build_query_filters(
+        country=country,
+        state=state,
+        city=city,
+        category=category,
+        cost_type=cost_type,
+        case_type=case_type,
+        language=language,
+    )
 
     query = db.query(Resource).filter(and_(*filters))
-
-    if q:
-        term = f"%{q.strip()}%"
-        query = query.filter(
-            (Resource.title.ilike(term))
-            | (Resource.description.ilike(term))
-            | (Resource.eligibility.ilike(term))
-        )
+    query, relevance = apply_text_search(query, q)
 
     rows = (
         query.order_by(
+            *relevance,
             Resource.priority_score.desc(),
             Resource.verified_at.desc(),
             Resource.title.asc(),
@@ -110,17 +225,7 @@ def list_resources(
         .all()
     )
 
-    normalized_case_type = (case_type or "").strip().lower()
-    normalized_language = (language or "").strip().lower()
-    results = []
-    for row in rows:
-        data = resource_to_dict(row)
-        if normalized_case_type and normalized_case_type not in [x.lower() for x in data["case_types"]]:
-            continue
-        if normalized_language and normalized_language not in [x.lower() for x in data["languages"]]:
-            continue
-        results.append(data)
-    return results
+    return [resource_to_dict(row) for row in rows]
 
 
 def get_resource(resource_id: int, db: Session):
@@ -141,6 +246,57 @@ def get_resource_categories(db: Session):
     return [r[0] for r in rows if r[0]]
 
 
+def _age_days_expr(now: datetime):
+    """Whole days since verified_at, computed by the database (dialect-specific date arithmetic)."""
+    if engine is not None and engine.dialect.name == "postgresql":
+        return cast(func.floor(func.extract("epoch", literal(now) - Resource.verified_at) / 86400), Integer)
+    # SQLite stores naive UTC timestamps; julianday() understands SQLAlchemy's text format.
+    naive_now = now.replace(tzinfo=None).isoformat(sep=" ")
+    return cast(func.julianday(naive_now) - func.julianday(Resource.verified_at), Integer)
+
+
+# (max miles, bonus) tiers for suggestions near the user's ZIP; only the nearest matching candidates count.
+NEARBY_BONUS_TIERS = ((5, 50), (15, 35), (30, 20), (50, 10))
+NEARBY_MAX_CANDIDATES = 200
+# Ids per IN (...) list when checking nearest-resource candidates against the request's filters.
+_NEARBY_FILTER_CHUNK = 500
+
+
+def _nearby_matching(db: Session, zip_code: Optional[str], filters: List) -> Dict[int, float]:
+    """
+    {resource_id: miles} for the NEARBY_MAX_CANDIDATES resources nearest `zip_code` (within the last tier)
+    that pass `filters`. The tree knows nothing about the filters, so it is asked for more and more
+    neighbours until enough of them match or the radius is exhausted; a dense area full of non-matching
+    resources then cannot crowd the matching ones out.
+    """
+    radius = NEARBY_BONUS_TIERS[-1][0]
+    k = NEARBY_MAX_CANDIDATES
+    while True:
+        nearest = nearest_resource_ids(zip_code, k=k, max_miles=radius)
+        if len(filters) <= 1:
+            # Only is_active, which the tree already applies.
+            return nearest
+        ids = list(nearest)
+        matching: set = set()
+        for start in range(0, len(ids), _NEARBY_FILTER_CHUNK):
+            chunk = ids[start : start + _NEARBY_FILTER_CHUNK]
+            matching.update(rid for (rid,) in db.query(Resource.id).filter(Resource.id.in_(chunk), *filters))
+        # `nearest` is ordered nearest first, so a prefix of the matching ids is the nearest matching set.
+        kept = [rid for rid in ids if rid in matching][:NEARBY_MAX_CANDIDATES]
+        if len(kept) >= NEARBY_MAX_CANDIDATES or len(nearest) < k:
+            return {rid: nearest[rid] for rid in kept}
+        k *= 4
+
+
+def _distance_from(origin: Optional[Tuple[float, float]], resource: Resource, nearby: dict) -> Optional[float]:
+    if resource.id in nearby:
+        return nearby[resource.id]
+    centroid = zip_centroid(resource.postal_code) if origin else None
+    if not centroid:
+        return None
+    return round(haversine_miles(origin[0], origin[1], centroid[0], centroid[1]), 1)
+
+
 def suggest_resources(
     db: Session,
     country: Optional[str] = None,
@@ -149,97 +305,126 @@ def suggest_resources(
     case_type: Optional[str] = None,
     language: Optional[str] = None,
     limit: int = 10,
+    zip_code: Optional[str] = None,
 ):
-    candidates = list_resources(
-        db=db,
+    """
+    Rank the whole filtered catalog in SQL and return the top `limit`: priority_score, a location bonus
+    (city 50 / state 25 / country 10), case type 30, language 10, plus up to 90 points for recent verification.
+    With `zip_code`, resources whose postal_code centroid is within 50 miles earn up to 50 more points
+    and every suggestion with a known location reports `distance_miles`.
+    """
+    safe_limit = max(1, min(limit, 50))
+    filters = build_query_filters(
         country=country,
         state=state,
         city=city,
+        category=None,
+        cost_type=None,
         case_type=case_type,
         language=language,
-        limit=max(limit * 3, 20),
-        offset=0,
     )
 
-    ranked = []
-    for resource in candidates:
-        reasons = []
-        score = int(resource.get("priority_score") or 0)
-
-        if city and resource.get("jurisdiction_city", "").lower() == city.strip().lower():
-            score += 50
-            reasons.append("same_city")
-        elif state and resource.get("jurisdiction_state", "").lower() == state.strip().lower():
-            score += 25
-            reasons.append("same_state")
-        elif country and resource.get("jurisdiction_country", "").lower() == country.strip().lower():
-            score += 10
-            reasons.append("same_country")
-
-        if case_type and case_type.strip().lower() in [x.lower() for x in resource.get("case_types", [])]:
-            score += 30
-            reasons.append("matches_case_type")
-
-        if language and language.strip().lower() in [x.lower() for x in resource.get("languages", [])]:
-            score += 10
-            reasons.append("supports_language")
-
-        verified_at = resource.get("verified_at")
-        if isinstance(verified_at, datetime):
-            age_days = max((utc_now() - verified_at).days, 0)
-        else:
-            age_days = 999
-        score += max(0, 90 - age_days)
-
-        ranked.append(
-            {
-                "score": score,
-                "resource": resource,
-                "match_reasons": reasons,
-                "last_verified_days_ago": age_days,
-            }
-        )
+    reasons: List[str] = []
+    bonus = 0
+    location_bonus = literal(0)
+    if city:
+        location_bonus = case((func.lower(Resource.jurisdiction_city) == city.strip().lower(), 50), else_=0)
+        reasons.append("same_city")
+    elif state:
+        location_bonus = case((func.lower(Resource.jurisdiction_state) == state.strip().lower(), 25), else_=0)
+        reasons.append("same_state")
+    elif country:
+        location_bonus = case((func.lower(Resource.jurisdiction_country) == country.strip().lower(), 10), else_=0)
+        reasons.append("same_country")
+    # case_type/language are hard filters above, so every candidate earns these bonuses.
+    if case_type and case_type.strip():
+        bonus += 30
+        reasons.append("matches_case_type")
+    if language and language.strip():
+        bonus += 10
+        reasons.append("supports_language")
+
+    origin = zip_centroid(zip_code)
+    nearby = _nearby_matching(db, zip_code, filters) if origin else {}
+    proximity_bonus = literal(0)
+    if nearby:
+        tiers = []
+        lower = -1.0
+        for max_miles, points in NEARBY_BONUS_TIERS:
+            ids = [rid for rid, miles in nearby.items() if lower < miles <= max_miles]
+            if ids:
+                tiers.append((Resource.id.in_(ids), points))
+            lower = max_miles
+        proximity_bonus = case(*tiers, else_=0)
+
+    age_days = _age_days_expr(utc_now())
+    clamped_age = case((Resource.verified_at.is_(None), 999), (age_days < 0, 0), else_=age_days)
+    recency = case((clamped_age < 90, 90 - clamped_age), else_=0)
+    score = (Resource.priority_score + location_bonus + proximity_bonus + recency + bonus).label("score")
+
+    rows = (
+        db.query(Resource, score, clamped_age.label("age_days"))
+        .filter(and_(*filters))
+        .order_by(score.desc(), Resource.priority_score.desc(), Resource.verified_at.desc(), Resource.title.asc())
+        .limit(safe_limit)
+        .all()
+    )
+
+    return [
+        {
+            "score": int(row_score or 0),
+            "resource": resource_to_dict(resource),
+            "match_reasons": reasons + (["nearby"] if resource.id in nearby else []),
+            "last_verified_days_ago": int(row_age if row_age is not None else 999),
+            "distance_miles": _distance_from(origin, resource, nearby),
+        }
+        for resource, row_score, row_age in rows
+    ]
 
-    ranked.sort(key=lambda item: item["score"], reverse=True)
-    return ranked[: max(1, min(limit, 50))]
+
+def _resource_values(payload, now: datetime) -> dict:
+    """Column values for a new Resource row from a ResourceCreate payload."""
+    return {
+        "title": payload.title.strip(),
+        "category": payload.category.strip(),
+        "jurisdiction_country": payload.jurisdiction_country.strip(),
+        "jurisdiction_state": (payload.jurisdiction_state or "").strip() or None,
+        "jurisdiction_city": (payload.jurisdiction_city or "").strip() or None,
+        "court_level": (payload.court_level or "").strip() or None,
+        "case_types": to_json_list(payload.case_types),
+        "description": (payload.description or "").strip() or None,
+        "eligibility": (payload.eligibility or "").strip() or None,
+        "cost_type": (payload.cost_type or "").strip() or None,
+        "phone": (payload.phone or "").strip() or None,
+        "email": (payload.email or "").strip().lower() or None,
+        "website_url": (payload.website_url or "").strip() or None,
+        "address_line1": (payload.address_line1 or "").strip() or None,
+        "address_line2": (payload.address_line2 or "").strip() or None,
+        "postal_code": (payload.postal_code or "").strip() or None,
+        "hours": (payload.hours or "").strip() or None,
+        "languages": to_json_list(payload.languages),
+        "action_label": (payload.action_label or "").strip() or None,
+        "action_url": (payload.action_url or "").strip() or None,
+        "source_name": payload.source_name.strip(),
+        "source_url": payload.source_url.strip(),
+        "verified_at": payload.verified_at or now,
+        "is_active": payload.is_active,
+        "priority_score": payload.priority_score,
+        "created_at": now,
+        "updated_at": now,
+    }
 
 
 def create_resource(payload, request: Request, db: Session):
     require_admin_access(request)
-    now = utc_now()
-    row = Resource(
-        title=payload.title.strip(),
-        category=payload.category.strip(),
-        jurisdiction_country=payload.jurisdiction_country.strip(),
-        jurisdiction_state=(payload.jurisdiction_state or "").strip() or None,
-        jurisdiction_city=(payload.jurisdiction_city or "").strip() or None,
-        court_level=(payload.court_level or "").strip() or None,
-        case_types=to_json_list(payload.case_types),
-        description=(payload.description or "").strip() or None,
-        eligibility=(payload.eligibility or "").strip() or None,
-        cost_type=(payload.cost_type or "").strip() or None,
-        phone=(payload.phone or "").strip() or None,
-        email=(payload.email or "").strip().lower() or None,
-        website_url=(payload.website_url or "").strip() or None,
-        address_line1=(payload.address_line1 or "").strip() or None,
-        address_line2=(payload.address_line2 or "").strip() or None,
-        postal_code=(payload.postal_code or "").strip() or None,
-        hours=(payload.hours or "").strip() or None,
-        languages=to_json_list(payload.languages),
-        action_label=(payload.action_label or "").strip() or None,
-        action_url=(payload.action_url or "").strip() or None,
-        source_name=payload.source_name.strip(),
-        source_url=payload.source_url.strip(),
-        verified_at=payload.verified_at or now,
-        is_active=payload.is_active,
-        priority_score=payload.priority_score,
-        created_at=now,
-        updated_at=now,
-    )
+    row = Resource(**_resource_values(payload, utc_now()))
     try:
         db.add(row)
+        db.flush()
+        _sync_resource_tags(db, row)
         db.commit()
         db.refresh(row)
+        _catalog_changed()
         return resource_to_dict(row)
     except SQLAlchemyError as e:
         db.rollback()
@@ -269,8 +454,11 @@ def update_resource(resource_id: int, payload, request: Request, db: Session):
 
     try:
         db.add(row)
+        if "case_types" in data or "languages" in data:
+            _sync_resource_tags(db, row)
         db.commit()
         db.refresh(row)
+        _catalog_changed()
         return resource_to_dict(row)
     except SQLAlchemyError as e:
         db.rollback()
@@ -289,6 +477,7 @@ def verify_resource(resource_id: int, request: Request, db: Session):
         db.add(row)
         db.commit()
         db.refresh(row)
+        _catalog_changed()
         return resource_to_dict(row)
     except SQLAlchemyError as e:
         db.rollback()
@@ -306,6 +495,7 @@ def deactivate_resource(resource_id: int, request: Request, db: Session):
         db.add(row)
         db.commit()
         db.refresh(row)
+        _catalog_changed()
         return resource_to_dict(row)
     except SQLAlchemyError as e:
         db.rollback()
@@ -325,78 +515,131 @@ def stale_resources(days: int, request: Request, db: Session):
     return [resource_to_dict(r) for r in rows]
 
 
-def bulk_import_resources(payloads, request: Request, db: Session):
-    require_admin_access(request)
-    created_count = 0
-    skipped_count = 0
-    errors: List[str] = []
+# Rows per INSERT executemany; also the chunk size for the dedup lookup's IN (...) list.
+IMPORT_BATCH_SIZE = 500
 
-    for idx, payload in enumerate(payloads, start=1):
-        try:
-            existing = (
-                db.query(Resource)
-                .filter(
-                    Resource.title == payload.title.strip(),
-                    Resource.category == payload.category.strip(),
-                    Resource.jurisdiction_country == payload.jurisdiction_country.strip(),
-                    Resource.jurisdiction_state == ((payload.jurisdiction_state or "").strip() or None),
-                    Resource.jurisdiction_city == ((payload.jurisdiction_city or "").strip() or None),
-                    Resource.is_active.is_(True),
-                )
-                .first()
-            )
-            if existing:
-                skipped_count += 1
-                continue
 
-            now = utc_now()
-            row = Resource(
-                title=payload.title.strip(),
-                category=payload.category.strip(),
-                jurisdiction_country=payload.jurisdiction_country.strip(),
-                jurisdiction_state=(payload.jurisdiction_state or "").strip() or None,
-                jurisdiction_city=(payload.jurisdiction_city or "").strip() or None,
-                court_level=(payload.court_level or "").strip() or None,
-                case_types=to_json_list(payload.case_types),
-                description=(payload.description or "").strip() or None,
-                eligibility=(payload.eligibility or "").strip() or None,
-                cost_type=(payload.cost_type or "").strip() or None,
-                phone=(payload.phone or "").strip() or None,
-                email=(payload.email or "").strip().lower() or None,
-                website_url=(payload.website_url or "").strip() or None,
-                address_line1=(payload.address_line1 or "").strip() or None,
-                address_line2=(payload.address_line2 or "").strip() or None,
-                postal_code=(payload.postal_code or "").strip() or None,
-                hours=(payload.hours or "").strip() or None,
-                languages=to_json_list(payload.languages),
-                action_label=(payload.action_label or "").strip() or None,
-                action_url=(payload.action_url or "").strip() or None,
-                source_name=payload.source_name.strip(),
-                source_url=payload.source_url.strip(),
-                verified_at=payload.verified_at or now,
-                is_active=payload.is_active,
-                priority_score=payload.priority_score,
-                created_at=now,
-                updated_at=now,
+def _dedup_key(values: dict) -> Tuple:
+    return (
+        values["title"],
+        values["category"],
+        values["jurisdiction_country"],
+        values["jurisdiction_state"],
+        values["jurisdiction_city"],
+    )
+
+
+def _existing_dedup_keys(db: Session, titles: List[str]) -> set:
+    """Dedup keys of active resources sharing any of `titles` (one query per IMPORT_BATCH_SIZE titles)."""
+    keys = set()
+    unique_titles = sorted(set(titles))
+    for start in range(0, len(unique_titles), IMPORT_BATCH_SIZE):
+        chunk = unique_titles[start : start + IMPORT_BATCH_SIZE]
+        rows = (
+            db.query(
+                Resource.title,
+                Resource.category,
+                Resource.jurisdiction_country,
+                Resource.jurisdiction_state,
+                Resource.jurisdiction_city,
             )
-            db.add(row)
-            db.flush()
-            created_count += 1
+            .filter(Resource.is_active.is_(True), Resource.title.in_(chunk))
+            .all()
+        )
+        keys.update(tuple(r) for r in rows)
+    return keys
+
+
+def _insert_resource_rows(db: Session, rows: List[dict]) -> List[int]:
+    """INSERT ... RETURNING id as one executemany; ids come back in parameter order."""
+    table = Resource.__table__
+    stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    ids = [r[0] for r in db.execute(stmt, rows).all()]
+    tag_rows = []
+    language_rows = []
+    for resource_id, values in zip(ids, rows):
+        for v in normalized_tags(parse_json_list(values["case_types"]), "case_types"):
+            tag_rows.append({"resource_id": resource_id, "value": v})
+        for v in normalized_tags(parse_json_list(values["languages"]), "languages"):
+            language_rows.append({"resource_id": resource_id, "value": v})
+    if tag_rows:
+        db.execute(insert(ResourceCaseType.__table__), tag_rows)
+    if language_rows:
+        db.execute(insert(ResourceLanguage.__table__), language_rows)
+    return ids
+
+
+def import_resource_batch(db: Session, items: List[Tuple[int, object]]) -> List[dict]:
+    """
+    Insert (row_number, ResourceCreate) items without committing. Duplicates of active resources and of
+    earlier rows in the same import are skipped. Returns one result dict per item, in order.
+    """
+    now = utc_now()
+    results: List[dict] = []
+    pending: List[Tuple[dict, dict]] = []
+    prepared: List[Tuple[int, Optional[dict], Optional[str]]] = []
+    for row_number, payload in items:
+        try:
+            prepared.append((row_number, _resource_values(payload, now), None))
         except Exception as e:
-            skipped_count += 1
-            errors.append(f"row {idx}: {str(e)}")
+            prepared.append((row_number, None, str(e)))
+
+    existing = _existing_dedup_keys(db, [v["title"] for _, v, _ in prepared if v])
+    for row_number, values, error in prepared:
+        if values is None:
+            results.append({"row": row_number, "status": "error", "resource_id": None, "detail": error})
+            continue
+        key = _dedup_key(values)
+        if values["is_active"] and key in existing:
+            results.append({"row": row_number, "status": "duplicate", "resource_id": None, "detail": None})
+            continue
+        if values["is_active"]:
+            existing.add(key)
+        result = {"row": row_number, "status": "created", "resource_id": None, "detail": None}
+        results.append(result)
+        pending.append((result, values))
+
+    for start in range(0, len(pending), IMPORT_BATCH_SIZE):
+        batch = pending[start : start + IMPORT_BATCH_SIZE]
+        try:
+            with db.begin_nested():
+                ids = _insert_resource_rows(db, [values for _, values in batch])
+            for (result, _), resource_id in zip(batch, ids):
+                result["resource_id"] = resource_id
+        except SQLAlchemyError:
+            # Isolate the bad row(s): retry this batch one row per savepoint.
+            for result, values in batch:
+                try:
+                    with db.begin_nested():
+                        result["resource_id"] = _insert_resource_rows(db, [values])[0]
+                except SQLAlchemyError as e:
+                    result.update(status="error", detail=str(getattr(e, "orig", e)))
+    return results
+
+
+def summarize_import_results(results: List[dict]) -> dict:
+    errors = [f"row {r['row']}: {r['detail']}" for r in results if r["status"] == "error"]
+    created = sum(1 for r in results if r["status"] == "created")
+    return {
+        "created_count": created,
+        "skipped_count": len(results) - created,
+        "errors": errors,
+        "results": results,
+    }
+
 
+def bulk_import_resources(payloads, request: Request, db: Session):
+    require_admin_access(request)
+    results = import_resource_batch(db, list(enumerate(payloads, start=1)))
     try:
         db.commit()
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-
-    return {
-        "created_count": created_count,
-        "skipped_count": skipped_count,
-        "errors": errors,
-    }
+    summary = summarize_import_results(results)
+    if summary["created_count"]:
+        _catalog_changed()
+    return summary
 
 
 def _parse_bool(value: Optional[str], default: bool = True) -> bool:
@@ -442,63 +685,182 @@ def _parse_list_field(value: Optional[str]) -> List[str]:
     return [p for p in parts if p]
 
 
-def bulk_import_resources_csv(csv_bytes: bytes, request: Request, db: Session):
+def _validation_detail(exc: ValidationError) -> str:
+    """`field: reason` for every problem in the row, e.g. "source_url: String should have at least 5 characters"."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err.get('loc', ())) or 'row'}: {err.get('msg', '')}" for err in exc.errors()
+    )
+
+
+def _csv_row_to_payload(row: dict) -> ResourceCreate:
+    return ResourceCreate(
+        title=(row.get("title") or "").strip(),
+        category=(row.get("category") or "").strip(),
+        jurisdiction_country=(row.get("jurisdiction_country") or "").strip(),
+        jurisdiction_state=(row.get("jurisdiction_state") or "").strip() or None,
+        jurisdiction_city=(row.get("jurisdiction_city") or "").strip() or None,
+        court_level=(row.get("court_level") or "").strip() or None,
+        case_types=_parse_list_field(row.get("case_types")),
+        description=(row.get("description") or "").strip() or None,
+        eligibility=(row.get("eligibility") or "").strip() or None,
+        cost_type=(row.get("cost_type") or "").strip() or None,
+        phone=(row.get("phone") or "").strip() or None,
+        email=(row.get("email") or "").strip() or None,
+        website_url=(row.get("website_url") or "").strip() or None,
+        address_line1=(row.get("address_line1") or "").strip() or None,
+        address_line2=(row.get("address_line2") or "").strip() or None,
+        postal_code=(row.get("postal_code") or "").strip() or None,
+        hours=(row.get("hours") or "").strip() or None,
+        languages=_parse_list_field(row.get("languages")),
+        action_label=(row.get("action_label") or "").strip() or None,
+        action_url=(row.get("action_url") or "").strip() or None,
+        source_name=(row.get("source_name") or "").strip(),
+        source_url=(row.get("source_url") or "").strip(),
+        verified_at=_parse_datetime(row.get("verified_at")),
+        is_active=_parse_bool(row.get("is_active"), default=True),
+        priority_score=_parse_int(row.get("priority_score"), default=0),
+    )
+
+
+# Non-created rows (duplicates/errors) reported back per import; keeps responses and job rows bounded.
+IMPORT_MAX_REPORTED_ROWS = 500
+
+
+def _import_job_summary(job: ResourceImportJob, results: Optional[List[dict]] = None) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "rows_processed": job.rows_processed,
+        "created_count": job.created_count,
+        "skipped_count": job.skipped_count,
+        "errors": parse_json_list(job.errors),
+        "results": results or [],
+    }
+
+
+def get_resource_import_job(job_id: str, request: Request, db: Session):
     require_admin_access(request)
+    job = db.query(ResourceImportJob).filter(ResourceImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return _import_job_summary(job)
+
 
+def bulk_import_resources_csv(
+    stream: BinaryIO,
+    request: Request,
+    db: Session,
+    filename: Optional[str] = None,
+    job_id: Optional[str] = None,
+):
+    """
+    Stream a CSV upload into `resources` IMPORT_BATCH_SIZE rows at a time; memory does not grow with the file.
+    Progress is committed with every batch under a job id. Re-uploading the same file with that job_id
+    skips rows a previous attempt already committed.
+    """
+    require_admin_access(request)
+
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text_stream)
     try:
-        decoded = csv_bytes.decode("utf-8-sig")
+        fieldnames = reader.fieldnames
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
-
-    reader = csv.DictReader(io.StringIO(decoded))
-    if not reader.fieldnames:
+    if not fieldnames:
         raise HTTPException(status_code=400, detail="CSV header row is missing")
 
     required_headers = {"title", "category", "jurisdiction_country", "source_name", "source_url"}
-    missing = [h for h in required_headers if h not in set(reader.fieldnames)]
+    missing = [h for h in required_headers if h not in set(fieldnames)]
     if missing:
         raise HTTPException(status_code=400, detail=f"Missing required CSV columns: {', '.join(missing)}")
 
-    payloads: List[ResourceCreate] = []
-    errors: List[str] = []
-    for row_num, row in enumerate(reader, start=2):
-        try:
-            payloads.append(
-                ResourceCreate(
-                    title=(row.get("title") or "").strip(),
-                    category=(row.get("category") or "").strip(),
-                    jurisdiction_country=(row.get("jurisdiction_country") or "").strip(),
-                    jurisdiction_state=(row.get("jurisdiction_state") or "").strip() or None,
-                    jurisdiction_city=(row.get("jurisdiction_city") or "").strip() or None,
-                    court_level=(row.get("court_level") or "").strip() or None,
-                    case_types=_parse_list_field(row.get("case_types")),
-                    description=(row.get("description") or "").strip() or None,
-                    eligibility=(row.get("eligibility") or "").strip() or None,
-                    cost_type=(row.get("cost_type") or "").strip() or None,
-                    phone=(row.get("phone") or "").strip() or None,
-                    email=(row.get("email") or "").strip() or None,
-                    website_url=(row.get("website_url") or "").strip() or None,
-                    address_line1=(row.get("address_line1") or "").strip() or None,
-                    address_line2=(row.get("address_line2") or "").strip() or None,
-                    postal_code=(row.get("postal_code") or "").strip() or None,
-                    hours=(row.get("hours") or "").strip() or None,
-                    languages=_parse_list_field(row.get("languages")),
-                    action_label=(row.get("action_label") or "").strip() or None,
-                    action_url=(row.get("action_url") or "").strip() or None,
-                    source_name=(row.get("source_name") or "").strip(),
-                    source_url=(row.get("source_url") or "").strip(),
-                    verified_at=_parse_datetime(row.get("verified_at")),
-                    is_active=_parse_bool(row.get("is_active"), default=True),
-                    priority_score=_parse_int(row.get("priority_score"), default=0),
+    if job_id:
+        job = db.query(ResourceImportJob).filter(ResourceImportJob.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Import job not found")
+        if job.status == "completed":
+            return _import_job_summary(job)
+        job.status = "running"
+    else:
+        # Column defaults only apply at INSERT, and the session does not autoflush; set the counters here so
+        # the first batch can add to them even when it creates nothing.
+        job = ResourceImportJob(
+            id=uuid.uuid4().hex,
+            filename=(filename or "")[:255] or None,
+            status="running",
+            last_row=1,
+            rows_processed=0,
+            created_count=0,
+            skipped_count=0,
+            errors="[]",
+        )
+        db.add(job)
+    resume_after = job.last_row or 1
+    reported: List[dict] = []
+    errors = parse_json_list(job.errors)
+    any_created = False
+
+    def flush(items: List[Tuple[int, ResourceCreate]], invalid: List[dict], last_row: int) -> None:
+        nonlocal any_created
+        results = invalid + import_resource_batch(db, items)
+        created = sum(1 for r in results if r["status"] == "created")
+        any_created = any_created or created > 0
+        for r in sorted(results, key=lambda r: r["row"]):
+            if r["status"] == "created" or len(reported) >= IMPORT_MAX_REPORTED_ROWS:
+                continue
+            reported.append(r)
+            if r["status"] == "error":
+                errors.append(f"row {r['row']}: {r['detail']}")
+        job.rows_processed += len(results)
+        job.created_count += created
+        job.skipped_count += len(results) - created
+        job.errors = json.dumps(errors[:IMPORT_MAX_REPORTED_ROWS])
+        job.last_row = last_row
+        db.commit()
+
+    try:
+        items: List[Tuple[int, ResourceCreate]] = []
+        invalid: List[dict] = []
+        row_num = resume_after
+        for row_num, row in enumerate(reader, start=2):
+            if row_num <= resume_after:
+                continue
+            try:
+                items.append((row_num, _csv_row_to_payload(row)))
+            except ValidationError as e:
+                invalid.append(
+                    {"row": row_num, "status": "error", "resource_id": None, "detail": _validation_detail(e)}
                 )
-            )
-        except ValidationError as e:
-            errors.append(f"row {row_num}: {str(e).splitlines()[0]}")
+            if len(items) + len(invalid) >= IMPORT_BATCH_SIZE:
+                flush(items, invalid, row_num)
+                items, invalid = [], []
+        job.status = "completed"
+        flush(items, invalid, max(row_num, resume_after))
+    except UnicodeDecodeError:
+        _fail_import_job(db, job)
+        raise HTTPException(
+            status_code=400, detail=f"CSV must be UTF-8 encoded (job {job.id} stopped after row {job.last_row})"
+        )
+    except SQLAlchemyError as e:
+        _fail_import_job(db, job)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    finally:
+        if any_created:
+            _catalog_changed()
+        text_stream.detach()
+
+    return _import_job_summary(job, reported)
+
 
-    result = bulk_import_resources(payloads=payloads, request=request, db=db)
-    result["errors"] = errors + result["errors"]
-    result["skipped_count"] = result["skipped_count"] + len(errors)
-    return result
+def _fail_import_job(db: Session, job: ResourceImportJob) -> None:
+    """Roll back the unfinished batch but keep the job row (and its committed progress) for a resume."""
+    db.rollback()
+    job.status = "failed"
+    try:
+        db.merge(job)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
 
 
 def download_resources_csv_template(request: Request):
@@ -0,0 +1,302 @@
+"""
+BM25 retrieval over referral_map.json and active `resources` rows, used to ground /ai-chat answers
+in organizations we actually list. The index is small (hundreds of docs) and lives in memory; it can be
+prebuilt to RETRIEVAL_INDEX_PATH with scripts/build_retrieval_index.py so workers start without a rebuild.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+try:
+    from .config_service import DATA_DIR, REFERRAL_MAP_PATH, engine
+except ImportError:
+    from services.config_service import DATA_DIR, REFERRAL_MAP_PATH, engine  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_ENABLED = os.getenv("RETRIEVAL_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+RETRIEVAL_TOP_K = max(1, int(os.getenv("RETRIEVAL_TOP_K", "4") or "4"))
+RETRIEVAL_INDEX_PATH = os.getenv("RETRIEVAL_INDEX_PATH", os.path.join(DATA_DIR, "retrieval_index.json"))
+# Other workers learn about resource edits by re-checking the source fingerprint this often.
+RETRIEVAL_REFRESH_SECONDS = float(os.getenv("RETRIEVAL_REFRESH_SECONDS", "300") or "300")
+# Documents matching the conversation topic get this multiplier on their BM25 score.
+RETRIEVAL_TOPIC_BOOST = float(os.getenv("RETRIEVAL_TOPIC_BOOST", "1.5") or "1.5")
+
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_INDEX_VERSION = 1
+_TOKEN_RE = re.compile(r"[a-z0-9áéíóúñü]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i if in is it my of on or the to what when where who with you your "
+    "el la los las de del y en un una que por para con mi es".split()
+)
+# User phrasing -> triage topic keys used in referral_map.json and resource case_types.
+TOPIC_ALIASES = {
+    "child_support": ("child", "support"),
+    "custody": ("custody", "visitation", "parenting"),
+    "divorce": ("divorce", "dissolution", "marriage"),
+    "housing": ("eviction", "landlord", "tenant", "housing", "rent", "lease"),
+    "education": ("school", "education", "iep", "expulsion", "suspension"),
+}
+
+
+def tokenize(value: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((value or "").lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+@dataclass
+class RetrievedDoc:
+    doc_id: str
+    title: str
+    snippet: str
+    score: float
+    source: str
+
+
+class BM25Index:
+    def __init__(self, docs: List[dict], fingerprint: str):
+        self.docs = docs
+        self.fingerprint = fingerprint
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_len: List[int] = []
+        for idx, doc in enumerate(docs):
+            counts = Counter(tokenize(doc["text"]))
+            self.doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((idx, tf))
+        self.avg_len = (sum(self.doc_len) / len(self.doc_len)) if self.doc_len else 0.0
+        n = len(docs)
+        self.idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self.postings.items()}
+
+    def search(self, query: str, topic: Optional[str] = None, k: int = RETRIEVAL_TOP_K) -> List[RetrievedDoc]:
+        terms = tokenize(query)
+        topic_key = (topic or "").strip().lower()
+        if topic_key:
+            terms.extend(tokenize(" ".join(TOPIC_ALIASES.get(topic_key, (topic_key.replace("_", " "),)))))
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for idx, tf in postings:
+                norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * self.doc_len[idx] / (self.avg_len or 1.0))
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (_BM25_K1 + 1) / (tf + norm)
+        if topic_key:
+            for idx in scores:
+                if topic_key in self.docs[idx]["topics"]:
+                    scores[idx] *= RETRIEVAL_TOPIC_BOOST
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [
+            RetrievedDoc(
+                doc_id=self.docs[idx]["id"],
+                title=self.docs[idx]["title"],
+                snippet=self.docs[idx]["snippet"],
+                score=round(score, 4),
+                source=self.docs[idx]["source"],
+            )
+            for idx, score in best
+        ]
+
+    def to_json(self) -> dict:
+        return {"version": _INDEX_VERSION, "fingerprint": self.fingerprint, "docs": self.docs}
+
+    @classmethod
+    def from_json(cls, payload: dict) -> "BM25Index":
+        return cls(payload["docs"], payload["fingerprint"])
+
+
+def _snippet(*parts: Optional[str]) -> str:
+    return " | ".join(p.strip() for p in parts if p and p.strip())[:400]
+
+
+def _referral_docs() -> List[dict]:
+    try:
+        with open(REFERRAL_MAP_PATH, "r", encoding="utf-8") as f:
+            referral_map = json.load(f)
+    except Exception as e:
+        logger.warning("retrieval could not read referral map: %s", e)
+        return []
+    docs: List[dict] = []
+    seen: Dict[str, dict] = {}
+    for topic, levels in (referral_map or {}).items():
+        if not isinstance(levels, dict):
+            continue
+        for level_items in levels.values():
+            for item in level_items if isinstance(level_items, list) else []:
+                name = str(item.get("name") or "").strip()
+                if not name:
+                    continue
+                # The same organization appears under several topics/levels; index it once.
+                if name in seen:
+                    if topic not in seen[name]["topics"]:
+                        seen[name]["topics"].append(topic)
+                    continue
+                doc = {
+                    "id": f"referral:{name}",
+                    "source": "referral_map",
+                    "title": name,
+                    "topics": [topic],
+                    "text": f"{name} {item.get('description') or ''} {topic.replace('_', ' ')}",
+                    "snippet": _snippet(name, item.get("description"), item.get("phone"), item.get("url")),
+                }
+                seen[name] = doc
+                docs.append(doc)
+    return docs
+
+
+def _resource_docs() -> List[dict]:
+    if not engine:
+        return []
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    """
+                    SELECT id, title, category, case_types, description, eligibility,
+                           jurisdiction_city, phone, website_url
+                    FROM resources
+                    WHERE is_active = :active
+                    """
+                ),
+                {"active": True},
+            ).mappings().all()
+    except Exception as e:
+        logger.warning("retrieval could not read resources: %s", e)
+        return []
+    docs: List[dict] = []
+    for r in rows:
+        try:
+            case_types = [str(c).strip().lower() for c in json.loads(r["case_types"] or "[]")]
+        except Exception:
+            case_types = []
+        title = str(r["title"] or "")
+        docs.append(
+            {
+                "id": f"resource:{r['id']}",
+                "source": "resources",
+                "title": title,
+                "topics": case_types + [str(r["category"] or "").lower()],
+                "text": " ".join(
+                    str(v or "")
+                    for v in (title, r["category"], " ".join(case_types), r["description"], r["eligibility"], r["jurisdiction_city"])
+                ),
+                "snippet": _snippet(
+                    title,
+                    r["description"],
+                    r["jurisdiction_city"],
+                    r["phone"],
+                    r["website_url"],
+                ),
+            }
+        )
+    return docs
+
+
+def source_fingerprint() -> str:
+    """Cheap change detector: referral_map mtime/size plus resources count and latest updated_at."""
+    parts = [str(_INDEX_VERSION)]
+    try:
+        st = os.stat(REFERRAL_MAP_PATH)
+        parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+    except OSError:
+        parts.append("no-referral-map")
+    if engine:
+        try:
+            with engine.connect() as conn:
+                row = conn.execute(
+                    text("SELECT COUNT(*), MAX(updated_at) FROM resources WHERE is_active = :active"),
+                    {"active": True},
+                ).first()
+            parts.append(f"{row[0]}:{row[1]}")
+        except Exception:
+            parts.append("no-resources")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def build_index(fingerprint: Optional[str] = None) -> BM25Index:
+    fp = fingerprint or source_fingerprint()
+    return BM25Index(_referral_docs() + _resource_docs(), fp)
+
+
+def save_index(index: BM25Index, path: str = RETRIEVAL_INDEX_PATH) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index.to_json(), f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _load_prebuilt(fingerprint: str) -> Optional[BM25Index]:
+    try:
+        with open(RETRIEVAL_INDEX_PATH, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("ignoring unreadable retrieval index %s: %s", RETRIEVAL_INDEX_PATH, e)
+        return None
+    if payload.get("version") != _INDEX_VERSION or payload.get("fingerprint") != fingerprint:
+        return None
+    return BM25Index.from_json(payload)
+
+
+_index: Optional[BM25Index] = None
+_index_checked_at = 0.0
+_index_stale = False
+_index_lock = threading.Lock()
+
+
+def mark_retrieval_index_stale() -> None:
+    """Called after resource writes; the next query rebuilds the index in this process."""
+    global _index_stale
+    _index_stale = True
+
+
+def get_retrieval_index() -> BM25Index:
+    global _index, _index_checked_at, _index_stale
+    now = time.monotonic()
+    if _index is not None and not _index_stale and now - _index_checked_at < RETRIEVAL_REFRESH_SECONDS:
+        return _index
+    with _index_lock:
+        if _index is not None and not _index_stale and now - _index_checked_at < RETRIEVAL_REFRESH_SECONDS:
+            return _index
+        _index_stale = False
+        fingerprint = source_fingerprint()
+        if _index is None or _index.fingerprint != fingerprint:
+            _index = _load_prebuilt(fingerprint) or build_index(fingerprint)
+        _index_checked_at = time.monotonic()
+        return _index
+
+
+def retrieve_context(query: str, topic: Optional[str] = None, k: int = RETRIEVAL_TOP_K) -> List[RetrievedDoc]:
+    if not RETRIEVAL_ENABLED or not (query or topic):
+        return []
+    try:
+        return get_retrieval_index().search(query, topic=topic, k=k)
+    except Exception as e:
+        logger.warning("Retrieval failed: %s: %s", type(e).__name__, e)
+        return []
+
+
+def format_context(docs: List[RetrievedDoc]) -> str:
+    if not docs:
+        return ""
+    lines = [f"- {d.snippet}" for d in docs]
+    return (
+        "Organizations and resources from our verified directory that may be relevant. "
+        "When recommending where to get help, prefer these and do not invent organizations, phone numbers or URLs:\n"
+        + "\n".join(lines)
+    )
@@ -0,0 +1,303 @@
+"""Evidence blob storage: local filesystem or any S3-compatible object store (AWS S3, MinIO, R2)."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UPLOAD_ROOT = Path(__file__).resolve().parents[1] / "uploads" / "documents"
+
+# S3 requires every multipart part except the last to be at least 5 MiB.
+S3_MULTIPART_PART_BYTES = 5 * 1024 * 1024
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    size: int
+    modified_at: float
+    etag: str
+
+
+class EvidenceStorage(ABC):
+    """Minimal blob interface used by the upload, download and health-check paths."""
+
+    name = "base"
+
+    @abstractmethod
+    def save_stream(self, key: str, chunks: Iterable[bytes]) -> int:
+        ...
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[StoredObject]:
+        ...
+
+    @abstractmethod
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path when the blob is on local disk (lets callers use sendfile)."""
+        return None
+
+    def healthcheck(self) -> str:
+        """Write and remove a probe object; return a human-readable location. Raises on failure."""
+        key = f".probe_{os.urandom(6).hex()}"
+        self.save_stream(key, [b"ok"])
+        self.delete(key)
+        return self.describe()
+
+    def describe(self) -> str:
+        return self.name
+
+
+def _safe_key(key: str) -> str:
+    k = (key or "").strip()
+    if not k or "/" in k or "\\" in k or k.startswith(".."):
+        raise ValueError(f"Invalid storage key: {key!r}")
+    return k
+
+
+class FilesystemStorage(EvidenceStorage):
+    name = "filesystem"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._etag_cache: dict[str, tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        target = (self.root / _safe_key(key)).resolve()
+        if not str(target).startswith(str(self.root.resolve())):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return target
+
+    def save_stream(self, key: str, chunks: Iterable[bytes]) -> int:
+        self.root.mkdir(parents=True, exist_ok=True)
+        target = self._path(key)
+        tmp = target.with_name(f".{target.name}.part")
+        written = 0
+        try:
+            with open(tmp, "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    written += len(chunk)
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return written
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            target = self._path(key)
+        except ValueError:
+            return None
+        if not target.is_file():
+            return None
+        st = target.stat()
+        with self._lock:
+            cached = self._etag_cache.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            etag = cached[2]
+        else:
+            digest = hashlib.sha256()
+            with open(target, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            etag = f'"{digest.hexdigest()}"'
+            with self._lock:
+                self._etag_cache[key] = (st.st_size, st.st_mtime_ns, etag)
+        return StoredObject(size=st.st_size, modified_at=st.st_mtime, etag=etag)
+
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as fh:
+            fh.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = fh.read(min(STREAM_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+        with self._lock:
+            self._etag_cache.pop(key, None)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        try:
+            target = self._path(key)
+        except ValueError:
+            return None
+        return target if target.is_file() else None
+
+    def describe(self) -> str:
+        return str(self.root)
+
+
+class S3Storage(EvidenceStorage):
+    """S3 API backend. Point EVIDENCE_S3_ENDPOINT_URL at MinIO (e.g. http://localhost:9000) for local runs."""
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+    ):
+        try:
+            import boto3  # type: ignore
+        except Exception as e:  # pragma: no cover - optional dependency
+            raise RuntimeError("EVIDENCE_STORAGE_BACKEND=s3 requires the boto3 package") from e
+        self.bucket = bucket
+        self.prefix = (prefix or "").strip("/")
+        self.endpoint_url = endpoint_url or None
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=self.endpoint_url,
+            region_name=region or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None,
+        )
+
+    def _key(self, key: str) -> str:
+        k = _safe_key(key)
+        return f"{self.prefix}/{k}" if self.prefix else k
+
+    def save_stream(self, key: str, chunks: Iterable[bytes]) -> int:
+        object_key = self._key(key)
+        buffer = bytearray()
+        written = 0
+        upload_id: Optional[str] = None
+        parts: list[dict] = []
+
+        def _flush_part() -> None:
+            nonlocal upload_id
+            if upload_id is None:
+                upload_id = self._client.create_multipart_upload(Bucket=self.bucket, Key=object_key)["UploadId"]
+            part_number = len(parts) + 1
+            resp = self._client.upload_part(
+                Bucket=self.bucket,
+                Key=object_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=bytes(buffer),
+            )
+            parts.append({"ETag": resp["ETag"], "PartNumber": part_number})
+            buffer.clear()
+
+        try:
+            for chunk in chunks:
+                buffer.extend(chunk)
+                written += len(chunk)
+                if len(buffer) >= S3_MULTIPART_PART_BYTES:
+                    _flush_part()
+            if upload_id is None:
+                # Small object: a single PUT is one round trip instead of three.
+                self._client.put_object(Bucket=self.bucket, Key=object_key, Body=bytes(buffer))
+                return written
+            if buffer:
+                _flush_part()
+            self._client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+            return written
+        except Exception:
+            if upload_id is not None:
+                try:
+                    self._client.abort_multipart_upload(Bucket=self.bucket, Key=object_key, UploadId=upload_id)
+                except Exception as abort_exc:
+                    logger.warning("S3 abort_multipart_upload failed for %s: %s", object_key, abort_exc)
+            raise
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        from botocore.exceptions import ClientError  # type: ignore
+
+        try:
+            head = self._client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            # Only a missing object is "not found"; auth, network and throttling errors must surface.
+            code = str((getattr(e, "response", None) or {}).get("Error", {}).get("Code", ""))
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        modified = head.get("LastModified")
+        return StoredObject(
+            size=int(head.get("ContentLength") or 0),
+            modified_at=modified.timestamp() if modified else 0.0,
+            etag=str(head.get("ETag") or ""),
+        )
+
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        resp = self._client.get_object(Bucket=self.bucket, Key=self._key(key), Range=f"bytes={start}-{end}")
+        body = resp["Body"]
+        try:
+            for chunk in body.iter_chunks(STREAM_CHUNK_BYTES):
+                yield chunk
+        finally:
+            body.close()
+
+    def delete(self, key: str) -> None:
+        self._client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def describe(self) -> str:
+        where = self.endpoint_url or "aws"
+        return f"s3://{self.bucket}/{self.prefix} ({where})"
+
+
+_storage: Optional[EvidenceStorage] = None
+_storage_lock = threading.Lock()
+
+
+def _build_storage_from_env() -> EvidenceStorage:
+    backend = (os.getenv("EVIDENCE_STORAGE_BACKEND") or "filesystem").strip().lower()
+    if backend == "s3":
+        bucket = (os.getenv("EVIDENCE_S3_BUCKET") or "").strip()
+        if not bucket:
+            raise RuntimeError("EVIDENCE_S3_BUCKET is required when EVIDENCE_STORAGE_BACKEND=s3")
+        return S3Storage(
+            bucket=bucket,
+            prefix=os.getenv("EVIDENCE_S3_PREFIX", "evidence"),
+            endpoint_url=(os.getenv("EVIDENCE_S3_ENDPOINT_URL") or "").strip() or None,
+            region=(os.getenv("EVIDENCE_S3_REGION") or "").strip() or None,
+            access_key=(os.getenv("EVIDENCE_S3_ACCESS_KEY_ID") or "").strip() or None,
+            secret_key=(os.getenv("EVIDENCE_S3_SECRET_ACCESS_KEY") or "").strip() or None,
+        )
+    root = (os.getenv("EVIDENCE_UPLOAD_ROOT") or "").strip()
+    return FilesystemStorage(Path(root) if root else DEFAULT_UPLOAD_ROOT)
+
+
+def get_evidence_storage() -> EvidenceStorage:
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = _build_storage_from_env()
+    return _storage
+
+
+def set_evidence_storage(storage: Optional[EvidenceStorage]) -> None:
+    """Swap the active backend (local stand-ins, scripts). None re-reads the environment next time."""
+    global _storage
+    with _storage_lock:
+        _storage = storage
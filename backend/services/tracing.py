@@ -0,0 +1,376 @@
+"""
+Lightweight request tracing in the OpenTelemetry data model (trace/span ids, parent links, attributes, events,
+status), without the OpenTelemetry SDK.
+
+  with span("triage.run_chat_flow", step=step): ...       context manager
+  @traced("intake.log_event")                              decorator for sync functions
+
+The HTTP middleware (services/request_metrics.py) opens the root span for each request and continues an
+incoming W3C `traceparent`. Spans are buffered per trace and exported when the root ends if the trace was
+head-sampled (TRACE_SAMPLE_RATE), took at least TRACE_SLOW_MS, or recorded an error. Slow and failing requests
+are therefore always traceable, and fast requests stay cheap.
+
+Exporters (TRACE_EXPORTER): "file" appends one JSON span per line to TRACE_FILE_PATH; "otlp" POSTs OTLP/HTTP
+JSON batches to TRACE_OTLP_ENDPOINT (a local collector, Jaeger, Tempo, Honeycomb...). Export runs on a
+background thread and drops spans rather than block requests when the queue is full. Unset = tracing off.
+
+configure_logging() tags log lines with the current trace id and copies WARNING+ records onto the current
+span as events, so a trace shows the warnings its request logged.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+TRACE_EXPORTER = (os.getenv("TRACE_EXPORTER") or "").strip().lower()
+TRACE_SAMPLE_RATE = min(1.0, max(0.0, float(os.getenv("TRACE_SAMPLE_RATE", "0.01") or "0.01")))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "1000") or "1000")
+TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_OTLP_HEADERS = os.getenv("TRACE_OTLP_HEADERS", "")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "court-legal-chatbot-backend")
+TRACE_QUEUE_SIZE = max(100, int(os.getenv("TRACE_QUEUE_SIZE", "10000") or "10000"))
+LOG_LEVEL = (os.getenv("LOG_LEVEL") or "WARNING").strip().upper()
+
+logger = logging.getLogger(__name__)
+
+_EXPORTERS = ("file", "otlp")
+if TRACE_EXPORTER and TRACE_EXPORTER not in _EXPORTERS:
+    logger.warning("Unknown TRACE_EXPORTER=%r; expected one of %s. Tracing is off.", TRACE_EXPORTER, ", ".join(_EXPORTERS))
+    TRACE_EXPORTER = ""
+
+# OTLP span kinds
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    kind: int = KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Tuple[int, str, Dict[str, Any]]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append((time.time_ns(), name, attributes))
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.error = f"{type(exc).__name__}: {exc}"
+        self.add_event("exception", **{"exception.type": type(exc).__name__, "exception.message": str(exc)[:500]})
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+@dataclass
+class _Trace:
+    sampled: bool
+    spans: List[Span] = field(default_factory=list)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+_current_trace: ContextVar[Optional[_Trace]] = ContextVar("trace_buffer", default=None)
+
+
+def tracing_enabled() -> bool:
+    return bool(TRACE_EXPORTER)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _new_id(nbytes: int) -> str:
+    return random.getrandbits(nbytes * 8).to_bytes(nbytes, "big").hex()
+
+
+def _parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header, or None if absent/invalid."""
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Open a span under the current one (or a new trace). Yields None when tracing is off."""
+    if not TRACE_EXPORTER:
+        yield None
+        return
+
+    parent = _current_span.get()
+    trace = _current_trace.get()
+    root = trace is None
+    if root:
+        remote = _parse_traceparent(traceparent)
+        sampled = random.random() < TRACE_SAMPLE_RATE or bool(remote and remote[2])
+        trace = _Trace(sampled=sampled)
+        trace_id, parent_id = (remote[0], remote[1]) if remote else (_new_id(16), None)
+    else:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    current = Span(name=name, trace_id=trace_id, span_id=_new_id(8), parent_id=parent_id, kind=kind, attributes=attributes)
+
+    span_token = _current_span.set(current)
+    trace_token = _current_trace.set(trace) if root else None
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        if trace_token is not None:
+            _current_trace.reset(trace_token)
+        trace.spans.append(current)
+        if root:
+            _finish_trace(trace, current)
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable:
+    """Decorator form of span() for sync functions."""
+
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACE_EXPORTER:
+                return fn(*args, **kwargs)
+            with span(span_name, **attributes):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _finish_trace(trace: _Trace, root: Span) -> None:
+    slow = TRACE_SLOW_MS > 0 and root.duration_ms >= TRACE_SLOW_MS
+    failed = any(s.error for s in trace.spans)
+    if not (trace.sampled or slow or failed):
+        return
+    root.attributes.setdefault("trace.reason", "error" if failed else "slow" if slow else "sampled")
+    _exporter().submit(trace.spans)
+
+
+# --- export ------------------------------------------------------------------------------------------------
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _otlp_span(s: Span) -> Dict[str, Any]:
+    body: Dict[str, Any] = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": s.kind,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": _otlp_attributes(s.attributes),
+        "events": [
+            {"timeUnixNano": str(ts), "name": event_name, "attributes": _otlp_attributes(attrs)}
+            for ts, event_name, attrs in s.events
+        ],
+        "status": {"code": 2, "message": s.error} if s.error else {"code": 0},
+    }
+    if s.parent_id:
+        body["parentSpanId"] = s.parent_id
+    return body
+
+
+def _file_record(s: Span) -> Dict[str, Any]:
+    return {
+        "trace_id": s.trace_id,
+        "span_id": s.span_id,
+        "parent_id": s.parent_id,
+        "name": s.name,
+        "start_ns": s.start_ns,
+        "duration_ms": round(s.duration_ms, 3),
+        "attributes": s.attributes,
+        "events": [{"ts_ns": ts, "name": event_name, **attrs} for ts, event_name, attrs in s.events],
+        "error": s.error,
+        "service": TRACE_SERVICE_NAME,
+    }
+
+
+class _Exporter:
+    """Background batch exporter; submit() never blocks the request path."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, spans: List[Span]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += len(spans)
+
+    def flush(self, timeout: float = 2.0) -> None:
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _drain(self, first: List[Span]) -> List[Span]:
+        batch = list(first)
+        while len(batch) < 512:
+            try:
+                more = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.extend(more or [])
+            self._queue.task_done()
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            try:
+                batch = self._drain(first or [])
+                if batch:
+                    self._write(batch)
+            except Exception as e:
+                logger.warning("Trace export failed (%s): %s", self.mode, e)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, batch: List[Span]) -> None:
+        if self.mode == "file":
+            with open(TRACE_FILE_PATH, "a", encoding="utf-8") as f:
+                for s in batch:
+                    f.write(json.dumps(_file_record(s), ensure_ascii=False, default=str) + "\n")
+            return
+        import httpx
+
+        headers = {"Content-Type": "application/json"}
+        for pair in TRACE_OTLP_HEADERS.split(","):
+            key, _, value = pair.partition("=")
+            if key.strip() and value.strip():
+                headers[key.strip()] = value.strip()
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otlp_attributes({"service.name": TRACE_SERVICE_NAME})},
+                    "scopeSpans": [{"scope": {"name": "court-legal-chatbot"}, "spans": [_otlp_span(s) for s in batch]}],
+                }
+            ]
+        }
+        response = httpx.post(TRACE_OTLP_ENDPOINT, json=payload, headers=headers, timeout=5.0)
+        response.raise_for_status()
+
+
+_exporter_instance: Optional[_Exporter] = None
+_exporter_lock = threading.Lock()
+
+
+def _exporter() -> _Exporter:
+    global _exporter_instance
+    if _exporter_instance is None:
+        with _exporter_lock:
+            if _exporter_instance is None:
+                _exporter_instance = _Exporter(TRACE_EXPORTER)
+    return _exporter_instance
+
+
+def flush_traces(timeout: float = 2.0) -> None:
+    if _exporter_instance is not None:
+        _exporter_instance.flush(timeout)
+
+
+# --- logging -----------------------------------------------------------------------------------------------
+
+
+class TraceContextFilter(logging.Filter):
+    """Adds trace_id / span_id (empty outside a span) and a ready-to-format trace_tag to every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = _current_span.get()
+        if getattr(record, "trace_id", None) is None:  # callers outside the span may pass extra={"trace_id": ...}
+            record.trace_id = current.trace_id if current else ""
+        if getattr(record, "span_id", None) is None:
+            record.span_id = current.span_id if current else ""
+        record.trace_tag = f" [trace={record.trace_id}]" if record.trace_id else ""
+        return True
+
+
+class SpanEventHandler(logging.Handler):
+    """Copies WARNING+ log records onto the current span as events."""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.WARNING)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        current = _current_span.get()
+        if current is None:
+            return
+        attributes = {"log.severity": record.levelname, "log.logger": record.name, "log.message": record.getMessage()[:1000]}
+        if record.exc_info and record.exc_info[1] is not None:
+            attributes["exception.type"] = type(record.exc_info[1]).__name__
+        current.add_event("log", **attributes)
+
+
+_logging_configured = False
+
+
+def configure_logging() -> None:
+    """Root logging for the app: stderr lines tagged with the trace id, plus span events. Idempotent."""
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+    root = logging.getLogger()
+    context_filter = TraceContextFilter()
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s%(trace_tag)s"))
+        handler.addFilter(context_filter)
+        root.addHandler(handler)
+    if TRACE_EXPORTER:
+        root.addHandler(SpanEventHandler())
+    root.setLevel(getattr(logging, LOG_LEVEL, logging.WARNING))
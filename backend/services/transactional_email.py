@@ -1,8 +1,11 @@
-"""Send transactional email via Gmail API (OAuth2). No SMTP."""
+"""Send transactional email via Gmail API (OAuth2). No SMTP. Queued through services/email_outbox.py by default."""
 
 from __future__ import annotations
 
+from datetime import datetime
+
 try:
+    from .email_outbox import email_outbox_enabled, enqueue_email
     from .gmail_service import gmail_api_configured, send_email
     from .config_service import (
         GOOGLE_CLIENT_ID,
@@ -11,6 +14,7 @@ try:
         GOOGLE_SENDER_EMAIL,
     )
 except ImportError:
+    from services.email_outbox import email_outbox_enabled, enqueue_email  # type: ignore
     from services.gmail_service import gmail_api_configured, send_email  # type: ignore
     from services.config_service import (  # type: ignore
         GOOGLE_CLIENT_ID,
@@ -48,7 +52,15 @@ def send_transactional_email(
     attachment_bytes: bytes | None = None,
     attachment_filename: str = "",
     attachment_content_type: str = "application/pdf",
+    defer: bool = True,
+    expires_at: datetime | None = None,
 ) -> bool:
+    """
+    True when the message was accepted: queued in the outbox (delivered, with retries, by the background
+    dispatcher) or, with defer=False or the outbox off, sent inline. False if it can't be sent at all.
+    Pass `expires_at` when the body carries a sign-in/reset/verification link: the outbox then stores it
+    encrypted and never sends it after that time.
+    """
     to_email = (to_email or "").strip()
     subject = (subject or "").strip()
     text_body = text_body or ""
@@ -61,6 +73,21 @@ def send_transactional_email(
         print(f"Warning: {email_provider_hint()}")
         return False
 
+    if defer and email_outbox_enabled():
+        queued = enqueue_email(
+            to_email=to_email,
+            subject=subject,
+            text_body=text_body,
+            html_body=html_body,
+            attachment_bytes=attachment_bytes,
+            attachment_filename=attachment_filename,
+            attachment_content_type=attachment_content_type,
+            expires_at=expires_at,
+        )
+        if queued:
+            return True
+        # Outbox write failed (e.g. DB hiccup) or no key to encrypt a credential link; don't drop it, send it now.
+
     return send_email(
         to_email=to_email,
         subject=subject,
@@ -0,0 +1,260 @@
+"""
+Table-driven engine for the /chat triage flow. The "flow" section of data/triage_questions.json declares
+each step's answers, validators, state changes, logged events, next step and reply; Python code only
+supplies the named validators, hooks (steps with branching that a table can't express) and guards
+(checks that run before any step, such as crisis keywords).
+
+Dispatch is one dict lookup by step. The whole table is checked when the machine is built, so a typo
+in a reply key, next step, hook or validator name fails at import instead of mid-conversation.
+
+Transition fields:
+  set / clear          state keys to assign / remove
+  events               [event_type, value] pairs passed to the event logger (skipped when value is empty)
+  next                 the step to move to
+  reply, params        response key from "replies" and its response_params
+  reset, keep,         replace the state with {"step": next} plus the listed keys
+  keep_if_set
+  hook                 call a registered function instead; it returns the reply (or None to fall through)
+Values starting with "$" are templates: $answer (normalized message), $value (validator result),
+$state.<key> (current state value).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+try:
+    from .triage_steps import REPLIES, STEP_PROGRESS, step_reply
+except ImportError:
+    from services.triage_steps import REPLIES, STEP_PROGRESS, step_reply  # type: ignore
+
+
+@dataclass
+class Turn:
+    request: Any
+    raw_message: str
+    message: str
+    state: dict
+    referral_map: dict
+
+    @property
+    def intake_id(self) -> Optional[str]:
+        return getattr(self.request, "intake_id", None)
+
+    @property
+    def step(self) -> Optional[str]:
+        return self.state.get("step")
+
+
+Validator = Callable[[Turn], Any]
+Hook = Callable[[Turn, Any], Optional[dict]]
+Guard = Callable[["TriageMachine", Turn], Optional[dict]]
+
+
+@dataclass(frozen=True)
+class Transition:
+    set: Tuple[Tuple[str, Any], ...] = ()
+    clear: Tuple[str, ...] = ()
+    events: Tuple[Tuple[str, Any], ...] = ()
+    next: Optional[str] = None
+    reply: Optional[str] = None
+    params: Tuple[Tuple[str, Any], ...] = ()
+    reset: bool = False
+    keep: Tuple[str, ...] = ()
+    keep_if_set: Tuple[str, ...] = ()
+    hook: Optional[Hook] = None
+
+
+@dataclass(frozen=True)
+class StepSpec:
+    name: str
+    invalid: str
+    invalid_params: Tuple[Tuple[str, Any], ...] = ()
+    normalize: str = "lower"
+    aliases: Dict[str, str] = field(default_factory=dict)
+    answers: Dict[str, Transition] = field(default_factory=dict)
+    validator: Optional[Validator] = None
+    on_valid: Optional[Transition] = None
+    on_invalid: Optional[Transition] = None
+
+
+def _resolve(template: Any, turn: Turn, answer: Optional[str], value: Any) -> Any:
+    if not isinstance(template, str) or not template.startswith("$"):
+        return template
+    if template == "$answer":
+        return answer
+    if template == "$value":
+        return value
+    if template.startswith("$state."):
+        current = turn.state.get(template[len("$state."):])
+        return current.strip() if isinstance(current, str) else current
+    raise ValueError(f"Unknown triage template {template!r}")
+
+
+class TriageMachine:
+    def __init__(
+        self,
+        flow: dict,
+        validators: Dict[str, Validator],
+        hooks: Dict[str, Hook],
+        guards: Dict[str, Guard],
+        log_event: Callable[[Optional[str], str, Optional[str]], None],
+    ):
+        self.start_step: str = flow.get("start_step") or "topic_selection"
+        self.start_messages = frozenset(flow.get("start_messages") or ())
+        self.crisis_exempt_steps = frozenset(flow.get("crisis_exempt_steps") or ())
+        self.redirect_steps = frozenset(flow.get("redirect_steps") or ())
+        self._log_event = log_event
+        self._validators = validators
+        self._hooks = hooks
+        self._step_names = frozenset((flow.get("steps") or {}).keys())
+        try:
+            self._guards = tuple(guards[name] for name in flow.get("guards") or ())
+        except KeyError as e:
+            raise ValueError(f"Triage flow references unknown guard {e}") from None
+        self._steps: Dict[str, StepSpec] = {
+            name: self._compile_step(name, spec) for name, spec in (flow.get("steps") or {}).items()
+        }
+        self._check_reply(None, "triage.topic.prompt")
+        self._check_step(None, self.start_step)
+
+    # --- compilation -------------------------------------------------------------------------------
+
+    def _check_reply(self, where: Optional[str], key: Optional[str]) -> None:
+        if key is not None and key not in REPLIES:
+            raise ValueError(f"Triage flow step {where!r} uses unknown reply {key!r}")
+
+    def _check_step(self, where: Optional[str], step: Optional[str]) -> None:
+        if step is not None and (step not in STEP_PROGRESS or step not in self._step_names):
+            raise ValueError(f"Triage flow step {where!r} moves to unknown step {step!r}")
+
+    def _compile_transition(self, where: str, raw: Optional[dict]) -> Optional[Transition]:
+        if raw is None:
+            return None
+        hook = None
+        if raw.get("hook"):
+            if raw["hook"] not in self._hooks:
+                raise ValueError(f"Triage flow step {where!r} uses unknown hook {raw['hook']!r}")
+            hook = self._hooks[raw["hook"]]
+        elif not raw.get("reply"):
+            raise ValueError(f"Triage flow step {where!r} has a transition without reply or hook")
+        self._check_reply(where, raw.get("reply"))
+        self._check_step(where, raw.get("next"))
+        return Transition(
+            set=tuple((raw.get("set") or {}).items()),
+            clear=tuple(raw.get("clear") or ()),
+            events=tuple((name, value) for name, value in raw.get("events") or ()),
+            next=raw.get("next"),
+            reply=raw.get("reply"),
+            params=tuple((raw.get("params") or {}).items()),
+            reset=bool(raw.get("reset")),
+            keep=tuple(raw.get("keep") or ()),
+            keep_if_set=tuple(raw.get("keep_if_set") or ()),
+            hook=hook,
+        )
+
+    def _compile_step(self, name: str, raw: dict) -> StepSpec:
+        if name not in STEP_PROGRESS:
+            raise ValueError(f"Triage flow step {name!r} has no progress entry")
+        self._check_reply(name, raw.get("invalid"))
+        validator = None
+        if raw.get("validator"):
+            if raw["validator"] not in self._validators:
+                raise ValueError(f"Triage flow step {name!r} uses unknown validator {raw['validator']!r}")
+            validator = self._validators[raw["validator"]]
+        if raw.get("normalize", "lower") not in ("lower", "underscore"):
+            raise ValueError(f"Triage flow step {name!r} has unknown normalize {raw['normalize']!r}")
+        return StepSpec(
+            name=name,
+            invalid=raw["invalid"],
+            invalid_params=tuple((raw.get("invalid_params") or {}).items()),
+            normalize=raw.get("normalize", "lower"),
+            aliases=dict(raw.get("aliases") or {}),
+            answers={
+                answer: self._compile_transition(name, transition)
+                for answer, transition in (raw.get("answers") or {}).items()
+            },
+            validator=validator,
+            on_valid=self._compile_transition(name, raw.get("on_valid")),
+            on_invalid=self._compile_transition(name, raw.get("on_invalid")),
+        )
+
+    @property
+    def steps(self) -> Iterable[str]:
+        return self._steps.keys()
+
+    # --- execution ---------------------------------------------------------------------------------
+
+    def log(self, turn: Turn, event_type: str, value: Optional[str]) -> None:
+        self._log_event(turn.intake_id, event_type, value)
+
+    def start_reply(self) -> dict:
+        return step_reply("triage.topic.prompt", {"step": self.start_step})
+
+    def _apply(self, turn: Turn, transition: Transition, answer: Optional[str], value: Any) -> Optional[dict]:
+        if transition.hook is not None:
+            return transition.hook(turn, value)
+        for event_type, template in transition.events:
+            event_value = _resolve(template, turn, answer, value)
+            if event_value is None or event_value == "":
+                continue
+            self.log(turn, event_type, event_value)
+        state = turn.state
+        if transition.reset:
+            state = {"step": transition.next}
+            for key in transition.keep:
+                state[key] = turn.state.get(key)
+            for key in transition.keep_if_set:
+                if turn.state.get(key):
+                    state[key] = turn.state[key]
+        params = {key: _resolve(t, turn, answer, value) for key, t in transition.params}
+        for key in transition.clear:
+            state.pop(key, None)
+        for key, template in transition.set:
+            state[key] = _resolve(template, turn, answer, value)
+        if transition.next:
+            state["step"] = transition.next
+        turn.state = state
+        return step_reply(transition.reply, state, params=params or None)
+
+    def _dispatch(self, spec: StepSpec, turn: Turn) -> dict:
+        if spec.normalize == "underscore":
+            answer = turn.raw_message.strip().lower().replace(" ", "_")
+        else:
+            answer = turn.message
+        answer = spec.aliases.get(answer, answer)
+
+        reply = None
+        if spec.validator is not None:
+            value = spec.validator(turn)
+            if value is not None:
+                reply = self._apply(turn, spec.on_valid, answer, value)
+            elif spec.on_invalid is not None:
+                reply = self._apply(turn, spec.on_invalid, answer, None)
+        else:
+            transition = spec.answers.get(answer)
+            if transition is not None:
+                reply = self._apply(turn, transition, answer, None)
+        if reply is not None:
+            return reply
+        params = {key: _resolve(t, turn, answer, None) for key, t in spec.invalid_params}
+        return step_reply(spec.invalid, turn.state, params=params or None)
+
+    def run(self, request, referral_map: dict) -> dict:
+        raw_message = (request.message or "").strip()
+        turn = Turn(
+            request=request,
+            raw_message=raw_message,
+            message=raw_message.lower(),
+            state=request.conversation_state or {},
+            referral_map=referral_map,
+        )
+        for guard in self._guards:
+            reply = guard(self, turn)
+            if reply is not None:
+                return reply
+        spec = self._steps.get(turn.step)
+        if spec is None:
+            return self.start_reply()
+        return self._dispatch(spec, turn)
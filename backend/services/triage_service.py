@@ -6,9 +6,17 @@ from typing import Any, Dict, List, Optional, Tuple
 from fastapi import HTTPException
 
 try:
+    from .geo_service import haversine_miles, office_coordinates, zip_centroid
     from .intake_service import log_intake_event
+    from .tracing import span
+    from .triage_machine import TriageMachine, Turn
+    from .triage_steps import FLOW, step_progress, step_reply
 except ImportError:
+    from services.geo_service import haversine_miles, office_coordinates, zip_centroid  # type: ignore
     from services.intake_service import log_intake_event  # type: ignore
+    from services.tracing import span  # type: ignore
+    from services.triage_machine import TriageMachine, Turn  # type: ignore
+    from services.triage_steps import FLOW, step_progress, step_reply  # type: ignore
 
 
 _JSON_CACHE: dict[str, dict] = {}
@@ -270,49 +278,27 @@ def try_redirect_topic_from_free_text(
         f"{current}->{inferred}",
     )
 
-    return {
-        "response_key": "triage.topic.redirected",
-        "response_params": {"topic": inferred, "previous_topic": current},
-        "options": ["yes", "no", "unknown"],
-        "conversation_state": state,
-        "progress": get_step_progress(state.get("step")),
-    }
-
-
-def _load_referral_office_geo() -> Dict[str, Any]:
-    try:
-        from .config_service import REFERRAL_OFFICE_GEO_PATH
-    except ImportError:
-        from config_service import REFERRAL_OFFICE_GEO_PATH  # type: ignore
-    if not os.path.isfile(REFERRAL_OFFICE_GEO_PATH):
-        return {}
-    try:
-        data = load_json_file(REFERRAL_OFFICE_GEO_PATH)
-        return data if isinstance(data, dict) else {}
-    except Exception:
-        return {}
+    return step_reply("triage.topic.redirected", state, params={"topic": inferred, "previous_topic": current})
 
 
-def _attach_office_coordinates(referrals: List[dict]) -> None:
-    geo = _load_referral_office_geo()
-    if not geo:
-        return
+def _attach_office_coordinates(referrals: List[dict], zip_code: Optional[str] = None) -> List[dict]:
+    """
+    Copy referrals with office lat/lng and, when the ZIP has a known centroid, `distance_miles`;
+    located offices come first, nearest first. Offices without coordinates (statewide/online) keep their order.
+    """
+    origin = zip_centroid(zip_code) if zip_code else None
+    out = []
     for ref in referrals:
-        name = ref.get("name")
-        if not name or not isinstance(name, str):
-            continue
-        entry = geo.get(name)
-        if not entry or not isinstance(entry, dict):
-            continue
-        lat = entry.get("latitude")
-        lng = entry.get("longitude")
-        if lat is None or lng is None:
-            continue
-        try:
-            ref["latitude"] = float(lat)
-            ref["longitude"] = float(lng)
-        except (TypeError, ValueError):
-            continue
+        ref = dict(ref)
+        coords = office_coordinates(ref.get("name") if isinstance(ref.get("name"), str) else None)
+        if coords:
+            ref["latitude"], ref["longitude"] = coords
+            if origin:
+                ref["distance_miles"] = round(haversine_miles(origin[0], origin[1], coords[0], coords[1]), 1)
+        out.append(ref)
+    if origin:
+        out.sort(key=lambda r: (r.get("distance_miles") is None, r.get("distance_miles") or 0.0))
+    return out
 
 
 def filter_referrals_for_income(referrals: List[dict], income_value: Optional[str]) -> List[dict]:
@@ -331,7 +317,7 @@ def filter_referrals_for_income(referrals: List[dict], income_value: Optional[st
     return filtered
 
 
-def get_referrals_for_topic(referral_map: dict, topic: str, level: int, income_value: Optional[str], has_representation: Optional[str] = None) -> List[dict]:
+def get_referrals_for_topic(referral_map: dict, topic: str, level: int, income_value: Optional[str], has_representation: Optional[str] = None, zip_code: Optional[str] = None) -> List[dict]:
     topic_bucket = referral_map.get(topic, {}) if isinstance(referral_map, dict) else {}
 
     candidate_levels = []
@@ -348,7 +334,7 @@ def get_referrals_for_topic(referral_map: dict, topic: str, level: int, income_v
         referrals = topic_bucket.get(f"level_{lvl}", [])
         referrals = filter_referrals_for_income(referrals, income_value)
         if referrals:
-            _attach_office_coordinates(referrals)
+            referrals = _attach_office_coordinates(referrals, zip_code)
             if has_representation == "yes":
                 filtered = [
                     ref for ref in referrals
@@ -369,8 +355,7 @@ def get_referrals_for_topic(referral_map: dict, topic: str, level: int, income_v
             referrals = fallback_bucket.get(f"level_{lvl}", [])
             referrals = filter_referrals_for_income(referrals, income_value)
             if referrals:
-                _attach_office_coordinates(referrals)
-                return referrals
+                return _attach_office_coordinates(referrals, zip_code)
 
     return []
 
@@ -382,21 +367,7 @@ def normalize_step(step: Optional[str]) -> str:
 
 
 def get_step_progress(step: Optional[str]) -> dict:
-    step = normalize_step(step)
-    steps_map = {
-        "topic_selection": {"current": 1, "total": 6, "label_key": "progress.selectTopic"},
-        "emergency_check": {"current": 2, "total": 6, "label_key": "progress.emergencyCheck"},
-        "court_status": {"current": 3, "total": 6, "label_key": "progress.courtStatus"},
-        "income_check": {"current": 4, "total": 6, "label_key": "progress.incomeLevel"},
-        "problem_summary": {"current": 5, "total": 6, "label_key": "progress.problemSummary"},
-        "summary_topic_confirm": {"current": 5, "total": 6, "label_key": "progress.problemSummary"},
-        "topic_reconfirm": {"current": 5, "total": 6, "label_key": "progress.yourLocation"},
-        "get_zip": {"current": 6, "total": 6, "label_key": "progress.yourLocation"},
-        "complete": {"current": 6, "total": 6, "label_key": "progress.resourcesReady"},
-        "resource_selected": {"current": 6, "total": 6, "label_key": "progress.resourcesReady"},
-        "continue_check": {"current": 6, "total": 6, "label_key": "progress.resourcesReady"},
-    }
-    return steps_map.get(step, {"current": 1, "total": 6, "label_key": "progress.defaultLabel"})
+    return step_progress(normalize_step(step))
 
 
 def _score_band(score: int) -> str:
@@ -523,467 +494,214 @@ def build_decision_support(state: dict) -> dict:
     return result
 
 
-def run_chat_flow(request, referral_map: dict):
-    raw_message = (request.message or "").strip()
-    message = raw_message.lower()
-    state = request.conversation_state or {}
+# --- /chat flow: domain validators, hooks and guards for the table in triage_questions.json "flow" ---
+
+
+def _validate_topic(turn: Turn) -> Optional[str]:
+    return infer_topic_from_text(turn.message)
 
-    if detect_crisis_keywords(message) and state.get("step") not in ["topic_selection", None]:
-        return {
-            "response_key": "triage.emergency.crisisDetectedBody",
-            "response_params": {},
-            "options": ["continue_to_legal_resources", "restart"],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    if state and state.get("step") in ("emergency_check", "court_status", "income_check"):
-        redirected = try_redirect_topic_from_free_text(
-            state, message, getattr(request, "intake_id", None)
-        )
-        if redirected:
-            return redirected
-
-    if not state or message in ["start", "begin", "start over"]:
-        new_state = {"step": "topic_selection"}
-        return {
-            "response_key": "triage.topic.prompt",
-            "response_params": {},
-            "options": ["child_support", "education", "housing", "divorce", "custody"],
-            "conversation_state": new_state,
-            "progress": get_step_progress(new_state.get("step")),
-        }
-
-    if message == "restart":
-        log_intake_event(request.intake_id, "triage_restart", "restart")
-        new_state = {"step": "topic_selection"}
-        return {
-            "response_key": "triage.topic.prompt",
-            "response_params": {},
-            "options": ["child_support", "education", "housing", "divorce", "custody"],
-            "conversation_state": new_state,
-            "progress": get_step_progress(new_state.get("step")),
-        }
-
-    if state.get("step") == "topic_selection":
-        selected_topic = infer_topic_from_text(message)
-        if selected_topic:
-            log_intake_event(request.intake_id, "topic_selected", selected_topic)
-            state["topic"] = selected_topic
-            state["step"] = "emergency_check"
-            return {
-                "response_key": "triage.topic.selected",
-                "response_params": {"topic": selected_topic},
-                "options": ["yes", "no", "unknown"],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-        return {
-            "response_key": "triage.topic.invalid",
-            "response_params": {},
-            "options": ["child_support", "education", "housing", "divorce", "custody"],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    if state.get("step") == "emergency_check":
-        if message == "yes":
-            state["emergency"] = "yes"
-            log_intake_event(request.intake_id, "emergency_answer", "yes")
-            state["step"] = "court_status"
-            return {
-                "response_key": "triage.emergency.policeNote",
-                "response_params": {},
-                "options": ["yes", "no"],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-        if message == "no":
-            state["emergency"] = "no"
-            log_intake_event(request.intake_id, "emergency_answer", "no")
-            state["step"] = "court_status"
-        elif message in ["i don't know", "unknown", "not sure", "not_sure"]:
-            state["emergency"] = "unknown"
-            log_intake_event(request.intake_id, "emergency_answer", "unknown")
-            state["step"] = "court_status"
-        else:
-            return {
-                "response_key": "triage.emergency.invalid",
-                "response_params": {},
-                "options": ["yes", "no", "unknown"],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-        return {
-            "response_key": "triage.court.prompt",
-            "response_params": {},
-            "options": ["yes", "no"],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    if state.get("step") == "court_status":
-        if message == "yes":
-            state["in_court"] = True
-            log_intake_event(request.intake_id, "court_answer", "yes")
-            state["step"] = "income_check"
-        elif message == "no":
-            state["in_court"] = False
-            log_intake_event(request.intake_id, "court_answer", "no")
-            state["step"] = "income_check"
-        else:
-            return {
-                "response_key": "triage.court.invalid",
-                "response_params": {},
-                "options": ["yes", "no"],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-        return {
-            "response_key": "triage.income.prompt",
-            "response_params": {},
-            "options": ["yes", "no", "not_sure"],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    if state.get("step") == "income_check":
-        if message in ["yes", "not_sure"]:
-            state["income_eligible"] = True
-            state["income"] = "yes"
-            log_intake_event(request.intake_id, "income_answer", message)
-        elif message == "no":
-            state["income_eligible"] = False
-            state["income"] = "no"
-            log_intake_event(request.intake_id, "income_answer", "no")
-        else:
-            return {
-                "response_key": "triage.income.invalid",
-                "response_params": {},
-                "options": ["yes", "no", "not_sure"],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-        state["step"] = "problem_summary"
-        return {
-            "response_key": "triage.summary.prompt",
-            "response_params": {},
-            "options": [],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    if state.get("step") == "problem_summary":
-        summary = raw_message.strip()
-        if len(summary) < 15:
-            return {
-                "response_key": "triage.summary.invalid",
-                "response_params": {},
-                "options": [],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-        if len(summary) > 4000:
-            summary = summary[:4000]
-
-        selected_topic = state.get("topic")
-        conflict_topic = infer_topic_conflict_with_selection(summary, selected_topic)
-        if conflict_topic:
-            state["problem_summary"] = summary
-            state["summary_inferred_topic"] = conflict_topic
-            state["step"] = "summary_topic_confirm"
-            mismatch_payload = json.dumps(
-                {
-                    "selected_topic": selected_topic,
-                    "inferred_topic": conflict_topic,
-                    "summary_excerpt": summary[:500],
-                },
-                ensure_ascii=False,
-            )
-            log_intake_event(request.intake_id, "summary_topic_mismatch", mismatch_payload)
-            return {
-                "response_key": "triage.summary.topicMismatch",
-                "response_params": {
-                    "selectedTopic": selected_topic,
-                    "inferredTopic": conflict_topic,
-                },
-                "options": ["summary_topic_same", "summary_topic_change"],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
 
+def _validate_problem_summary(turn: Turn) -> Optional[str]:
+    summary = turn.raw_message.strip()
+    if len(summary) < 15:
+        return None
+    return summary[:4000]
+
+
+def _validate_zip(turn: Turn) -> Optional[Tuple[str, bool]]:
+    zip_resolved, zip_from_skip = resolve_five_digit_zip(turn.message)
+    if zip_resolved is None:
+        return None
+    return zip_resolved, zip_from_skip
+
+
+def _accept_problem_summary(turn: Turn, summary: str) -> dict:
+    state = turn.state
+    selected_topic = state.get("topic")
+    conflict_topic = infer_topic_conflict_with_selection(summary, selected_topic)
+    if conflict_topic:
         state["problem_summary"] = summary
-        log_intake_event(request.intake_id, "problem_summary", summary)
-        state["step"] = "get_zip"
-        return {
-            "response_key": "triage.zip.prompt",
-            "response_params": {},
-            "options": [],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    if state.get("step") == "summary_topic_confirm":
-        choice = raw_message.strip().lower().replace(" ", "_")
-        summary_text = (state.get("problem_summary") or "").strip()
-
-        if choice == "summary_topic_same":
-            log_intake_event(request.intake_id, "summary_topic_alignment", "same")
-            if summary_text:
-                log_intake_event(request.intake_id, "problem_summary", summary_text)
-            state.pop("summary_inferred_topic", None)
-            state["step"] = "get_zip"
-            return {
-                "response_key": "triage.zip.prompt",
-                "response_params": {},
-                "options": [],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-
-        if choice == "summary_topic_change":
-            log_intake_event(request.intake_id, "summary_topic_alignment", "different")
-            if summary_text:
-                log_intake_event(request.intake_id, "problem_summary_alternate_topic", summary_text)
-            state.pop("problem_summary", None)
-            state.pop("summary_inferred_topic", None)
-            for key in ("topic", "emergency", "in_court", "income_eligible", "income"):
-                state.pop(key, None)
-            state["step"] = "topic_selection"
-            return {
-                "response_key": "triage.summary.topicChangePrompt",
-                "response_params": {},
-                "options": ["child_support", "education", "housing", "divorce", "custody"],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-
-        return {
-            "response_key": "triage.summary.topicMismatchInvalid",
-            "response_params": {},
-            "options": ["summary_topic_same", "summary_topic_change"],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    if state.get("step") == "get_zip":
-        zip_resolved, zip_from_skip = resolve_five_digit_zip(message)
-        if zip_resolved is None:
-            selected_topic = state.get("topic")
-            conflict_topic = infer_topic_conflict_with_selection(raw_message, selected_topic)
-            if conflict_topic:
-                state["reconfirm_inferred_topic"] = conflict_topic
-                state["step"] = "topic_reconfirm"
-                mismatch_payload = json.dumps(
-                    {
-                        "selected_topic": selected_topic,
-                        "inferred_topic": conflict_topic,
-                        "zip_input_excerpt": raw_message[:300],
-                    },
-                    ensure_ascii=False,
-                )
-                log_intake_event(request.intake_id, "zip_topic_mismatch", mismatch_payload)
-                return {
-                    "response_key": "triage.topic.reconfirm",
-                    "response_params": {
-                        "selectedTopic": selected_topic,
-                        "inferredTopic": conflict_topic,
-                    },
-                    "options": ["summary_topic_same", "summary_topic_change"],
-                    "conversation_state": state,
-                    "progress": get_step_progress(state.get("step")),
-                }
-            return {
-                "response_key": "triage.zip.invalid",
-                "response_params": {"topic": state.get("topic")},
-                "options": [],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-
-        message = zip_resolved
-        state["zip_code"] = message
-        if zip_from_skip:
-            state["zip_skipped"] = True
-            log_intake_event(request.intake_id, "zip_skipped", message)
-        else:
-            state.pop("zip_skipped", None)
-            log_intake_event(request.intake_id, "zip_entered", message)
-
-        topic = state.get("topic", "general")
-        emergency = state.get("emergency", "no")
-        in_court = state.get("in_court", False)
-        income_eligible = state.get("income_eligible", False)
-
-        if emergency == "yes" or in_court:
-            level = 3
-            level_name = "direct legal assistance"
-        elif (not in_court) and income_eligible:
-            level = 2
-            level_name = "self-help legal information"
-        else:
-            level = 1
-            level_name = "general legal information"
-
-        state["level"] = level
-        log_intake_event(request.intake_id, "triage_level_assigned", str(level))
-        referrals = get_referrals_for_topic(referral_map=referral_map, topic=topic, level=level, income_value=state.get("income", "yes"), has_representation=state.get("has_representation"))
-        referral_names = [ref.get("name", "").strip() for ref in referrals if ref.get("name")]
-        log_intake_event(request.intake_id, "referrals_shown", json.dumps(referral_names, ensure_ascii=False))
-        log_intake_event(request.intake_id, "triage_completed", "complete")
-
-        final_state = {
-            "step": "complete",
-            "topic": topic,
-            "level": level,
-            "zip_code": message,
-            "income": state.get("income", "yes"),
-        }
-        ps = state.get("problem_summary")
-        if ps:
-            final_state["problem_summary"] = ps
-        if state.get("zip_skipped"):
-            final_state["zip_skipped"] = True
-        if state.get("has_representation"):
-            final_state["has_representation"] = state["has_representation"]
-        decision_support = build_decision_support(state)
-        final_state["decision_support"] = decision_support
-        return {
-            "response_key": "triage.results.intro",
-            "response_params": {"levelName": level_name, "topic": topic},
-            "referrals": referrals,
-            "decision_support": decision_support,
-            "options": ["continue", "restart", "connect"],
-            "conversation_state": final_state,
-            "progress": get_step_progress(final_state.get("step")),
-        }
-
-    if state.get("step") == "topic_reconfirm":
-        choice = raw_message.strip().lower().replace(" ", "_")
-
-        if choice == "summary_topic_same":
-            log_intake_event(request.intake_id, "zip_topic_alignment", "same")
-            state.pop("reconfirm_inferred_topic", None)
-            state["step"] = "get_zip"
-            return {
-                "response_key": "triage.zip.prompt",
-                "response_params": {},
-                "options": [],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-
-        if choice == "summary_topic_change":
-            log_intake_event(request.intake_id, "zip_topic_alignment", "different")
-            state.pop("reconfirm_inferred_topic", None)
-            for key in ("topic", "emergency", "in_court", "income_eligible", "income", "problem_summary"):
-                state.pop(key, None)
-            state["step"] = "topic_selection"
-            return {
-                "response_key": "triage.summary.topicChangePrompt",
-                "response_params": {},
-                "options": ["child_support", "education", "housing", "divorce", "custody"],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-
-        return {
-            "response_key": "triage.topic.reconfirmInvalid",
-            "response_params": {},
-            "options": ["summary_topic_same", "summary_topic_change"],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    if state.get("step") == "complete":
-        if message == "continue":
-            new_state = {
-                "step": "continue_check",
-                "topic": state.get("topic"),
-                "level": state.get("level"),
-                "zip_code": state.get("zip_code"),
-                "income": state.get("income"),
-            }
-            if state.get("problem_summary"):
-                new_state["problem_summary"] = state.get("problem_summary")
-            return {
-                "response_key": "triage.continueCheck.prompt",
-                "response_params": {},
-                "options": ["yes", "no"],
-                "conversation_state": new_state,
-                "progress": get_step_progress(new_state.get("step")),
-            }
-        if message == "connect":
-            topic = state.get("topic", "general")
-            level = state.get("level", 1)
-            zip_code = state.get("zip_code", "")
-            income = state.get("income", "yes")
-            referrals = get_referrals_for_topic(referral_map=referral_map, topic=topic, level=level, income_value=income, has_representation=state.get("has_representation"))
-            top_resource = referrals[0] if referrals else None
-            if top_resource:
-                selected_state = {"step": "resource_selected", "topic": topic, "level": level, "zip_code": zip_code, "income": income}
-                return {
-                    "response_key": "triage.results.connectTop",
-                    "response_params": {},
-                    "referrals": [top_resource],
-                    "options": ["restart"],
-                    "conversation_state": selected_state,
-                    "progress": get_step_progress(selected_state.get("step")),
-                }
-            return {
-                "response_key": "triage.results.connectFallback",
-                "response_params": {},
-                "options": ["restart"],
-                "conversation_state": state,
-                "progress": get_step_progress(state.get("step")),
-            }
-        return {
-            "response_key": "triage.results.completeButtonsHint",
-            "response_params": {},
-            "options": ["continue", "restart", "connect"],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    if state.get("step") == "continue_check":
-        if message == "yes":
-            new_state = {"step": "topic_selection"}
-            return {
-                "response_key": "triage.topic.prompt",
-                "response_params": {},
-                "options": ["child_support", "education", "housing", "divorce", "custody"],
-                "conversation_state": new_state,
-                "progress": get_step_progress(new_state.get("step")),
-            }
-        if message == "no":
-            return {
-                "response_key": "triage.goodbye",
-                "response_params": {},
-                "options": ["restart"],
-                "conversation_state": {"step": "complete"},
-                "progress": get_step_progress("complete"),
-            }
-        return {
-            "response_key": "triage.continueCheck.invalid",
-            "response_params": {},
-            "options": ["yes", "no"],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    if state.get("step") == "resource_selected":
-        return {
-            "response_key": "triage.results.connectTop",
-            "response_params": {},
-            "options": ["restart"],
-            "conversation_state": state,
-            "progress": get_step_progress(state.get("step")),
-        }
-
-    return {
-        "response_key": "triage.topic.prompt",
-        "response_params": {},
-        "options": ["child_support", "education", "housing", "divorce", "custody"],
-        "conversation_state": {"step": "topic_selection"},
-        "progress": get_step_progress("topic_selection"),
+        state["summary_inferred_topic"] = conflict_topic
+        state["step"] = "summary_topic_confirm"
+        mismatch_payload = json.dumps(
+            {
+                "selected_topic": selected_topic,
+                "inferred_topic": conflict_topic,
+                "summary_excerpt": summary[:500],
+            },
+            ensure_ascii=False,
+        )
+        log_intake_event(turn.intake_id, "summary_topic_mismatch", mismatch_payload)
+        return step_reply(
+            "triage.summary.topicMismatch",
+            state,
+            params={
+                "selectedTopic": selected_topic,
+                "inferredTopic": conflict_topic,
+            },
+        )
+
+    state["problem_summary"] = summary
+    log_intake_event(turn.intake_id, "problem_summary", summary)
+    state["step"] = "get_zip"
+    return step_reply("triage.zip.prompt", state)
+
+
+def _zip_topic_mismatch(turn: Turn, _value: Any) -> Optional[dict]:
+    """Input at the ZIP step that describes a different issue asks the user to reconfirm the topic."""
+    state = turn.state
+    selected_topic = state.get("topic")
+    conflict_topic = infer_topic_conflict_with_selection(turn.raw_message, selected_topic)
+    if not conflict_topic:
+        return None
+    state["reconfirm_inferred_topic"] = conflict_topic
+    state["step"] = "topic_reconfirm"
+    mismatch_payload = json.dumps(
+        {
+            "selected_topic": selected_topic,
+            "inferred_topic": conflict_topic,
+            "zip_input_excerpt": turn.raw_message[:300],
+        },
+        ensure_ascii=False,
+    )
+    log_intake_event(turn.intake_id, "zip_topic_mismatch", mismatch_payload)
+    return step_reply(
+        "triage.topic.reconfirm",
+        state,
+        params={
+            "selectedTopic": selected_topic,
+            "inferredTopic": conflict_topic,
+        },
+    )
+
+
+def _complete_triage(turn: Turn, resolved: Tuple[str, bool]) -> dict:
+    state = turn.state
+    zip_code, zip_from_skip = resolved
+    state["zip_code"] = zip_code
+    if zip_from_skip:
+        state["zip_skipped"] = True
+        log_intake_event(turn.intake_id, "zip_skipped", zip_code)
+    else:
+        state.pop("zip_skipped", None)
+        log_intake_event(turn.intake_id, "zip_entered", zip_code)
+
+    topic = state.get("topic", "general")
+    emergency = state.get("emergency", "no")
+    in_court = state.get("in_court", False)
+    income_eligible = state.get("income_eligible", False)
+
+    if emergency == "yes" or in_court:
+        level = 3
+        level_name = "direct legal assistance"
+    elif (not in_court) and income_eligible:
+        level = 2
+        level_name = "self-help legal information"
+    else:
+        level = 1
+        level_name = "general legal information"
+
+    state["level"] = level
+    log_intake_event(turn.intake_id, "triage_level_assigned", str(level))
+    referrals = get_referrals_for_topic(referral_map=turn.referral_map, topic=topic, level=level, income_value=state.get("income", "yes"), has_representation=state.get("has_representation"), zip_code=None if zip_from_skip else zip_code)
+    referral_names = [ref.get("name", "").strip() for ref in referrals if ref.get("name")]
+    log_intake_event(turn.intake_id, "referrals_shown", json.dumps(referral_names, ensure_ascii=False))
+    log_intake_event(turn.intake_id, "triage_completed", "complete")
+
+    final_state = {
+        "step": "complete",
+        "topic": topic,
+        "level": level,
+        "zip_code": zip_code,
+        "income": state.get("income", "yes"),
     }
+    ps = state.get("problem_summary")
+    if ps:
+        final_state["problem_summary"] = ps
+    if state.get("zip_skipped"):
+        final_state["zip_skipped"] = True
+    if state.get("has_representation"):
+        final_state["has_representation"] = state["has_representation"]
+    decision_support = build_decision_support(state)
+    final_state["decision_support"] = decision_support
+    return step_reply(
+        "triage.results.intro",
+        final_state,
+        params={"levelName": level_name, "topic": topic},
+        referrals=referrals,
+        decision_support=decision_support,
+    )
+
+
+def _connect_top_resource(turn: Turn, _value: Any) -> dict:
+    state = turn.state
+    topic = state.get("topic", "general")
+    level = state.get("level", 1)
+    zip_code = state.get("zip_code", "")
+    income = state.get("income", "yes")
+    referrals = get_referrals_for_topic(referral_map=turn.referral_map, topic=topic, level=level, income_value=income, has_representation=state.get("has_representation"), zip_code=None if state.get("zip_skipped") else zip_code)
+    top_resource = referrals[0] if referrals else None
+    if top_resource:
+        selected_state = {"step": "resource_selected", "topic": topic, "level": level, "zip_code": zip_code, "income": income}
+        return step_reply("triage.results.connectTop", selected_state, referrals=[top_resource])
+    return step_reply("triage.results.connectFallback", state)
+
+
+def _crisis_guard(machine: TriageMachine, turn: Turn) -> Optional[dict]:
+    if turn.step is None or turn.step in machine.crisis_exempt_steps:
+        return None
+    if detect_crisis_keywords(turn.message):
+        return step_reply("triage.emergency.crisisDetectedBody", turn.state)
+    return None
+
+
+def _topic_redirect_guard(machine: TriageMachine, turn: Turn) -> Optional[dict]:
+    if turn.state and turn.step in machine.redirect_steps:
+        return try_redirect_topic_from_free_text(turn.state, turn.message, turn.intake_id)
+    return None
+
+
+def _start_guard(machine: TriageMachine, turn: Turn) -> Optional[dict]:
+    if not turn.state or turn.message in machine.start_messages:
+        return machine.start_reply()
+    return None
+
+
+def _restart_guard(machine: TriageMachine, turn: Turn) -> Optional[dict]:
+    if turn.message == "restart":
+        log_intake_event(turn.request.intake_id, "triage_restart", "restart")
+        return machine.start_reply()
+    return None
+
+
+TRIAGE_MACHINE = TriageMachine(
+    FLOW,
+    validators={
+        "topic": _validate_topic,
+        "problem_summary": _validate_problem_summary,
+        "zip": _validate_zip,
+    },
+    hooks={
+        "accept_problem_summary": _accept_problem_summary,
+        "zip_topic_mismatch": _zip_topic_mismatch,
+        "complete_triage": _complete_triage,
+        "connect_top_resource": _connect_top_resource,
+    },
+    guards={
+        "crisis": _crisis_guard,
+        "topic_redirect": _topic_redirect_guard,
+        "start": _start_guard,
+        "restart": _restart_guard,
+    },
+    # looked up per call so the module-level log_intake_event stays patchable
+    log_event=lambda intake_id, event_type, value: log_intake_event(intake_id, event_type, value),
+)
+
+
+def run_chat_flow(request, referral_map: dict):
+    state = request.conversation_state or {}
+    with span("triage.run_chat_flow", **{"triage.step": state.get("step") or "start"}) as current:
+        result = TRIAGE_MACHINE.run(request, referral_map)
+        if current is not None:
+            current.set_attribute("triage.next_step", (result.get("conversation_state") or {}).get("step"))
+        return result
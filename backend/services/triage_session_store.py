@@ -0,0 +1,274 @@
+"""
+Server-side /chat triage state, enabled with TRIAGE_SESSION_STORE.
+
+Each turn's conversation_state is saved as an immutable snapshot and the client gets a short signed token
+for it ("<snapshot id>.<hmac>", ~40 characters). Requests then carry the token instead of the whole state
+(problem_summary alone can be 4,000 characters), and level/income flags can't be edited client-side.
+Earlier tokens keep resolving until they expire, so the UI's Back button still works.
+
+Snapshots sit in an in-process LRU in front of the backing store:
+  memory  LRU only (single worker / local development)
+  db      triage_state_snapshots table
+  redis   REDIS_URL, keys expire with SETEX
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+from sqlalchemy import text
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+try:
+    from .config_service import ADMIN_EXPORT_KEY, ADMIN_JWT_SECRET, engine
+    from .triage_steps import dumps
+except ImportError:
+    from services.config_service import ADMIN_EXPORT_KEY, ADMIN_JWT_SECRET, engine  # type: ignore
+    from services.triage_steps import dumps  # type: ignore
+
+try:
+    from orjson import loads
+except ImportError:  # pragma: no cover - see triage_steps.dumps
+    loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+TRIAGE_SESSION_STORE = (os.getenv("TRIAGE_SESSION_STORE") or "").strip().lower()
+TRIAGE_SESSION_TTL_SECONDS = max(60, int(os.getenv("TRIAGE_SESSION_TTL_SECONDS", "86400") or "86400"))
+TRIAGE_SESSION_CACHE_SIZE = max(0, int(os.getenv("TRIAGE_SESSION_CACHE_SIZE", "4096") or "4096"))
+# Off by default so level/income flags can't be edited client-side; set true only for a bounded rollout
+# while older frontends (which only send conversation_state) are still in the wild.
+TRIAGE_ACCEPT_CLIENT_STATE = os.getenv("TRIAGE_ACCEPT_CLIENT_STATE", "false").strip().lower() in ("1", "true", "yes")
+
+_STORES = ("memory", "db", "redis")
+if TRIAGE_SESSION_STORE and TRIAGE_SESSION_STORE not in _STORES:
+    logger.warning("unknown TRIAGE_SESSION_STORE=%r; expected one of %s", TRIAGE_SESSION_STORE, ", ".join(_STORES))
+    TRIAGE_SESSION_STORE = ""
+
+
+def _signing_key() -> bytes:
+    """TRIAGE_SESSION_SECRET, else a key derived from the admin secret under its own label (never the admin
+    secret itself), else a per-process random key."""
+    own = (os.getenv("TRIAGE_SESSION_SECRET") or "").strip()
+    if own:
+        return own.encode("utf-8")
+    admin = ADMIN_JWT_SECRET or ADMIN_EXPORT_KEY
+    if admin:
+        return hmac.new(admin.encode("utf-8"), b"triage-session-token-v1", hashlib.sha256).digest()
+    if TRIAGE_SESSION_STORE in ("db", "redis"):
+        logger.warning("TRIAGE_SESSION_SECRET is not set; session tokens will only verify in this worker process")
+    return secrets.token_bytes(32)
+
+
+_SECRET = _signing_key()
+
+_SIGNATURE_BYTES = 16
+_REDIS_PREFIX = "cal:triage:state:"
+_PURGE_EVERY_WRITES = 500
+
+_CREATE_SNAPSHOTS_SQL = """
+CREATE TABLE IF NOT EXISTS triage_state_snapshots (
+  id TEXT PRIMARY KEY,
+  state TEXT NOT NULL,
+  created_at TEXT NOT NULL,
+  expires_at TEXT NOT NULL
+);
+"""
+
+_CREATE_SNAPSHOTS_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_triage_state_snapshots_expires_at
+ON triage_state_snapshots (expires_at);
+"""
+
+_cache: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+_cache_lock = threading.Lock()
+_table_lock = threading.Lock()
+_table_ensured = False
+_writes = 0
+_REDIS_CLIENT: Optional[Redis] = None
+_REDIS_INIT_ATTEMPTED = False
+
+
+def session_state_enabled() -> bool:
+    return bool(TRIAGE_SESSION_STORE)
+
+
+def _sign(snapshot_id: str) -> str:
+    digest = hmac.new(_SECRET, snapshot_id.encode("ascii"), hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def _snapshot_id(token: Optional[str]) -> Optional[str]:
+    """The snapshot id inside `token`, or None if the token is malformed or its signature doesn't match."""
+    snapshot_id, _, signature = (token or "").strip().partition(".")
+    if not snapshot_id or not signature or len(snapshot_id) > 64:
+        return None
+    try:
+        expected = _sign(snapshot_id)
+    except UnicodeEncodeError:
+        return None
+    return snapshot_id if hmac.compare_digest(signature, expected) else None
+
+
+def _redis_client() -> Optional[Redis]:
+    global _REDIS_CLIENT, _REDIS_INIT_ATTEMPTED
+    if _REDIS_CLIENT is not None or _REDIS_INIT_ATTEMPTED:
+        return _REDIS_CLIENT
+    _REDIS_INIT_ATTEMPTED = True
+    url = (os.getenv("REDIS_URL") or "").strip()
+    if not url:
+        logger.warning("TRIAGE_SESSION_STORE=redis but REDIS_URL is not set; using the in-process cache only")
+        return None
+    try:
+        from redis import Redis
+
+        client = Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        client.ping()
+        _REDIS_CLIENT = client
+    except Exception as e:
+        logger.warning("triage session Redis unavailable: %s", e)
+    return _REDIS_CLIENT
+
+
+def _ensure_table() -> None:
+    global _table_ensured
+    if _table_ensured or not engine:
+        return
+    with _table_lock:
+        if _table_ensured:
+            return
+        with engine.begin() as conn:
+            conn.execute(text(_CREATE_SNAPSHOTS_SQL))
+            conn.execute(text(_CREATE_SNAPSHOTS_INDEX_SQL))
+        _table_ensured = True
+
+
+def _purge_expired_snapshots(now: datetime) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM triage_state_snapshots WHERE expires_at < :now"), {"now": now.isoformat()})
+
+
+def _store_put(snapshot_id: str, body: bytes) -> None:
+    global _writes
+    if TRIAGE_SESSION_STORE == "redis":
+        client = _redis_client()
+        if client is not None:
+            client.setex(_REDIS_PREFIX + snapshot_id, TRIAGE_SESSION_TTL_SECONDS, body)
+        return
+    if TRIAGE_SESSION_STORE != "db" or not engine:
+        return
+    _ensure_table()
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO triage_state_snapshots (id, state, created_at, expires_at)
+                VALUES (:id, :state, :created_at, :expires_at)
+                """
+            ),
+            {
+                "id": snapshot_id,
+                "state": body.decode("utf-8"),
+                "created_at": now.isoformat(),
+                "expires_at": (now + timedelta(seconds=TRIAGE_SESSION_TTL_SECONDS)).isoformat(),
+            },
+        )
+    _writes += 1
+    if _writes % _PURGE_EVERY_WRITES == 0:
+        _purge_expired_snapshots(now)
+
+
+def _store_get(snapshot_id: str) -> Optional[bytes]:
+    if TRIAGE_SESSION_STORE == "redis":
+        client = _redis_client()
+        return client.get(_REDIS_PREFIX + snapshot_id) if client is not None else None
+    if TRIAGE_SESSION_STORE != "db" or not engine:
+        return None
+    _ensure_table()
+    with engine.connect() as conn:
+        row = conn.execute(
+            text("SELECT state FROM triage_state_snapshots WHERE id = :id AND expires_at >= :now"),
+            {"id": snapshot_id, "now": datetime.now(timezone.utc).isoformat()},
+        ).first()
+    return row[0].encode("utf-8") if row else None
+
+
+def _cache_put(snapshot_id: str, body: bytes) -> None:
+    if TRIAGE_SESSION_CACHE_SIZE <= 0:
+        return
+    with _cache_lock:
+        _cache[snapshot_id] = (body, time.monotonic() + TRIAGE_SESSION_TTL_SECONDS)
+        _cache.move_to_end(snapshot_id)
+        while len(_cache) > TRIAGE_SESSION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _cache_get(snapshot_id: str) -> Optional[bytes]:
+    with _cache_lock:
+        entry = _cache.get(snapshot_id)
+        if entry is None:
+            return None
+        if entry[1] < time.monotonic():
+            del _cache[snapshot_id]
+            return None
+        _cache.move_to_end(snapshot_id)
+        return entry[0]
+
+
+def save_state(state: dict) -> str:
+    """Store `state` as a new snapshot and return its signed token."""
+    snapshot_id = secrets.token_urlsafe(12)
+    body = dumps(state)
+    _cache_put(snapshot_id, body)
+    try:
+        _store_put(snapshot_id, body)
+    except Exception as e:
+        # The token still works in this worker via the LRU; other workers will start the user over.
+        logger.warning("could not persist triage state snapshot: %s", e)
+    return f"{snapshot_id}.{_sign(snapshot_id)}"
+
+
+def load_state(token: Optional[str]) -> Optional[dict]:
+    """A fresh copy of the state for `token`, or None if it is invalid, expired or evicted."""
+    snapshot_id = _snapshot_id(token)
+    if snapshot_id is None:
+        return None
+    body = _cache_get(snapshot_id)
+    if body is None:
+        try:
+            body = _store_get(snapshot_id)
+        except Exception as e:
+            logger.warning("could not load triage state snapshot: %s", e)
+            return None
+        if body is None:
+            return None
+        _cache_put(snapshot_id, body)
+    state: Any = loads(body)
+    return state if isinstance(state, dict) else None
+
+
+def resolve_request_state(session_token: Optional[str], client_state: Optional[dict]) -> dict:
+    """
+    The conversation state to run this /chat turn with. A token always wins; an unknown or expired token
+    starts the conversation over. Without a token, client-sent state is used only while
+    TRIAGE_ACCEPT_CLIENT_STATE is on (off by default).
+    """
+    if session_token:
+        return load_state(session_token) or {}
+    if TRIAGE_ACCEPT_CLIENT_STATE:
+        return client_state or {}
+    return {}
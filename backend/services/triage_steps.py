@@ -0,0 +1,158 @@
+"""
+Step and reply descriptors for the /chat triage flow, compiled once from data/triage_questions.json.
+
+Each reply key (e.g. "triage.court.prompt") has fixed options, and each step has a fixed progress map,
+so the JSON for those parts is serialized once per (reply, step) and reused. Per turn, only
+conversation_state and the few dynamic fields (response_params, referrals, decision_support) are encoded.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .config_service import TRIAGE_QUESTIONS_PATH
+except ImportError:
+    from services.config_service import TRIAGE_QUESTIONS_PATH  # type: ignore
+
+try:
+    import orjson
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value)
+
+except ImportError:  # pragma: no cover - orjson is in requirements.txt; stdlib keeps dev installs working
+
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class StepReply:
+    response_key: str
+    options: Tuple[str, ...]
+
+
+def _compile(path: str) -> Tuple[Dict[str, StepReply], Dict[str, dict], dict, Dict[str, Tuple[str, ...]], dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    option_sets = {name: tuple(values) for name, values in config["option_sets"].items()}
+    replies = {key: StepReply(key, option_sets[set_name]) for key, set_name in config["replies"].items()}
+    total = int(config.get("progress_total") or 6)
+    progress = {
+        step: {"current": int(entry["progress"]), "total": total, "label_key": entry["label_key"]}
+        for step, entry in config["steps"].items()
+    }
+    default_progress = {"current": 1, "total": total, "label_key": "progress.defaultLabel"}
+    return replies, progress, default_progress, option_sets, config.get("flow") or {}
+
+
+REPLIES, STEP_PROGRESS, DEFAULT_PROGRESS, OPTION_SETS, FLOW = _compile(TRIAGE_QUESTIONS_PATH)
+TOPIC_OPTIONS: Tuple[str, ...] = OPTION_SETS["topics"]
+
+
+def step_progress(step: Optional[str]) -> dict:
+    """Shared progress dict for `step`; treat as read-only."""
+    return STEP_PROGRESS.get(step or "topic_selection", DEFAULT_PROGRESS)
+
+
+class TriageReply(dict):
+    """A run_chat_flow result dict that remembers its descriptor, so /chat can use the pre-serialized fragment."""
+
+    __slots__ = ("descriptor", "step")
+
+    def __init__(self, descriptor: StepReply, step: Optional[str], fields: dict):
+        super().__init__(fields)
+        self.descriptor = descriptor
+        self.step = step
+
+
+def step_reply(
+    response_key: str,
+    state: dict,
+    params: Optional[dict] = None,
+    referrals: Optional[List[dict]] = None,
+    decision_support: Optional[dict] = None,
+) -> TriageReply:
+    """Build the reply for `response_key`; progress follows the step in `state` (the state after this turn)."""
+    descriptor = REPLIES[response_key]
+    step = state.get("step")
+    fields = {
+        "response_key": response_key,
+        "response_params": params or {},
+        "options": list(descriptor.options),
+        "conversation_state": state,
+        "progress": step_progress(step),
+    }
+    if referrals is not None:
+        fields["referrals"] = referrals
+    if decision_support is not None:
+        fields["decision_support"] = decision_support
+    return TriageReply(descriptor, step, fields)
+
+
+_fragments: Dict[Tuple[str, Optional[str]], bytes] = {}
+_fragments_lock = threading.Lock()
+
+
+def _static_fragment(descriptor: StepReply, step: Optional[str]) -> bytes:
+    key = (descriptor.response_key, step)
+    fragment = _fragments.get(key)
+    if fragment is None:
+        static = dumps(
+            {
+                "response": "",
+                "response_key": descriptor.response_key,
+                "options": list(descriptor.options),
+                "progress": step_progress(step),
+            }
+        )
+        fragment = static[1:-1]  # drop the braces so dynamic fields can be appended
+        with _fragments_lock:
+            _fragments[key] = fragment
+    return fragment
+
+
+_EMPTY_OBJECT = b"{}"
+_EMPTY_LIST = b"[]"
+
+
+def render_chat_body(result: dict) -> bytes:
+    """
+    Serialize a run_chat_flow result with the same fields as ChatResponse. TriageReply results splice the
+    cached fragment; any other dict falls back to encoding every field.
+    """
+    params = result.get("response_params") or {}
+    referrals = result.get("referrals") or []
+    decision_support = result.get("decision_support") or {}
+    if isinstance(result, TriageReply):
+        head = _static_fragment(result.descriptor, result.step)
+    else:
+        head = dumps(
+            {
+                "response": result.get("response") or "",
+                "response_key": result.get("response_key"),
+                "options": list(result.get("options") or []),
+                "progress": result.get("progress") or {},
+            }
+        )[1:-1]
+    return b"".join(
+        (
+            b"{",
+            head,
+            b',"response_params":',
+            dumps(params) if params else _EMPTY_OBJECT,
+            b',"referrals":',
+            dumps(referrals) if referrals else _EMPTY_LIST,
+            b',"decision_support":',
+            dumps(decision_support) if decision_support else _EMPTY_OBJECT,
+            b',"conversation_state":',
+            dumps(result.get("conversation_state") or {}),
+            b',"session_token":',
+            dumps(result["session_token"]) if result.get("session_token") else b"null",
+            b"}",
+        )
+    )
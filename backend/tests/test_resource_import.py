@@ -0,0 +1,87 @@
+"""
+POST /admin/resources/bulk-import/csv. Run from the backend folder:
+
+  python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_DB_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from models.resources import Resource, ResourceImportJob  # noqa: E402
+
+HEADER = "title,category,jurisdiction_country,source_name,source_url,postal_code\n"
+VALID = (
+    "Eviction help desk,housing,US,Test,https://example.org/eviction,60625\n"
+    "Child support clinic,family,US,Test,https://example.org/support,60601\n"
+)
+INVALID = (
+    "Eviction help desk,housing,US,Test,x,60625\n"
+    "Child support clinic,family,US,T,https://example.org/support,60601\n"
+)
+
+
+class CsvImportTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._admin_key = mock.patch("services.intake_service.ADMIN_EXPORT_KEY", "test-key")
+        cls._admin_key.start()
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+        cls._admin_key.stop()
+
+    def setUp(self):
+        db = SessionLocal()
+        db.query(Resource).delete()
+        db.query(ResourceImportJob).delete()
+        db.commit()
+        db.close()
+
+    def _upload(self, body: str):
+        return self.client.post(
+            "/admin/resources/bulk-import/csv",
+            headers={"X-Admin-Key": "test-key"},
+            files={"file": ("resources.csv", body.encode("utf-8"), "text/csv")},
+        )
+
+    def test_all_duplicate_csv(self):
+        first = self._upload(HEADER + VALID)
+        self.assertEqual(first.status_code, 200, first.text)
+        self.assertEqual(first.json()["created_count"], 2)
+
+        again = self._upload(HEADER + VALID)
+        self.assertEqual(again.status_code, 200, again.text)
+        data = again.json()
+        self.assertEqual(data["status"], "completed")
+        self.assertEqual((data["rows_processed"], data["created_count"], data["skipped_count"]), (2, 0, 2))
+        self.assertEqual([r["status"] for r in data["results"]], ["duplicate", "duplicate"])
+
+    def test_all_invalid_csv(self):
+        response = self._upload(HEADER + INVALID)
+        self.assertEqual(response.status_code, 200, response.text)
+        data = response.json()
+        self.assertEqual(data["status"], "completed")
+        self.assertEqual((data["rows_processed"], data["created_count"], data["skipped_count"]), (2, 0, 2))
+        # Each error names the field and the reason, not just pydantic's "1 validation error" header.
+        self.assertEqual(len(data["errors"]), 2)
+        self.assertTrue(data["errors"][0].startswith("row 2: source_url: "), data["errors"][0])
+        self.assertTrue(data["errors"][1].startswith("row 3: source_name: "), data["errors"][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
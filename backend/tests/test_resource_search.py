@@ -0,0 +1,82 @@
+"""
+/resources?q= search. Run from the backend folder:
+
+  python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_DB_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}")
+
+from database import SessionLocal, init_db  # noqa: E402
+from models.resources import Resource  # noqa: E402
+from services import resource_search  # noqa: E402
+from services.resource_search import apply_text_search, postgres_tsquery, search_terms  # noqa: E402
+
+
+class PostgresTsqueryTest(unittest.TestCase):
+    def test_drops_stop_words_and_prefixes_last_kept_term(self):
+        self.assertEqual(postgres_tsquery(search_terms("how to fight an eviction")), "fight & eviction:*")
+
+    def test_stop_word_only_query_has_no_tsquery(self):
+        for q in ("the", "for", "how to", "___"):
+            self.assertIsNone(postgres_tsquery(search_terms(q)), q)
+
+
+class StopWordQueryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        db = SessionLocal()
+        db.query(Resource).delete()
+        db.add_all(
+            [
+                Resource(
+                    title="How to answer an eviction notice",
+                    category="housing",
+                    jurisdiction_country="US",
+                    source_name="Test",
+                    source_url="https://example.org/a",
+                ),
+                Resource(
+                    title="Child support calculator",
+                    category="family",
+                    jurisdiction_country="US",
+                    source_name="Test",
+                    source_url="https://example.org/b",
+                ),
+            ]
+        )
+        db.commit()
+        db.close()
+
+    def setUp(self):
+        self._mode = resource_search._search_mode
+        self._ensured = resource_search._search_ensured
+
+    def tearDown(self):
+        resource_search._search_mode = self._mode
+        resource_search._search_ensured = self._ensured
+
+    def test_stop_word_only_query_falls_back_to_ilike_on_postgres(self):
+        # Postgres itself is not needed: with nothing left for to_tsquery, the ILIKE branch must be used.
+        resource_search._search_ensured = True
+        resource_search._search_mode = "postgres"
+        db = SessionLocal()
+        try:
+            query, order_by = apply_text_search(db.query(Resource), "how to")
+            self.assertNotIn("to_tsquery", str(query.statement.compile()))
+            self.assertEqual(order_by, [])
+            self.assertEqual([r.title for r in query.all()], ["How to answer an eviction notice"])
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2241,7 +2241,9 @@ function App() {
               String(conversationState?.step || "").toLowerCase() === "problem_summary"
                 ? String(message || "").trim()
                 : String(message || "").toLowerCase(),
-            conversation_state: conversationState,
+            // With server-side triage state the token stands in for the whole state object.
+            conversation_state: conversationState?.session_token ? {} : conversationState,
+            session_token: conversationState?.session_token || null,
             language: normalizedLang,
             intake_id: intakeId || null,
           }),
@@ -2287,6 +2289,7 @@ function App() {
 
       const newState = {
         ...(data.conversation_state || {}),
+        ...(data.session_token ? { session_token: data.session_token } : {}),
         progress: data.progress || (data.conversation_state?.progress ?? {}),
       };
       setConversationState(newState);